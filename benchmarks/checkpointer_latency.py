@@ -0,0 +1,90 @@
+"""
+Per-turn write latency of the checkpointer backends.
+
+Runs a one-node chat graph (no LLM) for a number of concurrent sessions
+and turns, once per backend, and reports p50/p95/p99 per-turn latency.
+
+    python benchmarks/checkpointer_latency.py --sessions 16 --turns 20
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(sys.path[0])
+os.environ.setdefault("MAX_REWRITE_ITERATIONS", "3")
+
+from langchain.messages import AIMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.checkpoint.memory import InMemorySaver
+
+from services.checkpointers.sqlite import SqliteCheckpointSaver
+
+
+def make_graph(checkpointer):
+    async def reply(state: MessagesState):
+        return {"messages": [AIMessage(content="ok " * 50)]}
+
+    graph_builder = StateGraph(MessagesState)
+    graph_builder.add_node("reply", reply)
+    graph_builder.add_edge(START, "reply")
+    graph_builder.add_edge("reply", END)
+    return graph_builder.compile(checkpointer=checkpointer)
+
+
+async def run_session(graph, session_id: str, turns: int, latencies: list) -> None:
+    config = {"configurable": {"thread_id": session_id}}
+    for turn in range(turns):
+        start = time.perf_counter()
+        await graph.ainvoke(
+            {"messages": [{"role": "user", "content": f"turn {turn}"}]}, config
+        )
+        latencies.append(time.perf_counter() - start)
+
+
+def percentile(values: list, q: float) -> float:
+    return statistics.quantiles(values, n=100)[int(q) - 1] if len(values) > 1 else values[0]
+
+
+async def bench(name: str, checkpointer, sessions: int, turns: int) -> None:
+    graph = make_graph(checkpointer)
+    latencies = []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(graph, f"{name}-{i}", turns, latencies) for i in range(sessions)
+    ))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<18} turns={len(latencies):<5} "
+        f"p50={percentile(latencies, 50) * 1000:7.2f}ms "
+        f"p95={percentile(latencies, 95) * 1000:7.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:7.2f}ms "
+        f"throughput={len(latencies) / elapsed:8.1f} turns/s"
+    )
+
+
+async def main(sessions: int, turns: int) -> None:
+    await bench("memory", InMemorySaver(), sessions, turns)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for synchronous in ("NORMAL", "FULL"):
+            saver = SqliteCheckpointSaver(
+                f"{tmp}/{synchronous}.sqlite", synchronous=synchronous
+            )
+            await bench(f"sqlite/{synchronous}", saver, sessions, turns)
+            saver.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.sessions, args.turns))
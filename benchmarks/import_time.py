@@ -0,0 +1,121 @@
+"""
+Cold-start import profile of the app.
+
+Runs `python -X importtime -c "import main_client"` in fresh interpreters
+and reports the total import time (median of `--repeat` runs), the modules
+with the highest self time, and the cumulative time of each project
+module. Placeholder credentials are set for the import only; nothing is
+sent anywhere.
+
+`--output` writes the report as JSON, `--baseline` compares with an
+earlier report, and `--max-ms` exits non-zero when the total is over
+budget, so a cold-start regression fails CI.
+
+    python benchmarks/import_time.py --repeat 5 --output import_time.json
+    python benchmarks/import_time.py --baseline import_time.json --max-ms 6000
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_PACKAGES = {"main_client", "constants", "models", "routers", "services", "utils"}
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile_once(module: str) -> List[Dict[str, Any]]:
+    env = dict(os.environ)
+    env.setdefault("MAX_REWRITE_ITERATIONS", "3")
+    env.setdefault("GEMINI_API_KEY", "import-profile")
+    env.setdefault("GEMINI_MODEL_NAME", "import-profile")
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            })
+    return entries
+
+def profile(module: str, repeat: int, top: int) -> Dict[str, Any]:
+    # one throwaway run so .pyc compilation is not measured
+    profile_once(module)
+    runs = [profile_once(module) for _ in range(repeat)]
+
+    totals = [
+        next(entry["cumulative_ms"] for entry in run if entry["module"] == module)
+        for run in runs
+    ]
+    median_run = runs[totals.index(sorted(totals)[len(totals) // 2])]
+
+    return {
+        "module": module,
+        "repeat": repeat,
+        "total_ms": round(statistics.median(totals), 1),
+        "total_ms_runs": [round(total, 1) for total in totals],
+        "modules_imported": len(median_run),
+        "top_self": [
+            {"module": entry["module"], "self_ms": round(entry["self_ms"], 1)}
+            for entry in sorted(median_run, key=lambda entry: entry["self_ms"], reverse=True)[:top]
+        ],
+        "project_cumulative": [
+            {"module": entry["module"], "cumulative_ms": round(entry["cumulative_ms"], 1)}
+            for entry in sorted(median_run, key=lambda entry: entry["cumulative_ms"], reverse=True)
+            if entry["module"].split(".")[0] in PROJECT_PACKAGES
+        ][:top],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="main_client")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--baseline", help="earlier --output file to compare with")
+    parser.add_argument("--max-ms", type=float, help="fail when the total import time is above this")
+    args = parser.parse_args()
+
+    report = profile(args.module, args.repeat, args.top)
+
+    print(f"import {report['module']}: {report['total_ms']:.0f} ms "
+          f"(runs: {report['total_ms_runs']}, {report['modules_imported']} modules)")
+    print("\nproject modules, cumulative:")
+    for entry in report["project_cumulative"]:
+        print(f"  {entry['cumulative_ms']:9.1f} ms  {entry['module']}")
+    print("\nslowest modules, self:")
+    for entry in report["top_self"]:
+        print(f"  {entry['self_ms']:9.1f} ms  {entry['module']}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        change = (report["total_ms"] - baseline["total_ms"]) / baseline["total_ms"] * 100
+        print(f"\nvs baseline: {baseline['total_ms']:.0f} ms -> {report['total_ms']:.0f} ms ({change:+.0f}%)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.max_ms is not None and report["total_ms"] > args.max_ms:
+        print(f"\nimport time {report['total_ms']:.0f} ms is over the {args.max_ms:.0f} ms budget")
+        sys.exit(1)
@@ -0,0 +1,343 @@
+"""
+Offline load test of the four /single-agent endpoints.
+
+main_client:app runs under uvicorn in a child process with the stand-in
+chat model and vector store from benchmarks/standins.py, so no Gemini or
+Pinecone calls are made. rag_search is put behind the human-in-the-loop
+middleware so the continue endpoints have an interrupt to resume.
+
+A JSONL workload is replayed by `--concurrency` workers. Each line is one
+turn: {"session": ..., "endpoint": ..., "query": ...}, where endpoint is
+one of generate-answer, continue-answer, stream/generate-answer or
+stream/continue-answer. Turns of one session run in file order; sessions
+run concurrently. Without `--workload` a mixed workload of `--sessions`
+sessions is generated.
+
+Reported per endpoint: throughput, latency p50/p95/p99, time to first
+token (streams) and status codes; for the server: event-loop lag and CPU.
+Everything is written to `--output` as JSON; `--baseline` compares the
+run against an earlier output file.
+
+    python benchmarks/load_test.py --sessions 50 --concurrency 16 --output results.json
+    python benchmarks/load_test.py --workload benchmarks/workload.jsonl --baseline results.json
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import httpx
+import asyncio
+import logging
+import argparse
+import platform
+import multiprocessing
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(sys.path[0])
+os.environ.setdefault("MAX_REWRITE_ITERATIONS", "3")
+
+
+ENDPOINTS = (
+    "generate-answer",
+    "continue-answer",
+    "stream/generate-answer",
+    "stream/continue-answer",
+)
+# stream events that are not model output
+CONTROL_EVENTS = {"interrupt", "usage", "error"}
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile, q in [0, 100]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """Milliseconds summary of a list of seconds."""
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "count": len(values),
+        "mean": ms(sum(values) / len(values)) if values else None,
+        "p50": ms(percentile(values, 50)),
+        "p95": ms(percentile(values, 95)),
+        "p99": ms(percentile(values, 99)),
+        "max": ms(max(values)) if values else None,
+    }
+
+
+# --- server (child process) ---
+
+def serve(port: int, args: Dict[str, Any]) -> None:
+    if args["quiet"]:
+        logging.disable(logging.INFO)
+
+    from benchmarks.standins import LatencyModel, install
+    install(
+        LatencyModel(args["llm_latency"], args["llm_sigma"]),
+        tokens_per_second=args["tokens_per_second"],
+        answer_tokens=args["answer_tokens"],
+        search=LatencyModel(args["search_latency"], args["search_sigma"]),
+        prompt_cache=args["prompt_cache"],
+    )
+
+    from constants.config import MIDDLEWARE_LIST_TOOLS
+    MIDDLEWARE_LIST_TOOLS["rag_search"] = "Search the knowledge base"
+
+    import uvicorn
+    from main_client import app
+    from services.usage import USAGE_TOTALS
+
+    lags: List[float] = []
+
+    async def ticker(interval: float = 0.01) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, loop.time() - expected))
+
+    state: Dict[str, Any] = {}
+
+    @app.post("/bench/reset")
+    async def reset() -> Dict[str, Any]:
+        if "ticker" not in state:
+            state["ticker"] = asyncio.create_task(ticker())
+        lags.clear()
+        state["cpu"] = time.process_time()
+        state["usage"] = dict(USAGE_TOTALS)
+        return {"status": "ok"}
+
+    @app.get("/bench/stats")
+    async def stats() -> Dict[str, Any]:
+        before = state.get("usage", {})
+        prompt_tokens = USAGE_TOTALS["prompt_tokens"] - before.get("prompt_tokens", 0)
+        cached_tokens = USAGE_TOTALS["cached_prompt_tokens"] - before.get("cached_prompt_tokens", 0)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "cached_prompt_tokens": cached_tokens,
+            "prompt_cache_hit_ratio": round(cached_tokens / prompt_tokens, 3) if prompt_tokens else None,
+            "event_loop_lag_ms": summarize(list(lags)),
+            "cpu_seconds": round(time.process_time() - state.get("cpu", 0.0), 3),
+        }
+
+    uvicorn.run(app, port=port, log_level="warning")
+
+
+# --- workload ---
+
+def load_workload(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        turns = [json.loads(line) for line in f if line.strip()]
+    for turn in turns:
+        if turn["endpoint"] not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in workload: {turn['endpoint']}")
+    return turns
+
+def generate_workload(sessions: int) -> List[Dict[str, Any]]:
+    """Ask then approve, alternating between the plain and streaming endpoints."""
+    turns = []
+    for i in range(sessions):
+        prefix = "stream/" if i % 2 else ""
+        turns.append({"session": f"s{i}", "endpoint": f"{prefix}generate-answer",
+                      "query": f"How do I reset my password? (case {i})"})
+        turns.append({"session": f"s{i}", "endpoint": f"{prefix}continue-answer", "query": "approve"})
+    return turns
+
+
+# --- client ---
+
+async def run_turn(client: httpx.AsyncClient, session_id: str, turn: Dict[str, Any]) -> Dict[str, Any]:
+    endpoint = turn["endpoint"]
+    body = {"session_id": session_id, "query": turn["query"]}
+    result = {"endpoint": endpoint, "status": None, "ok": False, "latency": None, "ttft": None}
+
+    started = time.perf_counter()
+    try:
+        if endpoint.startswith("stream/"):
+            async with client.stream("POST", f"/single-agent/{endpoint}", json=body) as response:
+                result["status"] = response.status_code
+                result["ok"] = response.status_code == 200
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    event = json.loads(line[5:])
+                    if event.get("type") == "error":
+                        result["ok"] = False
+                    elif event.get("type") not in CONTROL_EVENTS and result["ttft"] is None:
+                        result["ttft"] = time.perf_counter() - started
+        else:
+            response = await client.post(f"/single-agent/{endpoint}", json=body)
+            result["status"] = response.status_code
+            result["ok"] = response.status_code == 200 and response.json().get("status") != "error"
+    except httpx.HTTPError as e:
+        result["status"] = type(e).__name__
+
+    result["latency"] = time.perf_counter() - started
+    return result
+
+async def replay(
+    client: httpx.AsyncClient,
+    turns: List[Dict[str, Any]],
+    concurrency: int,
+) -> List[Dict[str, Any]]:
+    # a fresh session id per run, so reruns against one server do not mix
+    run_prefix = uuid.uuid4().hex[:8]
+    sessions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for turn in turns:
+        sessions[turn.get("session") or uuid.uuid4().hex].append(turn)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in sessions.items():
+        queue.put_nowait(item)
+
+    results: List[Dict[str, Any]] = []
+
+    async def worker():
+        while not queue.empty():
+            session, session_turns = queue.get_nowait()
+            for turn in session_turns:
+                results.append(await run_turn(client, f"{run_prefix}-{session}", turn))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+def report(results: List[Dict[str, Any]], wall: float) -> Dict[str, Any]:
+    by_endpoint: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for result in results:
+        by_endpoint[result["endpoint"]].append(result)
+
+    def stats(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        statuses: Dict[str, int] = defaultdict(int)
+        for item in items:
+            statuses[str(item["status"])] += 1
+        return {
+            "requests": len(items),
+            "errors": sum(not item["ok"] for item in items),
+            "status_codes": dict(statuses),
+            "throughput_rps": round(len(items) / wall, 3) if wall else None,
+            "latency_ms": summarize([item["latency"] for item in items]),
+            "ttft_ms": summarize([item["ttft"] for item in items if item["ttft"] is not None]),
+        }
+
+    return {
+        "total": stats(results),
+        "endpoints": {endpoint: stats(items) for endpoint, items in sorted(by_endpoint.items())},
+    }
+
+def print_report(summary: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    def fmt(value):
+        return f"{value:9.1f}" if value is not None else f"{'-':>9}"
+
+    def delta(new, old):
+        if new is None or not old:
+            return ""
+        return f" ({(new - old) / old * 100:+.0f}%)"
+
+    print(f"{'endpoint':<24}{'req':>6}{'err':>5}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'ttft p50':>10}")
+    rows = list(summary["endpoints"].items()) + [("total", summary["total"])]
+    for name, row in rows:
+        latency, ttft = row["latency_ms"], row["ttft_ms"]
+        print(
+            f"{name:<24}{row['requests']:>6}{row['errors']:>5}{row['throughput_rps']:>9.2f}"
+            f"{fmt(latency['p50'])}{fmt(latency['p95'])}{fmt(latency['p99'])}{fmt(ttft['p50']):>10}"
+        )
+        old = (baseline or {}).get("results", {})
+        old = old.get("total") if name == "total" else old.get("endpoints", {}).get(name)
+        if old:
+            print(
+                f"{'  vs baseline':<24}{'':>11}{delta(row['throughput_rps'], old['throughput_rps']):>9}"
+                f"{delta(latency['p50'], old['latency_ms']['p50']):>9}"
+                f"{delta(latency['p95'], old['latency_ms']['p95']):>9}"
+                f"{delta(latency['p99'], old['latency_ms']['p99']):>9}"
+            )
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    turns = load_workload(args.workload) if args.workload else generate_workload(args.sessions)
+
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{args.port}",
+        timeout=None,
+        limits=httpx.Limits(max_connections=args.concurrency * 2),
+    ) as client:
+        for _ in range(300):
+            try:
+                await client.get("/health")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+
+        if args.warmup:
+            await replay(client, generate_workload(args.warmup), args.concurrency)
+
+        await client.post("/bench/reset")
+        wall = time.perf_counter()
+        results = await replay(client, turns, args.concurrency)
+        wall = time.perf_counter() - wall
+        server = (await client.get("/bench/stats")).json()
+
+    return {
+        "config": vars(args),
+        "python": platform.python_version(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "wall_seconds": round(wall, 3),
+        "results": report(results, wall),
+        "server": server,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workload", help="JSONL workload; generated when omitted")
+    parser.add_argument("--sessions", type=int, default=40, help="sessions of the generated workload")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=2, help="warm-up sessions, not measured")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="median time to first token (s)")
+    parser.add_argument("--llm-sigma", type=float, default=0.3, help="lognormal sigma of the LLM latency")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--answer-tokens", type=int, default=60)
+    parser.add_argument("--search-latency", type=float, default=0.08, help="median vector search time (s)")
+    parser.add_argument("--search-sigma", type=float, default=0.5)
+    parser.add_argument("--no-prompt-cache", dest="prompt_cache", action="store_false",
+                        help="stand-in LLM reports no prompt tokens read from cache")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", default="load_test_results.json")
+    parser.add_argument("--baseline", help="earlier --output file to compare with")
+    parser.add_argument("--verbose", dest="quiet", action="store_false", help="keep the server's logs")
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(target=serve, args=(args.port, vars(args)), daemon=True)
+    server.start()
+    try:
+        output = asyncio.run(main(args))
+    finally:
+        server.terminate()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print_report(output["results"], baseline)
+    lag = output["server"]["event_loop_lag_ms"]
+    print(
+        f"event loop lag p50={lag['p50']}ms p99={lag['p99']}ms max={lag['max']}ms  "
+        f"server cpu={output['server']['cpu_seconds']}s  wall={output['wall_seconds']}s"
+    )
+    print(
+        f"prompt tokens={output['server']['prompt_tokens']} "
+        f"cached={output['server']['cached_prompt_tokens']} "
+        f"(hit ratio {output['server']['prompt_cache_hit_ratio']})"
+    )
+
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"results written to {args.output}")
@@ -0,0 +1,66 @@
+"""
+Query latency of the in-process retrieval backend against corpus size.
+
+Builds synthetic corpora of increasing size in a temporary directory and
+reports p50/p95 latency per search mode (vector, bm25, hybrid).
+
+    python benchmarks/local_index_latency.py --sizes 1000 10000 50000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(sys.path[0])
+os.environ.setdefault("MAX_REWRITE_ITERATIONS", "3")
+
+from models.local_index import LocalIndex, build_local_index
+
+
+def synthetic_docs(size: int, vocabulary: list, rng: random.Random) -> list:
+    return [
+        {
+            "id": str(i),
+            "text": " ".join(rng.choices(vocabulary, k=12)),
+            "text_answer": " ".join(rng.choices(vocabulary, k=40)),
+        }
+        for i in range(size)
+    ]
+
+
+def main(sizes: list, queries: int, top_k: int) -> None:
+    rng = random.Random(7)
+    vocabulary = [f"term{i}" for i in range(5000)]
+    query_texts = [" ".join(rng.choices(vocabulary, k=6)) for _ in range(queries)]
+
+    print(f"{'docs':>8} {'mode':<7} {'p50':>9} {'p95':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = f"{tmp}/{size}"
+            build_local_index(synthetic_docs(size, vocabulary, rng), path)
+            index = LocalIndex(path)
+
+            for mode in ("vector", "bm25", "hybrid"):
+                latencies = []
+                for text in query_texts:
+                    start = time.perf_counter()
+                    index.search(text, top_k, mode)
+                    latencies.append(time.perf_counter() - start)
+
+                p50 = statistics.median(latencies)
+                p95 = statistics.quantiles(latencies, n=20)[-1]
+                print(f"{size:>8} {mode:<7} {p50 * 1000:7.2f}ms {p95 * 1000:7.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    main(args.sizes, args.queries, args.top_k)
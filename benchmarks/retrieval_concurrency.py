@@ -0,0 +1,82 @@
+"""
+Show that a slow vector search no longer stalls the event loop.
+
+A stand-in index sleeps inside ``search`` (as the blocking Pinecone call
+does). While several ``retrieval_node`` calls are in flight, a ticker
+coroutine measures how late the loop wakes it up.
+
+    python benchmarks/retrieval_concurrency.py --latency 0.5 --searches 4
+
+The same check runs in tests/test_retrieval_concurrency.py.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(sys.path[0])
+os.environ.setdefault("MAX_REWRITE_ITERATIONS", "3")
+
+from models.retrieval import PineconeRetrievalClient
+from services.nodes.retrieval import retrieval_node
+
+
+class SlowIndex:
+    """Blocking stand-in for a Pinecone index."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def search(self, namespace, query, fields):
+        time.sleep(self.latency)
+        return {"result": {"hits": [
+            {"fields": {"text": query["inputs"]["text"], "text_answer": "stand-in answer"}}
+        ]}}
+
+    def close(self):
+        pass
+
+
+async def ticker(stop: asyncio.Event, interval: float = 0.01) -> dict:
+    ticks, max_lag = 0, 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - start - interval)
+        ticks += 1
+    return {"ticks": ticks, "max_lag": max_lag}
+
+
+async def main(latency: float, searches: int, concurrency: int) -> None:
+    client = PineconeRetrievalClient(SlowIndex(latency), max_concurrency=concurrency)
+    config = {"configurable": {"retrieval_client": client}}
+
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        retrieval_node({"query": f"question {i}"}, config) for i in range(searches)
+    ))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    ticks = await tick_task
+    client.close()
+
+    print(f"searches={searches} latency={latency}s concurrency={concurrency}")
+    print(f"wall time          : {elapsed:.3f}s")
+    print(f"ticker iterations  : {ticks['ticks']}")
+    print(f"max event-loop lag : {ticks['max_lag'] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--searches", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.latency, args.searches, args.concurrency))
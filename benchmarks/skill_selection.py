@@ -0,0 +1,135 @@
+"""
+Prompt-token savings and cost of relevance-based skill injection.
+
+Writes `--skills` synthetic skill files (one per domain / topic pair) to a
+temporary directory, indexes them with SkillRegistry and replays
+`--queries` user turns, each aimed at one skill. Reported:
+
+  - description tokens per prompt: all skills vs the selected top-k
+  - recall@k: how often the targeted skill is among the selected ones
+  - selection latency p50/p99, cold index build and hot reload time
+
+    python benchmarks/skill_selection.py --skills 300 --top-k 5 --output skills.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MAX_REWRITE_ITERATIONS", "3")
+
+from services.skill_registry import SkillRegistry
+
+
+DOMAINS = [
+    "billing", "payroll", "shipping", "inventory", "recruiting", "security", "travel",
+    "procurement", "warranty", "onboarding", "compliance", "marketing", "analytics",
+    "support", "facilities", "legal", "treasury", "insurance", "logistics", "training",
+]
+TOPICS = [
+    ("refund", "refunds, chargebacks and partial credits"),
+    ("invoice", "invoice numbering, due dates and late fees"),
+    ("approval", "approval chains, thresholds and escalations"),
+    ("report", "monthly reports, exports and dashboards"),
+    ("audit", "audit trails, retention periods and evidence"),
+    ("schedule", "calendars, deadlines and recurring schedules"),
+    ("contract", "contract terms, renewals and cancellations"),
+    ("access", "permissions, roles and access reviews"),
+    ("vendor", "vendor onboarding, scoring and offboarding"),
+    ("ticket", "ticket priorities, statuses and assignment"),
+    ("budget", "budget lines, forecasts and variance"),
+    ("claim", "claims intake, validation and payout"),
+    ("policy", "policy exceptions, waivers and sign-off"),
+    ("quota", "quotas, limits and overage handling"),
+    ("migration", "data migration, mapping and cut-over"),
+]
+QUESTIONS = [
+    "How do I handle {topic} for {domain}?",
+    "What is the {domain} rule for {detail}?",
+    "Can you check the {domain} {topic} process?",
+    "Who owns {detail} in {domain}?",
+]
+
+
+def write_skills(directory: str, count: int) -> list:
+    pairs = [(domain, topic) for domain in DOMAINS for topic in TOPICS][:count]
+    for domain, (topic, detail) in pairs:
+        with open(os.path.join(directory, f"{domain}_{topic}.md"), "w") as f:
+            f.write(
+                f"---\ndescription: {domain.capitalize()} {topic} handling: {detail}.\n---\n"
+                f"# {domain} {topic}\n\nStep by step procedure for {detail} in {domain}.\n"
+            )
+    return pairs
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skills", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--min-score", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        pairs = write_skills(directory, args.skills)
+        registry = SkillRegistry(directory=directory, reload_interval=0)
+
+        started = time.perf_counter()
+        registry.refresh()
+        build_ms = (time.perf_counter() - started) * 1000
+
+        latencies, hits = [], 0
+        for _ in range(args.queries):
+            domain, (topic, detail) = random.choice(pairs)
+            question = random.choice(QUESTIONS).format(domain=domain, topic=topic, detail=detail)
+            started = time.perf_counter()
+            selected = registry.select(question, args.top_k, args.min_score)
+            latencies.append((time.perf_counter() - started) * 1000)
+            hits += f"{domain}_{topic}" in {skill.name for skill in selected}
+
+        # hot reload: one edited file is re-read, the rest of the index is reused
+        os.utime(os.path.join(directory, f"{pairs[0][0]}_{pairs[0][1][0]}.md"), ns=(0, time.time_ns() + 10**9))
+        started = time.perf_counter()
+        registry.refresh()
+        reload_ms = (time.perf_counter() - started) * 1000
+
+        stats = registry.stats()
+
+    selections = stats["selections"]
+    report = {
+        "skills": stats["skills"],
+        "queries": selections,
+        "top_k": args.top_k,
+        "prompt_tokens_all_skills": stats["prompt_tokens_all"] / selections,
+        "prompt_tokens_injected": stats["prompt_tokens_injected"] / selections,
+        "prompt_tokens_saved_pct": round(100 * stats["prompt_tokens_saved"] / stats["prompt_tokens_all"], 1),
+        "avg_skills_injected": round(stats["avg_skills_injected"], 2),
+        "recall_at_k": round(hits / selections, 3),
+        "select_ms_p50": round(statistics.median(latencies), 3),
+        "select_ms_p99": round(percentile(latencies, 99), 3),
+        "index_build_ms": round(build_ms, 2),
+        "reload_one_file_ms": round(reload_ms, 2),
+    }
+
+    print(f"{report['skills']} skills, {report['queries']} turns, top-k {args.top_k}")
+    print(f"  description tokens / prompt: {report['prompt_tokens_all_skills']:.0f} all -> "
+          f"{report['prompt_tokens_injected']:.0f} injected ({report['prompt_tokens_saved_pct']}% saved)")
+    print(f"  recall@k {report['recall_at_k']}  avg injected {report['avg_skills_injected']}")
+    print(f"  select p50 {report['select_ms_p50']} ms  p99 {report['select_ms_p99']} ms")
+    print(f"  index build {report['index_build_ms']} ms  reload after one edit {report['reload_one_file_ms']} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,179 @@
+"""
+Frames per second and server CPU per stream of the SSE endpoints, before
+and after coalescing.
+
+A uvicorn server in a child process streams a stand-in agent graph whose
+fake chat model emits `--tokens` small chunks (paced by `--token-delay`).
+"before" reproduces the old generator: "messages" + "updates" stream modes
+and one json.dumps frame per chunk. "after" is agent_stream_events +
+SSEWriter as used by the router. Concurrent clients read both over HTTP.
+
+    python benchmarks/sse_framing.py --streams 20 --tokens 500 --token-delay 0.001
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import httpx
+import asyncio
+import uvicorn
+import argparse
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(sys.path[0])
+os.environ.setdefault("MAX_REWRITE_ITERATIONS", "3")
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, MessagesState, StateGraph
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from utils.sse import SSEWriter
+from services.streaming import agent_stream_events
+
+
+class PacedFakeModel(GenericFakeChatModel):
+    """Fake chat model emitting one short chunk per token, like a real LLM stream."""
+
+    token_delay: float = 0.0
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = next(self.messages)
+        for token in message.content.split(" "):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def make_agent(tokens: int, token_delay: float):
+    answer = " ".join(f"tok{i}" for i in range(tokens))
+
+    def messages():
+        while True:
+            yield AIMessage(content=answer)
+
+    model = PacedFakeModel(messages=messages(), token_delay=token_delay)
+
+    async def model_node(state):
+        return {"messages": [await model.ainvoke(state["messages"])]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("model", model_node)
+    builder.set_entry_point("model")
+    builder.add_edge("model", END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+async def before(agent, inputs, config):
+    """The previous chat_stream_generator."""
+    async for mode_stream, chunk in agent.astream(inputs, config, stream_mode=["messages", "updates"]):
+        if mode_stream == "messages":
+            message_chunk, metadata = chunk
+            chunk_data = {"type": metadata["langgraph_node"], "content": message_chunk.content}
+            yield f"data: {json.dumps(chunk_data)}\n\n"
+        elif "__interrupt__" in chunk:
+            yield f"data: {json.dumps({'type': 'interrupt', 'content': 'interrupt received'})}\n\n"
+
+
+async def after(agent, inputs, config, writer):
+    async for frame in writer.stream(agent_stream_events(agent, inputs, config)):
+        yield frame
+
+
+def make_app(tokens: int, token_delay: float, writer: SSEWriter) -> FastAPI:
+    agent = make_agent(tokens, token_delay)
+    app = FastAPI()
+
+    def inputs(query):
+        return {"messages": [{"role": "user", "content": query}]}
+
+    def config():
+        return {"configurable": {"thread_id": str(uuid.uuid4())}}
+
+    @app.get("/before")
+    async def stream_before(q: str = "question"):
+        return StreamingResponse(before(agent, inputs(q), config()), media_type="text/event-stream")
+
+    @app.get("/after")
+    async def stream_after(q: str = "question"):
+        return StreamingResponse(after(agent, inputs(q), config(), writer), media_type="text/event-stream")
+
+    @app.get("/cpu")
+    async def cpu():
+        return {"cpu": time.process_time()}
+
+    return app
+
+
+def serve(port: int, tokens: int, token_delay: float, flush_interval: float, flush_bytes: int) -> None:
+    writer = SSEWriter(flush_interval=flush_interval, flush_bytes=flush_bytes)
+    uvicorn.run(make_app(tokens, token_delay, writer), port=port, log_level="warning")
+
+
+async def run(client: httpx.AsyncClient, label: str, streams: int) -> None:
+    async def consume(i):
+        frames = 0
+        async with client.stream("GET", f"/{label}", params={"q": f"question {i}"}) as response:
+            async for line in response.aiter_lines():
+                frames += line.startswith("data:")
+        return frames
+
+    cpu = (await client.get("/cpu")).json()["cpu"]
+    wall = time.perf_counter()
+    frames = sum(await asyncio.gather(*(consume(i) for i in range(streams))))
+    wall = time.perf_counter() - wall
+    cpu = (await client.get("/cpu")).json()["cpu"] - cpu
+
+    print(
+        f"{label:<7} frames={frames:>7} frames/s={frames / wall:>9.0f} "
+        f"server cpu/stream={cpu / streams * 1000:7.1f}ms wall={wall:.2f}s"
+    )
+
+
+async def main(port: int, streams: int, rounds: int) -> None:
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+        for _ in range(100):
+            try:
+                await client.get("/cpu")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+
+        for _ in range(rounds):
+            await run(client, "before", streams)
+            await run(client, "after", streams)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=20)
+    parser.add_argument("--tokens", type=int, default=500)
+    parser.add_argument("--token-delay", type=float, default=0.001)
+    parser.add_argument("--flush-interval", type=float, default=0.05)
+    parser.add_argument("--flush-bytes", type=int, default=512)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(
+        f"streams={args.streams} tokens={args.tokens} token_delay={args.token_delay}s "
+        f"flush_interval={args.flush_interval}s flush_bytes={args.flush_bytes}"
+    )
+    server = multiprocessing.Process(
+        target=serve,
+        args=(args.port, args.tokens, args.token_delay, args.flush_interval, args.flush_bytes),
+        daemon=True,
+    )
+    server.start()
+    try:
+        asyncio.run(main(args.port, args.streams, args.rounds))
+    finally:
+        server.terminate()
@@ -0,0 +1,228 @@
+"""
+Stand-ins for the paid backends, for benchmarks and load tests.
+
+StandInChatModel answers like the real agent model: a rag_search tool call
+for a fresh question, a streamed answer otherwise, and canned structured
+output for grading / query variants. Like Gemini's implicit caching and
+DeepSeek's context cache, it reports the leading messages it has already
+seen as prompt tokens read from cache. StandInRetrievalClient blocks like a
+Pinecone search. Both draw their latency from a lognormal distribution
+(median, sigma) so tail latency looks like a real upstream.
+
+    install(LatencyModel(0.4, 0.3), 50, 60, search=LatencyModel(0.08, 0.5))
+
+must run before main_client (or anything calling get_model) is imported.
+"""
+import json
+import math
+import time
+import uuid
+import random
+import asyncio
+
+from typing import Any, AsyncIterator, Dict, List, Optional
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.chat_models import agenerate_from_stream
+
+from models.retrieval import RetrievalClient
+
+
+# hashes of every message prefix sent so far, shared by all stand-in models
+# (like a provider-side cache, it outlives any one client)
+PREFIX_CACHE: set = set()
+PREFIX_CACHE_MAX = 100_000
+
+
+class LatencyModel:
+    """Lognormal latency in seconds: `median` and the sigma of its log."""
+
+    def __init__(self, median: float, sigma: float = 0.0):
+        self.median = median
+        self.sigma = sigma
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        if not self.sigma:
+            return self.median
+        return random.lognormvariate(math.log(self.median), self.sigma)
+
+
+class StandInChatModel(BaseChatModel):
+    """Chat model with a configurable time to first token and token rate."""
+
+    first_token_median: float = 0.4
+    first_token_sigma: float = 0.3
+    tokens_per_second: float = 50.0
+    answer_tokens: int = 60
+    prompt_cache: bool = True
+    # set on the copy returned by bind_tools (the agent's model)
+    call_tools: bool = False
+    tool_name: str = "rag_search"
+
+    @property
+    def _llm_type(self) -> str:
+        return "stand-in"
+
+    def bind_tools(self, tools, **kwargs) -> "StandInChatModel":
+        return self.model_copy(update={"call_tools": True})
+
+    def with_structured_output(self, schema, **kwargs):
+        if not isinstance(schema, dict):
+            schema = schema.model_json_schema()
+        properties = schema.get("properties", {})
+
+        def answer(prompt) -> Dict[str, Any]:
+            if "binary_score" in properties:
+                return {"binary_score": "yes"}
+            return {"queries": [f"variant {i} of {str(prompt)[-40:]}" for i in range(3)]}
+
+        def respond(prompt):
+            time.sleep(self._first_token_delay())
+            return answer(prompt)
+
+        async def arespond(prompt):
+            await asyncio.sleep(self._first_token_delay())
+            return answer(prompt)
+
+        return RunnableLambda(respond, afunc=arespond)
+
+    def _first_token_delay(self) -> float:
+        return LatencyModel(self.first_token_median, self.first_token_sigma).sample()
+
+    def _check_tool_calls(self, messages: List[BaseMessage]) -> None:
+        """Reject unanswered tool calls in the history, as the real providers do (HTTP 400)."""
+        open_calls = set()
+        for message in messages:
+            if isinstance(message, AIMessage):
+                if open_calls:
+                    break
+                open_calls = {call["id"] for call in message.tool_calls}
+            elif isinstance(message, ToolMessage):
+                open_calls.discard(message.tool_call_id)
+            elif open_calls:
+                break
+        if open_calls:
+            raise ValueError(f"tool calls without a tool result: {sorted(open_calls)}")
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        self._check_tool_calls(messages)
+        last = messages[-1] if messages else None
+        if self.call_tools and isinstance(last, HumanMessage):
+            return AIMessage(content="", tool_calls=[{
+                "name": self.tool_name,
+                "args": {"query": str(last.content)},
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+            }])
+        return AIMessage(content=" ".join(f"token{i}" for i in range(self.answer_tokens)))
+
+    def _cached_tokens(self, messages: List[BaseMessage], tokens: List[int]) -> int:
+        """Tokens of the longest message prefix sent before; remembers this one."""
+        if not self.prompt_cache:
+            return 0
+        if len(PREFIX_CACHE) > PREFIX_CACHE_MAX:
+            PREFIX_CACHE.clear()
+
+        cached, hit, prefix = 0, True, ()
+        for message, count in zip(messages, tokens):
+            prefix = hash((prefix, message.type, str(message.content)))
+            if hit and prefix in PREFIX_CACHE:
+                cached += count
+            else:
+                hit = False
+                PREFIX_CACHE.add(prefix)
+        return cached
+
+    def _usage(self, messages: List[BaseMessage], reply: AIMessage) -> Dict[str, Any]:
+        tokens = [len(str(message.content)) // 4 for message in messages]
+        prompt_tokens = sum(tokens)
+        completion_tokens = len(str(reply.content)) // 4 + 8 * len(reply.tool_calls)
+        return {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "input_token_details": {"cache_read": self._cached_tokens(messages, tokens)},
+        }
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        reply = self._reply(messages)
+        time.sleep(self._first_token_delay() + self.answer_tokens / self.tokens_per_second)
+        reply.usage_metadata = self._usage(messages, reply)
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        reply = self._reply(messages)
+        await asyncio.sleep(self._first_token_delay())
+
+        if reply.tool_calls:
+            call = reply.tool_calls[0]
+            chunks = [AIMessageChunk(content="", tool_call_chunks=[{
+                "name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0,
+            }])]
+        else:
+            words = str(reply.content).split(" ")
+            chunks = [AIMessageChunk(content=word + " ") for word in words]
+
+        interval = 1 / self.tokens_per_second if self.tokens_per_second else 0
+        for i, message in enumerate(chunks):
+            if i and interval:
+                await asyncio.sleep(interval)
+            if i == len(chunks) - 1:
+                message.usage_metadata = self._usage(messages, reply)
+            chunk = ChatGenerationChunk(message=message)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return await agenerate_from_stream(self._astream(messages, stop, run_manager, **kwargs))
+
+
+class StandInRetrievalClient(RetrievalClient):
+    """Blocking search (like the Pinecone SDK) with lognormal latency."""
+
+    def __init__(self, latency: LatencyModel, docs: Optional[List[str]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.docs = docs or [
+            "To reset a password open Settings, choose Security and follow the reset link.",
+            "Tickets are prioritised as low, medium, high or urgent by the support team.",
+            "Billing questions are answered by the finance desk within two working days.",
+        ]
+
+    def search(self, namespace: str, query: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+        time.sleep(self.latency.sample())
+        text = query["inputs"]["text"]
+        return {"result": {"hits": [
+            {"_id": str(i), "_score": 1 / (i + 1), "fields": {"text": f"{text} {doc}", "text_answer": doc}}
+            for i, doc in enumerate(self.docs)
+        ]}}
+
+
+def install(
+    llm_first_token: LatencyModel,
+    tokens_per_second: float,
+    answer_tokens: int,
+    search: LatencyModel,
+    prompt_cache: bool = True,
+) -> None:
+    """Make get_model() and the shared retrieval client return the stand-ins."""
+    import models.llm as llm
+    import models.retrieval as retrieval
+
+    def build(model_name, **params):
+        return StandInChatModel(
+            first_token_median=llm_first_token.median,
+            first_token_sigma=llm_first_token.sigma,
+            tokens_per_second=tokens_per_second,
+            answer_tokens=answer_tokens,
+            prompt_cache=prompt_cache,
+            callbacks=params.get("callbacks"),
+        )
+
+    llm.PROVIDERS["stand-in"] = {"builder": build, "model_name_env": "STAND_IN_MODEL_NAME", "params": {}}
+    llm.LLM_PROVIDER = "stand-in"
+    retrieval.RETRIEVAL_CLIENT = StandInRetrievalClient(search)
@@ -4,7 +4,6 @@ import json
 from pathlib import Path
 from typing import Any, Dict, List
 
-from utils.helpers import read_skill_md
 
 
 def parse_value(value: str) -> Any:
@@ -40,7 +39,8 @@ MIDDLEWARE_LIST_TOOLS = {}
 
 USED_MIDDLEWARE = [
     'tool_call_limit',
-    'hitl'
+    'hitl',
+    'skill'
 ]
 
 SKILLS = [
@@ -50,8 +50,155 @@ SKILLS = [
     }
 ]
 
-for skill in SKILLS:
-    path_skill_md = f"{PATH}/services/skills/{skill['name']}.md"
-    skill["content"] = read_skill_md(path_skill_md)
+# every SKILLS_DIR/<name>.md is a skill; SKILLS only supplies descriptions (files
+# not listed use their `description:` front matter). Indexed by services.skill_registry,
+# which picks up added / edited files every SKILL_RELOAD_INTERVAL seconds.
+SKILLS_DIR = os.getenv('SKILLS_DIR', f"{PATH}/services/skills")
+SKILL_RELOAD_INTERVAL = float(os.getenv('SKILL_RELOAD_INTERVAL', 2))
+# only the SKILL_TOP_K skills most relevant to the user turn are described in the prompt
+SKILL_TOP_K = int(os.getenv('SKILL_TOP_K', 5))
+SKILL_MIN_SCORE = float(os.getenv('SKILL_MIN_SCORE', 0.1))
 
-MAX_REWRITE_ITERATIONS = int(os.getenv('MAX_REWRITE_ITERATIONS'))
\ No newline at end of file
+MAX_REWRITE_ITERATIONS = int(os.getenv('MAX_REWRITE_ITERATIONS'))
+
+PINECONE_POOL_SIZE = int(os.getenv('PINECONE_POOL_SIZE', 10))
+PINECONE_POOL_THREADS = int(os.getenv('PINECONE_POOL_THREADS', 1))
+PINECONE_KEEPALIVE_IDLE = int(os.getenv('PINECONE_KEEPALIVE_IDLE', 300))
+
+# "pinecone" or "local" (in-process vector / BM25 / hybrid index)
+RETRIEVAL_BACKEND = os.getenv('RETRIEVAL_BACKEND', 'pinecone')
+LOCAL_INDEX_PATH = os.getenv('LOCAL_INDEX_PATH', f"{PATH}/local_index")
+LOCAL_INDEX_MODE = os.getenv('LOCAL_INDEX_MODE', 'hybrid')
+LOCAL_INDEX_ALPHA = float(os.getenv('LOCAL_INDEX_ALPHA', 0.5))
+RETRIEVAL_MAX_CONCURRENCY = int(os.getenv('RETRIEVAL_MAX_CONCURRENCY', 8))
+RETRIEVAL_TIMEOUT = float(os.getenv('RETRIEVAL_TIMEOUT', 10))
+
+ANSWER_CACHE_SIZE = int(os.getenv('ANSWER_CACHE_SIZE', 1024))
+ANSWER_CACHE_TTL = float(os.getenv('ANSWER_CACHE_TTL', 3600))
+# 1 = exact normalized match only; below 1 also serves near-duplicates (opt-in),
+# never across different numbers or negations
+ANSWER_CACHE_THRESHOLD = float(os.getenv('ANSWER_CACHE_THRESHOLD', 1.0))
+
+RETRIEVAL_TOP_K = int(os.getenv('RETRIEVAL_TOP_K', 10))
+
+# concurrent identical rag_search / retrieval calls share one in-flight run
+SINGLE_FLIGHT = parse_value(os.getenv('SINGLE_FLIGHT', 'true'))
+
+# "single" or "multi_query" (LLM query variants searched concurrently, fused with RRF)
+RETRIEVAL_MODE = os.getenv('RETRIEVAL_MODE', 'single')
+MULTI_QUERY_COUNT = int(os.getenv('MULTI_QUERY_COUNT', 3))
+MULTI_QUERY_CONCURRENCY = int(os.getenv('MULTI_QUERY_CONCURRENCY', 4))
+RRF_K = int(os.getenv('RRF_K', 60))
+
+# prompt context for grading / generation: dedup, MMR order, token budget;
+# 0 (default) sends the retrieved docs unchanged, a budget opts in to packing
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', 0))
+CONTEXT_DOC_MAX_TOKENS = int(os.getenv('CONTEXT_DOC_MAX_TOKENS', 512))
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv('CONTEXT_DEDUP_THRESHOLD', 0.8))
+CONTEXT_MMR_LAMBDA = float(os.getenv('CONTEXT_MMR_LAMBDA', 0.7))
+CONTEXT_CACHE_SIZE = int(os.getenv('CONTEXT_CACHE_SIZE', 1024))
+CONTEXT_CACHE_TTL = float(os.getenv('CONTEXT_CACHE_TTL', 600))
+
+NODE_CACHE_CONFIG = {
+    "rewrite_question": {
+        "maxsize": int(os.getenv('REWRITE_CACHE_SIZE', 1024)),
+        "ttl": float(os.getenv('REWRITE_CACHE_TTL', 3600)),
+    },
+    "retrieval_node": {
+        "maxsize": int(os.getenv('RETRIEVAL_CACHE_SIZE', 1024)),
+        "ttl": float(os.getenv('RETRIEVAL_CACHE_TTL', 600)),
+    },
+    "multi_query": {
+        "maxsize": int(os.getenv('MULTI_QUERY_CACHE_SIZE', 1024)),
+        "ttl": float(os.getenv('MULTI_QUERY_CACHE_TTL', 3600)),
+    },
+}
+
+# "memory" keeps every checkpoint (get_state_history / time travel work);
+# "bounded_memory" is opt-in and keeps only CHECKPOINTER_MAX_CHECKPOINTS per thread
+CHECKPOINTER_BACKEND = os.getenv('CHECKPOINTER_BACKEND', 'memory')
+CHECKPOINTER_SQLITE_PATH = os.getenv('CHECKPOINTER_SQLITE_PATH', f"{PATH}/checkpoints.sqlite")
+CHECKPOINTER_BATCH_INTERVAL = float(os.getenv('CHECKPOINTER_BATCH_INTERVAL', 0.002))
+
+
+CHECKPOINTER_MEMORY_CONFIG = {
+    "max_checkpoints": int(os.getenv('CHECKPOINTER_MAX_CHECKPOINTS', 4)),
+    "max_threads": int(os.getenv('CHECKPOINTER_MAX_THREADS', 10000)),
+    "thread_ttl": float(os.getenv('CHECKPOINTER_THREAD_TTL', 86400)),
+    "delta_messages": parse_value(os.getenv('CHECKPOINTER_DELTA_MESSAGES', 'false')),
+}
+# "overlap", "bm25" or "off" (default); scores >= high are graded "yes" without the
+# LLM. The stopword list is English, so a local "no" (score <= low) is opt-in:
+# unset, low scores still go to the LLM grader
+GRADE_LOCAL_SCORER = os.getenv('GRADE_LOCAL_SCORER', 'off')
+GRADE_HIGH_THRESHOLD = float(os.getenv('GRADE_HIGH_THRESHOLD', 0.85))
+GRADE_LOW_THRESHOLD = (
+    float(os.getenv('GRADE_LOW_THRESHOLD')) if os.getenv('GRADE_LOW_THRESHOLD') else None
+)
+
+# start the next rewrite while the LLM grades; cancelled if grading passes
+SPECULATIVE_REWRITE = parse_value(os.getenv('SPECULATIVE_REWRITE', 'false'))
+
+# SSE streaming: merge token chunks for up to the interval / size, heartbeat when idle
+SSE_FLUSH_INTERVAL = float(os.getenv('SSE_FLUSH_INTERVAL', 0.05))
+SSE_FLUSH_BYTES = int(os.getenv('SSE_FLUSH_BYTES', 512))
+SSE_HEARTBEAT_INTERVAL = float(os.getenv('SSE_HEARTBEAT_INTERVAL', 15))
+
+# admission control: concurrent agent runs, queued requests and their max wait (seconds)
+MAX_INFLIGHT_REQUESTS = int(os.getenv('MAX_INFLIGHT_REQUESTS', 32))
+MAX_QUEUED_REQUESTS = int(os.getenv('MAX_QUEUED_REQUESTS', 64))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 5))
+
+# upstream rate limits (0 disables); calls that would wait longer than
+# RATE_LIMIT_MAX_WAIT seconds fail fast with a 429 instead
+LLM_REQUESTS_PER_MINUTE = float(os.getenv('LLM_REQUESTS_PER_MINUTE', 0))
+LLM_TOKENS_PER_MINUTE = float(os.getenv('LLM_TOKENS_PER_MINUTE', 0))
+RETRIEVAL_QPS = float(os.getenv('RETRIEVAL_QPS', 0))
+RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', 2))
+
+# one run per thread_id at a time; what a request does when its session is
+# busy, per endpoint: "queue", "reject" (409) or "supersede" (cancel the running one)
+SESSION_RUN_POLICIES = {
+    "generate-answer": os.getenv('SESSION_POLICY_GENERATE', 'queue'),
+    "continue-answer": os.getenv('SESSION_POLICY_CONTINUE', 'reject'),
+    "stream/generate-answer": os.getenv('SESSION_POLICY_STREAM_GENERATE', 'supersede'),
+    "stream/continue-answer": os.getenv('SESSION_POLICY_STREAM_CONTINUE', 'reject'),
+}
+SESSION_QUEUE_TIMEOUT = float(os.getenv('SESSION_QUEUE_TIMEOUT', 30))
+SESSION_MAX_IDLE = int(os.getenv('SESSION_MAX_IDLE', 10000))
+
+# /debug endpoints (stats, cache invalidation, skill reload) have no auth of their
+# own; off unless the deployment keeps them off the public network
+DEBUG_ENDPOINTS_ENABLED = parse_value(os.getenv('DEBUG_ENDPOINTS_ENABLED', 'false'))
+
+# key for the always-mounted /admin endpoints (X-Admin-Key header); unset
+# rejects every admin call
+ADMIN_API_KEY = os.getenv('ADMIN_API_KEY')
+
+# latency histograms / counters served at GET /metrics (Prometheus text format)
+METRICS_ENABLED = parse_value(os.getenv('METRICS_ENABLED', 'true'))
+
+# token accounting per run / session; prices in USD per 1M tokens (0 = not priced)
+LLM_PROMPT_COST_PER_1M = float(os.getenv('LLM_PROMPT_COST_PER_1M', 0))
+LLM_COMPLETION_COST_PER_1M = float(os.getenv('LLM_COMPLETION_COST_PER_1M', 0))
+# prompt tokens the provider served from its prefix cache (billed at a discount)
+LLM_CACHED_PROMPT_COST_PER_1M = float(
+    os.getenv('LLM_CACHED_PROMPT_COST_PER_1M', LLM_PROMPT_COST_PER_1M)
+)
+# once spent (0 disables), the RAG rewrite loop stops and answers with what it has
+RUN_TOKEN_BUDGET = int(os.getenv('RUN_TOKEN_BUDGET', 0))
+SESSION_TOKEN_BUDGET = int(os.getenv('SESSION_TOKEN_BUDGET', 0))
+SESSION_USAGE_MAX = int(os.getenv('SESSION_USAGE_MAX', 10000))
+
+# startup warm-up: build the LLM client and run WARMUP_QUERY through the RAG graph
+# before GET /ready reports ready; if not required, a failed warm-up still reports ready
+WARMUP_ENABLED = parse_value(os.getenv('WARMUP_ENABLED', 'true'))
+WARMUP_REQUIRED = parse_value(os.getenv('WARMUP_REQUIRED', 'true'))
+WARMUP_QUERY = os.getenv('WARMUP_QUERY', 'What can you help me with?')
+WARMUP_TIMEOUT = float(os.getenv('WARMUP_TIMEOUT', 30))
+# full attempts before the status reads "failed"; after that only the connections
+# are re-checked in the background, without the LLM query (backoff doubling from
+# WARMUP_RETRY_DELAY up to WARMUP_MAX_RETRY_DELAY)
+WARMUP_RETRIES = int(os.getenv('WARMUP_RETRIES', 3))
+WARMUP_RETRY_DELAY = float(os.getenv('WARMUP_RETRY_DELAY', 2))
+WARMUP_MAX_RETRY_DELAY = float(os.getenv('WARMUP_MAX_RETRY_DELAY', 60))
@@ -26,8 +26,16 @@ class GradeDocuments(BaseModel):
         description="Relevance score: 'yes' if relevant, or 'no' if not relevant"
     )
 
+class QueryVariants(BaseModel):
+    """Alternative search queries for one question."""
+    queries: list[str] = Field(
+        description="Alternative search queries, one per item"
+    )
+
 class RAGState(MessagesState):
     query: str
     retrieved_docs: list[str]
     final_answer: str
-    iteration_count: int
\ No newline at end of file
+    iteration_count: int
+    # the docs passed grading (not the max-iterations / token-budget fail-safe)
+    grounded: bool
\ No newline at end of file
@@ -31,6 +31,20 @@ REWRITE_PROMPT = ChatPromptTemplate.from_messages(
     [("system", REWRITE_SYSTEM_TEMPLATE), ("user", REWRITE_USER_TEMPLATE)]
 )
 
+MULTI_QUERY_SYSTEM_TEMPLATE = """
+You are a search query generator. Given a user question, write {count} alternative search queries that could retrieve documents answering it from a knowledge base.
+Vary the wording, use synonyms and related terms, and split compound questions into their parts. Keep each query short and self-contained.
+"""
+
+MULTI_QUERY_USER_TEMPLATE = """
+Original question: 
+{question}
+"""
+
+MULTI_QUERY_PROMPT = ChatPromptTemplate.from_messages(
+    [("system", MULTI_QUERY_SYSTEM_TEMPLATE), ("user", MULTI_QUERY_USER_TEMPLATE)]
+)
+
 GRADE_SYSTEM_TEMPLATE = """
 You are a document relevance grader. Given a question and a set of retrieved documents, determine whether the documents are relevant to the question.
 Return a binary score: 'yes' if the documents are relevant, 'no' if they are not.
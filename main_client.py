@@ -1,15 +1,25 @@
 import gc
+import asyncio
 import uvicorn
 import traceback
 
 from typing import Dict
 from fastapi import FastAPI, status
 from contextlib import asynccontextmanager
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from routers import all_router
 from constants.log import LOGGER
+from constants.config import METRICS_ENABLED
+from utils.metrics import CONTENT_TYPE_LATEST, render_metrics
+from services.metrics import HTTPMetricsMiddleware
+from utils.ratelimit import RateLimitExceeded
+from services.session_runs import SessionBusy, RunSuperseded
+from services.nodes import get_rag_graph
+from services.warmup import run_warm_up, readiness
 from services.agent_manager import make_graph_single
+from services.checkpointers import close_checkpointer
+from models.retrieval import init_retrieval_client, close_retrieval_client
 
 
 @asynccontextmanager
@@ -17,16 +27,25 @@ async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     app.context = {}
     
+    app.context["retrieval_client"] = init_retrieval_client()
     app.context["single_agent"] = await make_graph_single()
+    # compiled here rather than on the first rag_search call
+    app.context["rag_graph"] = get_rag_graph()
     
     # Startup
     LOGGER.info("Starting FastAPI application")
+
+    # runs in the background; GET /ready turns 200 once it is done
+    warm_up = asyncio.create_task(run_warm_up())
     
     yield
     
     # Shutdown - Clean up resources
     LOGGER.info("Shutting down FastAPI application")
     
+    warm_up.cancel()
+    close_retrieval_client()
+    await close_checkpointer()
     app.context.clear()
     
     # Force garbage collection
@@ -41,6 +60,40 @@ app = FastAPI(
 
 app.include_router(all_router)
 
+if METRICS_ENABLED:
+    app.add_middleware(HTTPMetricsMiddleware)
+
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exception_handler(request, exc):
+    """
+    Overload / upstream quota: fail fast with 429 and Retry-After
+    """
+    LOGGER.warning(f"Rejected {request.method} {request.url.path}: {exc}")
+
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": exc.retry_after_header},
+        content={
+            "status": "error",
+            "message": str(exc),
+            "retry_after": exc.retry_after_header
+        }
+    )
+
+@app.exception_handler(SessionBusy)
+@app.exception_handler(RunSuperseded)
+async def session_busy_exception_handler(request, exc):
+    """
+    Another run is in progress on (or took over) the same session
+    """
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={
+            "status": "error",
+            "message": str(exc)
+        }
+    )
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -64,5 +117,19 @@ async def global_exception_handler(request, exc):
 async def health_check() -> Dict[str, str]:
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check() -> JSONResponse:
+    """200 once the startup warm-up succeeded, 503 until then (it keeps retrying)."""
+    ready, state = readiness()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=state
+    )
+
+@app.get("/metrics", response_class=Response)
+async def metrics() -> Response:
+    """Latency histograms and counters in the Prometheus text format."""
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     uvicorn.run("main_client:app", port=2707, reload=True, log_config="log.ini")
\ No newline at end of file
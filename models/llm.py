@@ -1,32 +1,259 @@
 import os
+import time
+import asyncio
+import threading
 
-from langchain_deepseek import ChatDeepSeek
-from langchain_google_genai import ChatGoogleGenerativeAI
+from uuid import UUID
+from typing import Any, Dict, Tuple
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
 
+from utils.helpers import estimate_tokens
+from utils.usage import RUN_USAGE, RunUsage
+from utils.ratelimit import RateLimitExceeded, TokenBucket
+from constants.config import (
+    LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, RATE_LIMIT_MAX_WAIT
+)
 
-def get_model() -> ChatGoogleGenerativeAI:
-    llm = ChatGoogleGenerativeAI(
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+
+# provider quotas, shared by every model instance
+LLM_REQUEST_LIMITER = TokenBucket.per_minute(LLM_REQUESTS_PER_MINUTE)
+LLM_TOKEN_LIMITER = TokenBucket.per_minute(LLM_TOKENS_PER_MINUTE)
+
+
+# per-call state kept by the callbacks below between start and end; a call
+# whose end is never reported (e.g. its task was cancelled) is dropped, oldest first
+MAX_TRACKED_CALLS = 1024
+
+
+def _track(pending: Dict[UUID, Any], run_id: UUID, value: Any, limit: int = MAX_TRACKED_CALLS) -> None:
+    while len(pending) >= limit:
+        pending.pop(next(iter(pending)), None)
+    pending[run_id] = value
+
+
+class ModelStatsCallback(BaseCallbackHandler):
+    """Count calls and time spent per cached model instance."""
+
+    # called on the event loop, not in an executor thread, so `_started`
+    # is only ever touched from one thread
+    run_inline = True
+    max_in_flight = MAX_TRACKED_CALLS
+
+    def __init__(self, stats: Dict[str, Any]):
+        self.stats = stats
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        self.stats["calls"] += 1
+        _track(self._started, run_id, time.perf_counter(), self.max_in_flight)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            self.stats["call_seconds"] += time.perf_counter() - started
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self.stats["errors"] += 1
+        self._started.pop(run_id, None)
+
+
+class RateLimitCallback(AsyncCallbackHandler):
+    """
+    Hold chat model calls to the requests/min and tokens/min quotas.
+    Prompt tokens are estimated when the call starts and corrected with the
+    reported usage when it ends. A call that would wait longer than
+    RATE_LIMIT_MAX_WAIT raises RateLimitExceeded before reaching the provider.
+    """
+
+    raise_error = True
+    run_inline = True
+    max_in_flight = MAX_TRACKED_CALLS
+
+    def __init__(self):
+        self._charged: Dict[UUID, int] = {}
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        prompt_tokens = sum(
+            estimate_tokens(str(message.content)) for batch in messages for message in batch
+        )
+        wait = max(
+            LLM_REQUEST_LIMITER.wait_time(1),
+            LLM_TOKEN_LIMITER.wait_time(prompt_tokens),
+        )
+        if wait > RATE_LIMIT_MAX_WAIT:
+            LLM_REQUEST_LIMITER.rejections += 1
+            raise RateLimitExceeded("LLM rate limit reached", retry_after=wait)
+
+        LLM_REQUEST_LIMITER.consume(1)
+        LLM_TOKEN_LIMITER.consume(prompt_tokens)
+        _track(self._charged, run_id, prompt_tokens, self.max_in_flight)
+        if wait > 0:
+            LLM_REQUEST_LIMITER.waits += 1
+            await asyncio.sleep(wait)
+
+    async def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        charged = self._charged.pop(run_id, 0)
+        message = getattr(response.generations[0][0], "message", None) if response.generations else None
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            LLM_TOKEN_LIMITER.consume(usage.get("total_tokens", 0) - charged)
+
+    async def on_llm_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self._charged.pop(run_id, None)
+
+RATE_LIMIT_CALLBACK = RateLimitCallback()
+
+
+class UsageCallback(BaseCallbackHandler):
+    """
+    Charge each chat model call to the RunUsage of the run that made it,
+    under the langgraph node it ran in. Uses the provider's usage metadata
+    (including prompt tokens read from its prefix cache), falling back to
+    estimates when the provider reports none.
+    """
+
+    run_inline = True
+    max_in_flight = MAX_TRACKED_CALLS
+
+    def __init__(self):
+        self._pending: Dict[UUID, Tuple[RunUsage, str, int]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs) -> None:
+        usage = RUN_USAGE.get()
+        if usage is None:
+            return
+        node = (metadata or {}).get("langgraph_node", "other")
+        estimate = sum(
+            estimate_tokens(str(message.content)) for batch in messages for message in batch
+        )
+        _track(self._pending, run_id, (usage, node, estimate), self.max_in_flight)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+        usage, node, estimate = pending
+
+        generation = response.generations[0][0] if response.generations else None
+        reported = getattr(getattr(generation, "message", None), "usage_metadata", None)
+        if reported:
+            # Gemini and DeepSeek both report prefix-cache hits as cache_read
+            cached = (reported.get("input_token_details") or {}).get("cache_read") or 0
+            usage.add(node, reported.get("input_tokens", 0), reported.get("output_tokens", 0), cached)
+        else:
+            usage.add(node, estimate, estimate_tokens(generation.text if generation else ""))
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self._pending.pop(run_id, None)
+
+USAGE_CALLBACK = UsageCallback()
+
+
+# Provider SDKs are imported by their builder, so only the configured one is loaded
+def _build_gemini(model_name: str, **params) -> BaseChatModel:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
         api_key=os.getenv("GEMINI_API_KEY"),
-        model=os.getenv("GEMINI_MODEL_NAME"),
-        temperature=0.4,
-        top_k=32,
-        top_p=1,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        streaming=True,
+        model=model_name,
+        **params,
     )
-    return llm
-
-# def get_model() -> ChatDeepSeek:
-#     llm = ChatDeepSeek(
-#         api_key=os.getenv("DEEPSEEK_API_KEY"),
-#         model=os.getenv("DEEPSEEK_MODEL_NAME"),
-#         base_url=os.getenv("DEEPSEEK_BASE_URL"),
-#         temperature=0,
-#         max_tokens=None,
-#         timeout=None,
-#         max_retries=2,
-#         streaming=True,
-#     )
-#     return llm
\ No newline at end of file
+
+def _build_deepseek(model_name: str, **params) -> BaseChatModel:
+    from langchain_deepseek import ChatDeepSeek
+
+    return ChatDeepSeek(
+        api_key=os.getenv("DEEPSEEK_API_KEY"),
+        model=model_name,
+        base_url=os.getenv("DEEPSEEK_BASE_URL"),
+        **params,
+    )
+
+PROVIDERS = {
+    "gemini": {
+        "builder": _build_gemini,
+        "model_name_env": "GEMINI_MODEL_NAME",
+        "params": {
+            "temperature": 0.4,
+            "top_k": 32,
+            "top_p": 1,
+            "max_tokens": None,
+            "timeout": None,
+            "max_retries": 2,
+            "streaming": True,
+        },
+    },
+    "deepseek": {
+        "builder": _build_deepseek,
+        "model_name_env": "DEEPSEEK_MODEL_NAME",
+        "params": {
+            "temperature": 0,
+            "max_tokens": None,
+            "timeout": None,
+            "max_retries": 2,
+            "streaming": True,
+        },
+    },
+}
+
+# (provider, model name, sampling params) -> {"model": ..., "stats": ...}
+MODEL_REGISTRY: Dict[Tuple, Dict[str, Any]] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_model(provider: str = None, **overrides) -> BaseChatModel:
+    """
+    Return a shared chat model for the provider and sampling params.
+    Instances (and their HTTP clients) are created once and reused.
+    """
+    provider = provider or LLM_PROVIDER
+    spec = PROVIDERS[provider]
+    model_name = os.getenv(spec["model_name_env"])
+    params = {**spec["params"], **overrides}
+    key = (provider, model_name, tuple(sorted((k, repr(v)) for k, v in params.items())))
+
+    entry = MODEL_REGISTRY.get(key)
+    if entry is None:
+        with _REGISTRY_LOCK:
+            entry = MODEL_REGISTRY.get(key)
+            if entry is None:
+                stats = {
+                    "lookups": 0,
+                    "calls": 0,
+                    "errors": 0,
+                    "call_seconds": 0.0,
+                    "init_seconds": 0.0,
+                }
+                start = time.perf_counter()
+                model = spec["builder"](
+                    model_name,
+                    callbacks=[ModelStatsCallback(stats), RATE_LIMIT_CALLBACK, USAGE_CALLBACK],
+                    **params,
+                )
+                stats["init_seconds"] = time.perf_counter() - start
+                entry = {"model": model, "stats": stats}
+                MODEL_REGISTRY[key] = entry
+
+    entry["stats"]["lookups"] += 1
+    return entry["model"]
+
+def model_registry_stats() -> list:
+    """Per-instance usage stats of every cached model."""
+    return [
+        {
+            "provider": provider,
+            "model_name": model_name,
+            "params": dict(params),
+            **entry["stats"],
+        }
+        for (provider, model_name, params), entry in MODEL_REGISTRY.items()
+    ]
+
+def llm_rate_limit_stats() -> Dict[str, Any]:
+    return {
+        "requests_per_minute": LLM_REQUEST_LIMITER.stats(),
+        "tokens_per_minute": LLM_TOKEN_LIMITER.stats(),
+    }
@@ -0,0 +1,232 @@
+"""
+In-process retrieval backend: vectorized cosine search over a memory-mapped
+embedding matrix, a BM25 inverted index, and hybrid score fusion.
+
+A corpus is a directory holding:
+  - docs.jsonl      one JSON record per line ("text", "text_answer", ...)
+  - embeddings.npy  float32 matrix, one L2-normalized row per record
+
+Namespaces map to sub-directories of the index path. Build a corpus with:
+
+    python -m models.local_index docs.jsonl ./local_index
+"""
+import os
+import json
+import zlib
+import argparse
+import threading
+import numpy as np
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+from utils.lexical import BM25, content_tokens
+from models.retrieval import RetrievalClient
+from services.answer_cache import invalidate_answers
+
+
+class HashingEmbedder:
+    """
+    Offline embedder using the hashing trick over word unigrams and bigrams.
+    Any object with the same `embed_documents` / `embed_query` methods (e.g.
+    a LangChain Embeddings) can be used instead, as long as the corpus was
+    built with it too.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        tokens = content_tokens(text)
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            # crc32 is stable across processes, unlike hash()
+            h = zlib.crc32(feature.encode())
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return vector
+
+    def embed_documents(self, texts: Sequence[str]) -> np.ndarray:
+        return np.stack([self._embed(text) for text in texts]) if texts else np.zeros((0, self.dim), np.float32)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self._embed(text)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+def _document_text(doc: Dict[str, Any]) -> str:
+    return f"{doc.get('text', '')} {doc.get('text_answer', '')}"
+
+
+def build_local_index(docs: List[Dict[str, Any]], path: str, embedder=None) -> None:
+    """Write docs.jsonl and a normalized embeddings.npy for a corpus."""
+    embedder = embedder or HashingEmbedder()
+    os.makedirs(path, exist_ok=True)
+
+    with open(f"{path}/docs.jsonl", "w") as f:
+        for doc in docs:
+            f.write(json.dumps(doc) + "\n")
+
+    embeddings = np.asarray(embedder.embed_documents([_document_text(d) for d in docs]), dtype=np.float32)
+    np.save(f"{path}/embeddings.npy", _normalize_rows(embeddings))
+
+
+class LocalIndex:
+    """One corpus loaded from disk; the embedding matrix stays memory-mapped."""
+
+    def __init__(self, path: str, embedder=None):
+        self.path = path
+        with open(f"{path}/docs.jsonl") as f:
+            self.docs = [json.loads(line) for line in f if line.strip()]
+        self.embeddings = np.load(f"{path}/embeddings.npy", mmap_mode="r")
+        self.embedder = embedder or HashingEmbedder(self.embeddings.shape[1])
+
+        # BM25 postings as arrays so scoring is vectorized per query term
+        self.bm25 = BM25([content_tokens(_document_text(doc)) for doc in self.docs])
+        doc_lengths = np.asarray(self.bm25.doc_lengths, dtype=np.float32)
+        self._length_norm = self.bm25.k1 * (
+            1 - self.bm25.b + self.bm25.b * doc_lengths / (self.bm25.avg_length or 1)
+        )
+        self._postings = {
+            term: (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float32, count=len(postings)),
+            )
+            for term, postings in self.bm25.postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def vector_scores(self, text: str) -> np.ndarray:
+        query = np.asarray(self.embedder.embed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if not norm:
+            return np.zeros(len(self.docs), dtype=np.float32)
+        return self.embeddings @ (query / norm)
+
+    def bm25_scores(self, text: str) -> np.ndarray:
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        k1 = self.bm25.k1
+        for term in set(content_tokens(text)):
+            if term not in self._postings:
+                continue
+            ids, tf = self._postings[term]
+            scores[ids] += self.bm25.idf(term) * tf * (k1 + 1) / (tf + self._length_norm[ids])
+        return scores
+
+    def search(self, text: str, top_k: int, mode: str = "hybrid", alpha: float = 0.5) -> List[Tuple[int, float]]:
+        if not self.docs:
+            return []
+
+        if mode == "vector":
+            scores = self.vector_scores(text)
+        elif mode == "bm25":
+            scores = self.bm25_scores(text)
+        else:
+            # Fuse max-normalized scores: alpha * vector + (1 - alpha) * bm25
+            vector = np.clip(self.vector_scores(text), 0, None)
+            bm25 = self.bm25_scores(text)
+            scores = (
+                alpha * vector / (vector.max() or 1.0)
+                + (1 - alpha) * bm25 / (bm25.max() or 1.0)
+            )
+
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+
+class LocalRetrievalClient(RetrievalClient):
+    """Retrieval backend over LocalIndex corpora, one per namespace."""
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "hybrid",
+        alpha: float = 0.5,
+        embedder=None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.path = path
+        self.mode = mode
+        self.alpha = alpha
+        self.embedder = embedder
+        self.indexes: Dict[str, LocalIndex] = {}
+        self._lock = threading.Lock()
+
+    def _corpus_path(self, namespace: str) -> str:
+        """The namespace's sub-directory, or the index root when it has none."""
+        path = os.path.join(self.path, namespace or "")
+        if not os.path.exists(f"{path}/docs.jsonl"):
+            path = self.path
+        return os.path.normpath(path)
+
+    def _index(self, namespace: str) -> LocalIndex:
+        namespace = namespace or ""
+        if namespace not in self.indexes:
+            with self._lock:
+                if namespace not in self.indexes:
+                    self.indexes[namespace] = LocalIndex(self._corpus_path(namespace), self.embedder)
+        return self.indexes[namespace]
+
+    def search(
+        self,
+        namespace: str,
+        query: Dict[str, Any],
+        fields: List[str],
+    ) -> Dict[str, Any]:
+        index = self._index(namespace)
+        results = index.search(
+            query["inputs"]["text"], query.get("top_k", 10), self.mode, self.alpha
+        )
+        return {"result": {"hits": [
+            {
+                "_id": str(index.docs[i].get("id", i)),
+                "_score": score,
+                "fields": {f: index.docs[i][f] for f in fields if f in index.docs[i]},
+            }
+            for i, score in results
+        ]}}
+
+    def warm_up(self) -> None:
+        self._index(os.getenv("PINECONE_NAMESPACE", ""))
+
+    def reload(self, namespace: str = None) -> None:
+        """
+        Drop loaded corpora so the next search reads them from disk again,
+        along with the answers and search results cached from them.
+        """
+        with self._lock:
+            if namespace is None:
+                dropped = [None]
+                self.indexes.clear()
+            else:
+                # every namespace served from the same corpus (the root one
+                # when they have no sub-directory of their own) goes with it
+                path = self._corpus_path(namespace)
+                dropped = [namespace or ""] + [
+                    name for name, index in self.indexes.items()
+                    if index.path == path and name != (namespace or "")
+                ]
+                for name in dropped:
+                    self.indexes.pop(name, None)
+        for name in dropped:
+            invalidate_answers(name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a local retrieval corpus")
+    parser.add_argument("docs", help="JSONL file with text / text_answer records")
+    parser.add_argument("path", help="output directory")
+    parser.add_argument("--dim", type=int, default=512)
+    args = parser.parse_args()
+
+    with open(args.docs) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    build_local_index(records, args.path, HashingEmbedder(args.dim))
+    print(f"Indexed {len(records)} documents into {args.path}")
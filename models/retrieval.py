@@ -0,0 +1,215 @@
+import os
+import socket
+import asyncio
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib3.connection import HTTPConnection
+from pinecone.db_data import Index
+from pinecone.config.openapi_config_factory import OpenApiConfigFactory
+
+from constants.log import LOGGER
+from utils.ratelimit import TokenBucket
+from constants.config import (
+    PINECONE_POOL_SIZE, PINECONE_POOL_THREADS, PINECONE_KEEPALIVE_IDLE,
+    RETRIEVAL_MAX_CONCURRENCY, RETRIEVAL_TIMEOUT, RETRIEVAL_BACKEND,
+    LOCAL_INDEX_PATH, LOCAL_INDEX_MODE, LOCAL_INDEX_ALPHA,
+    RETRIEVAL_QPS, RATE_LIMIT_MAX_WAIT
+)
+
+
+def _keepalive_socket_options(
+    idle: int,
+    interval: int = 60,
+    tries: int = 4,
+) -> List[Tuple[int, int, int]]:
+    """
+    urllib3's default socket options plus TCP keep-alive probes after `idle`
+    seconds, every `interval` seconds, `tries` times. Knobs the platform's
+    socket module does not expose keep their system default.
+    """
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    for name, value in (
+        ("TCP_KEEPIDLE", idle),
+        ("TCP_KEEPINTVL", interval),
+        ("TCP_KEEPCNT", tries),
+    ):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+class RetrievalClient(ABC):
+    """Base retrieval backend.
+
+    Subclasses implement the blocking `search`; `asearch` runs it on a
+    bounded thread pool so the event loop keeps serving other sessions
+    while a search is in flight, and holds searches to `qps`. Results use
+    the Pinecone search shape:
+    {"result": {"hits": [{"_id", "_score", "fields": {...}}]}}.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = RETRIEVAL_MAX_CONCURRENCY,
+        timeout: float = RETRIEVAL_TIMEOUT,
+        qps: float = RETRIEVAL_QPS,
+    ):
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket(qps)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="retrieval",
+        )
+
+    @abstractmethod
+    def search(
+        self,
+        namespace: str,
+        query: Dict[str, Any],
+        fields: List[str],
+    ) -> Dict[str, Any]:
+        """Blocking search; called on the retrieval thread pool."""
+
+    async def asearch(
+        self,
+        namespace: str,
+        query: Dict[str, Any],
+        fields: List[str],
+    ) -> Dict[str, Any]:
+        """Run search off the event loop, rate-limited, capped and time-limited."""
+        loop = asyncio.get_running_loop()
+        await self.rate_limiter.acquire(1, RATE_LIMIT_MAX_WAIT, "retrieval")
+
+        # The slot is held until the search thread finishes, not until the
+        # caller stops waiting: a timed-out search keeps its pool thread, so
+        # releasing on timeout would queue new searches behind it unseen.
+        await self._semaphore.acquire()
+        try:
+            future = self._executor.submit(
+                self.search,
+                namespace=namespace,
+                query=query,
+                fields=fields,
+            )
+        except BaseException:
+            self._semaphore.release()
+            raise
+        future.add_done_callback(lambda _: self._release_from_thread(loop))
+
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+
+    def _release_from_thread(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._semaphore.release)
+        except RuntimeError:
+            # loop already closed, nobody is left waiting for the slot
+            pass
+
+    def warm_up(self) -> None:
+        pass
+
+    def close(self) -> None:
+        """Release the search threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PineconeRetrievalClient(RetrievalClient):
+    """Process-wide Pinecone index handle with a pooled connection."""
+
+    def __init__(self, index: Any, **kwargs):
+        super().__init__(**kwargs)
+        self.index = index
+
+    @classmethod
+    def connect(
+        cls,
+        api_key: str,
+        index_host: str,
+        pool_size: int = PINECONE_POOL_SIZE,
+        pool_threads: int = PINECONE_POOL_THREADS,
+        keepalive_idle: int = PINECONE_KEEPALIVE_IDLE,
+        **kwargs,
+    ) -> "PineconeRetrievalClient":
+        # TCP keep-alive probes so idle pooled connections are not dropped
+        openapi_config = OpenApiConfigFactory.build(api_key=api_key)
+        openapi_config.socket_options = _keepalive_socket_options(keepalive_idle)
+
+        # Target the data plane by host directly, no control-plane lookup
+        index = Index(
+            api_key=api_key,
+            host=index_host,
+            pool_threads=pool_threads,
+            connection_pool_maxsize=pool_size,
+            openapi_config=openapi_config,
+        )
+        return cls(index, **kwargs)
+
+    def search(
+        self,
+        namespace: str,
+        query: Dict[str, Any],
+        fields: List[str],
+    ) -> Dict[str, Any]:
+        return self.index.search(namespace=namespace, query=query, fields=fields)
+
+    def warm_up(self) -> None:
+        """Open the pooled connection before the first request pays for it; raises if unreachable."""
+        self.index.describe_index_stats()
+        LOGGER.info("Retrieval client warmed up")
+
+    def close(self) -> None:
+        """Release the search threads and the index connection pool."""
+        super().close()
+        self.index.close()
+
+
+def _make_pinecone() -> RetrievalClient:
+    return PineconeRetrievalClient.connect(
+        api_key=os.getenv("PINECONE_API_KEY"),
+        index_host=os.getenv("PINECONE_INDEX_HOST"),
+    )
+
+def _make_local() -> RetrievalClient:
+    # numpy is only needed for the local backend
+    from models.local_index import LocalRetrievalClient
+
+    return LocalRetrievalClient(
+        LOCAL_INDEX_PATH,
+        mode=LOCAL_INDEX_MODE,
+        alpha=LOCAL_INDEX_ALPHA,
+    )
+
+RETRIEVAL_BACKENDS = {
+    "pinecone": _make_pinecone,
+    "local": _make_local,
+}
+
+RETRIEVAL_CLIENT: Optional[RetrievalClient] = None
+
+
+def init_retrieval_client(backend: str = RETRIEVAL_BACKEND) -> RetrievalClient:
+    """Create the shared retrieval client once per process."""
+    global RETRIEVAL_CLIENT
+
+    # connections are opened by the startup warm-up (services.warmup), off the event loop
+    if RETRIEVAL_CLIENT is None:
+        RETRIEVAL_CLIENT = RETRIEVAL_BACKENDS[backend]()
+
+    return RETRIEVAL_CLIENT
+
+
+def get_retrieval_client() -> RetrievalClient:
+    """Return the shared retrieval client, creating it lazily if needed."""
+    return RETRIEVAL_CLIENT or init_retrieval_client()
+
+
+def close_retrieval_client() -> None:
+    global RETRIEVAL_CLIENT
+
+    if RETRIEVAL_CLIENT is not None:
+        RETRIEVAL_CLIENT.close()
+        RETRIEVAL_CLIENT = None
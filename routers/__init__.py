@@ -1,8 +1,17 @@
 from fastapi import APIRouter
 
+from constants.config import DEBUG_ENDPOINTS_ENABLED
+
+from routers.admin import admin_router
+from routers.debug import debug_router
 from routers.single_agent import single_agent_router
 
 
 all_router = APIRouter()
 
-all_router.include_router(single_agent_router)
\ No newline at end of file
+all_router.include_router(single_agent_router)
+# cache invalidation after re-indexing; always mounted, needs ADMIN_API_KEY
+all_router.include_router(admin_router)
+# unauthenticated stats and cache invalidation; opt-in
+if DEBUG_ENDPOINTS_ENABLED:
+    all_router.include_router(debug_router)
\ No newline at end of file
@@ -0,0 +1,30 @@
+import hmac
+
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from constants.config import ADMIN_API_KEY
+from services.answer_cache import invalidate_answers
+
+
+def require_admin_key(x_admin_key: Optional[str] = Header(None)) -> None:
+    """Reject the call unless X-Admin-Key matches ADMIN_API_KEY (unset rejects all)."""
+    if not ADMIN_API_KEY or not hmac.compare_digest(x_admin_key or "", ADMIN_API_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="invalid or missing X-Admin-Key",
+        )
+
+
+admin_router = APIRouter(
+    tags=["ADMIN ENDPOINT"],
+    responses={404: {"description": "Not found"}},
+    prefix="/admin",
+    dependencies=[Depends(require_admin_key)],
+)
+
+@admin_router.delete("/answer-cache")
+async def invalidate_answer_cache(namespace: Optional[str] = None) -> Dict[str, Any]:
+    """Call after the Pinecone index is re-indexed so stale answers are dropped."""
+    invalidate_answers(namespace)
+    return {"status": "success", "namespace": namespace}
@@ -0,0 +1,105 @@
+from typing import Dict, Any, Optional
+from fastapi import APIRouter
+
+from models.llm import llm_rate_limit_stats
+from models.retrieval import get_retrieval_client
+from utils.singleflight import single_flight_stats
+from routers.single_agent import ADMISSION
+from services.streaming import stream_stats
+from services.usage import usage_stats
+from services.session_runs import SESSION_RUNS
+from services.skill_registry import SKILL_REGISTRY
+from services.answer_cache import ANSWER_CACHE, invalidate_answers
+from services.checkpointers import get_checkpointer
+from services.nodes.relevance import grading_stats
+from services.nodes.context import context_stats
+from services.nodes.speculation import speculation_stats
+from services.nodes.memo import node_cache_stats
+
+
+debug_router = APIRouter(
+    tags=["DEBUG ENDPOINT"],
+    responses={404: {"description": "Not found"}},
+    prefix="/debug"
+)
+
+@debug_router.get("/answer-cache")
+async def answer_cache_stats() -> Dict[str, Any]:
+    return ANSWER_CACHE.stats()
+
+@debug_router.delete("/answer-cache")
+async def invalidate_answer_cache(namespace: Optional[str] = None) -> Dict[str, Any]:
+    """Call after the Pinecone index is reloaded so stale answers are dropped."""
+    invalidate_answers(namespace)
+    return {"status": "success", "namespace": namespace}
+
+@debug_router.get("/node-cache")
+async def node_cache() -> Dict[str, Any]:
+    return node_cache_stats()
+
+@debug_router.get("/single-flight")
+async def single_flight() -> Dict[str, Any]:
+    """Calls coalesced into an identical in-flight rag_search / search."""
+    return single_flight_stats()
+
+@debug_router.get("/rate-limits")
+async def rate_limits() -> Dict[str, Any]:
+    """Admission queue and upstream token buckets."""
+    return {
+        "admission": ADMISSION.stats(),
+        "llm": llm_rate_limit_stats(),
+        "retrieval": get_retrieval_client().rate_limiter.stats(),
+    }
+
+@debug_router.get("/streams")
+async def streams() -> Dict[str, Any]:
+    """Streaming runs completed vs cancelled by client disconnects."""
+    return stream_stats()
+
+@debug_router.get("/session-runs")
+async def session_runs() -> Dict[str, Any]:
+    """Per-session run serialization: queued / rejected / superseded runs and wait time."""
+    return SESSION_RUNS.stats()
+
+@debug_router.get("/usage")
+async def usage() -> Dict[str, Any]:
+    """LLM tokens and estimated cost of finished runs."""
+    return usage_stats()
+
+@debug_router.get("/skills")
+async def skills() -> Dict[str, Any]:
+    """Indexed skills, and description tokens injected vs saved by relevance selection."""
+    await SKILL_REGISTRY.arefresh()
+    return {**SKILL_REGISTRY.stats(), "names": SKILL_REGISTRY.names()}
+
+@debug_router.post("/skills/reload")
+async def reload_skills() -> Dict[str, Any]:
+    """Re-scan the skills directory now instead of waiting for SKILL_RELOAD_INTERVAL."""
+    await SKILL_REGISTRY.arefresh(force=True)
+    return {"status": "success", "skills": len(SKILL_REGISTRY.names()), "version": SKILL_REGISTRY.version}
+
+@debug_router.get("/grading")
+async def grading() -> Dict[str, Any]:
+    """How many grading decisions were made locally vs by the LLM."""
+    return grading_stats()
+
+@debug_router.get("/context")
+async def context() -> Dict[str, Any]:
+    """Docs and tokens dropped by the context packer before prompting."""
+    return context_stats()
+
+@debug_router.get("/speculation")
+async def speculation() -> Dict[str, Any]:
+    """Extra tokens spent on speculative rewrites vs latency saved."""
+    return speculation_stats()
+
+@debug_router.get("/sessions")
+async def sessions() -> Dict[str, Any]:
+    """Per-thread checkpoint footprint and eviction counters."""
+    checkpointer = get_checkpointer()
+    if not hasattr(checkpointer, "session_stats"):
+        return {
+            "status": "error",
+            "message": f"{type(checkpointer).__name__} does not track sessions"
+        }
+    return checkpointer.session_stats()
\ No newline at end of file
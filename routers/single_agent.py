@@ -1,16 +1,27 @@
-import json
 import uuid
+import asyncio
 
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Callable, Dict
 from langgraph.types import Command
 from langchain.messages import AIMessage
+from starlette.background import BackgroundTask
 from fastapi.responses import StreamingResponse
 from langgraph.graph.state import CompiledStateGraph
 from fastapi import APIRouter, HTTPException, Request, Depends
 
 from constants.log import LOGGER
 from constants.params import ChatbotParams
+from utils.sse import SSEWriter, sse_frame
+from services.streaming import agent_stream_events, finish_cancelled_run, RATE_LIMITED_TOOL_MESSAGE
+from services.session_runs import SESSION_RUNS, SessionSlot, SessionBusy, RunSuperseded
+from services.usage import track_usage
 from utils.helpers import extract_agent_response
+from utils.ratelimit import AdmissionController, RateLimitExceeded
+from constants.config import (
+    SSE_FLUSH_INTERVAL, SSE_FLUSH_BYTES, SSE_HEARTBEAT_INTERVAL,
+    MAX_INFLIGHT_REQUESTS, MAX_QUEUED_REQUESTS, ADMISSION_QUEUE_TIMEOUT,
+    SESSION_RUN_POLICIES
+)
 
 
 single_agent_router = APIRouter(
@@ -19,6 +30,20 @@ single_agent_router = APIRouter(
     prefix="/single-agent"
 )
 
+# coalesces token chunks into fewer SSE frames, with idle heartbeats
+SSE_WRITER = SSEWriter(
+    flush_interval=SSE_FLUSH_INTERVAL,
+    flush_bytes=SSE_FLUSH_BYTES,
+    heartbeat_interval=SSE_HEARTBEAT_INTERVAL,
+)
+
+# caps concurrent agent runs; overflow waits briefly, then gets a 429
+ADMISSION = AdmissionController(
+    max_inflight=MAX_INFLIGHT_REQUESTS,
+    max_queue=MAX_QUEUED_REQUESTS,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+)
+
 def get_single_agent(request: Request) -> CompiledStateGraph:
     """Dependency to get tools from app context"""
     if not hasattr(request.app, 'context') or 'single_agent' not in request.app.context:
@@ -28,11 +53,59 @@ def get_single_agent(request: Request) -> CompiledStateGraph:
         )
     return request.app.context['single_agent']
 
+async def invoke_in_session(
+    single_agent: CompiledStateGraph,
+    inputs: Any,
+    config: Dict[str, Any],
+    policy: str,
+) -> Dict[str, Any]:
+    """Run the agent while holding its thread_id; raises RunSuperseded if a newer run took over."""
+    slot = await SESSION_RUNS.acquire(config["configurable"]["thread_id"], policy)
+    try:
+        task = asyncio.ensure_future(single_agent.ainvoke(inputs, config=config))
+        slot.bind(task)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if not slot.superseded:
+                raise
+            await finish_cancelled_run(single_agent, config)
+            raise RunSuperseded("superseded by a newer request on this session")
+        except RateLimitExceeded:
+            # the client gets a 429 and retries on this session: close any open tool calls first
+            await finish_cancelled_run(single_agent, config, RATE_LIMITED_TOOL_MESSAGE)
+            raise
+    finally:
+        slot.release()
+
+async def hold_session(
+    events: AsyncIterator[Dict[str, Any]],
+    slot: SessionSlot,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Keep the session for as long as the streamed run lasts (including its cleanup)."""
+    # the task consuming the events is the one a supersede cancels
+    slot.bind(asyncio.current_task())
+    try:
+        async for event in events:
+            yield event
+    except asyncio.CancelledError:
+        if not slot.superseded:
+            raise
+        # cancelled by a newer request, not by the client: tell it why
+        yield {
+            "type": "error",
+            "content": "superseded by a newer request on this session"
+        }
+    finally:
+        slot.release()
+
 @single_agent_router.post("/generate-answer")
 async def generate_answer(
     payload: ChatbotParams,
-    single_agent: CompiledStateGraph = Depends(get_single_agent)
+    single_agent: CompiledStateGraph = Depends(get_single_agent),
 ) -> Dict[str, Any]:
+    # raises RateLimitExceeded (429) when the server is full
+    release = await ADMISSION.admit()
     run_id = str(uuid.uuid4())
     
     try:
@@ -44,14 +117,32 @@ async def generate_answer(
             "run_id": run_id,
         }
 
-        response = await single_agent.ainvoke(
-            {"messages": [{"role": "user", "content": payload.query}]},
-            config=config
-        )
+        # every LLM call of the run, nested RAG graph included
+        with track_usage(run_id, payload.session_id) as usage:
+            response = await invoke_in_session(
+                single_agent,
+                {"messages": [{"role": "user", "content": payload.query}]},
+                config,
+                SESSION_RUN_POLICIES["generate-answer"],
+            )
 
         # Extract and return the complete response
-        return extract_agent_response(response, payload.session_id, run_id)
+        return extract_agent_response(response, payload.session_id, run_id, usage.as_dict())
         
+    except (RateLimitExceeded, SessionBusy):
+        raise
+    except RunSuperseded as e:
+        LOGGER.info(f"Run {run_id} on session {payload.session_id} {e}")
+        return {
+            "status": "error",
+            "data": {
+                "requires_approval": False,
+                "session_id": payload.session_id,
+                "run_id": run_id,
+                "error": str(e),
+                "final_answer": None
+            }
+        }
     except Exception as e:
         LOGGER.error(f"Error in generate_answer: {e}", exc_info=True)
         return {
@@ -64,12 +155,16 @@ async def generate_answer(
                 "final_answer": "Internal server error: {str(e)}"
             }
         }
+    finally:
+        release()
         
 @single_agent_router.post("/continue-answer")
 async def continue_answer(
     payload: ChatbotParams,
-    single_agent: CompiledStateGraph = Depends(get_single_agent)
+    single_agent: CompiledStateGraph = Depends(get_single_agent),
 ) -> Dict[str, Any]:
+    # raises RateLimitExceeded (429) when the server is full
+    release = await ADMISSION.admit()
     run_id = str(uuid.uuid4())
     
     try:
@@ -81,16 +176,34 @@ async def continue_answer(
             "run_id" : run_id,
         }
 
-        response = await single_agent.ainvoke(
-            Command( 
-                resume={"decisions": [{"type": payload.query}]}
-            ), 
-            config=config
-        )
+        # every LLM call of the run, nested RAG graph included
+        with track_usage(run_id, payload.session_id) as usage:
+            response = await invoke_in_session(
+                single_agent,
+                Command( 
+                    resume={"decisions": [{"type": payload.query}]}
+                ), 
+                config,
+                SESSION_RUN_POLICIES["continue-answer"],
+            )
          
         # Extract and return the complete response
-        return extract_agent_response(response, payload.session_id, run_id)
+        return extract_agent_response(response, payload.session_id, run_id, usage.as_dict())
         
+    except (RateLimitExceeded, SessionBusy):
+        raise
+    except RunSuperseded as e:
+        LOGGER.info(f"Run {run_id} on session {payload.session_id} {e}")
+        return {
+            "status": "error",
+            "data": {
+                "requires_approval": False,
+                "session_id": payload.session_id,
+                "run_id": run_id,
+                "error": str(e),
+                "final_answer": None
+            }
+        }
     except Exception as e:
         LOGGER.error(f"Error in generate_answer: {e}", exc_info=True)
         return {
@@ -103,10 +216,28 @@ async def continue_answer(
                 "final_answer": "Internal server error: {str(e)}"
             }
         }
+    finally:
+        release()
         
+async def write_events(events, release: Callable[[], None]):
+    """SSE frames for an agent run; frees the admission slot when it ends."""
+    try:
+        async for frame in SSE_WRITER.stream(events):
+            yield frame
+    except RateLimitExceeded as e:
+        # headers are already sent, so report it in-band
+        yield sse_frame({
+            "type": "error",
+            "content": f"{e}, retry after {e.retry_after_header}s"
+        })
+    finally:
+        release()
+
 async def chat_stream_generator(
     payload: ChatbotParams, 
-    single_agent: CompiledStateGraph
+    single_agent: CompiledStateGraph,
+    release: Callable[[], None],
+    slot: SessionSlot,
 ):
     run_id = str(uuid.uuid4())
     
@@ -118,29 +249,19 @@ async def chat_stream_generator(
         "run_id": run_id,
     }
     
-    async for mode_stream, chunk in single_agent.astream( 
+    events = agent_stream_events(
+        single_agent,
         {"messages": [{"role": "user", "content": payload.query}]},
         config,
-        stream_mode=["messages", "updates"],
-    ):
-        if mode_stream == "messages":
-            message_chunk, metadata  = chunk
-            chunk_data = {
-                "type": metadata['langgraph_node'],
-                "content": message_chunk.content
-            }
-            yield f"data: {json.dumps(chunk_data)}\n\n" 
-        else:
-            if "__interrupt__" in chunk:
-                chunk_data = {
-                    "type": "interrupt",
-                    "content": "interrupt received"
-                }
-                yield f"data: {json.dumps(chunk_data)}\n\n"
+    )
+    async for frame in write_events(hold_session(events, slot), release):
+        yield frame
         
 async def continue_stream_generator(
     payload: ChatbotParams, 
-    single_agent: CompiledStateGraph
+    single_agent: CompiledStateGraph,
+    release: Callable[[], None],
+    slot: SessionSlot,
 ):
     run_id = str(uuid.uuid4())
     
@@ -152,46 +273,53 @@ async def continue_stream_generator(
         "run_id": run_id,
     }
     
-    async for mode_stream, chunk in single_agent.astream( 
+    events = agent_stream_events(
+        single_agent,
         Command( 
             resume={"decisions": [{"type": payload.query}]}
         ),
         config,
-        stream_mode=["messages", "updates"],
-    ):
-        if mode_stream == "messages":
-            message_chunk, metadata  = chunk
-            chunk_data = {
-                "type": metadata['langgraph_node'],
-                "content": message_chunk.content
-            }
-            yield f"data: {json.dumps(chunk_data)}\n\n" 
-        else:
-            if "__interrupt__" in chunk:
-                chunk_data = {
-                    "type": "interrupt",
-                    "content": "interrupt received"
-                }
-                yield f"data: {json.dumps(chunk_data)}\n\n"
+    )
+    async for frame in write_events(hold_session(events, slot), release):
+        yield frame
         
 @single_agent_router.post("/stream/generate-answer")
 async def stream_generate_answer(
     payload: ChatbotParams,
-    single_agent: CompiledStateGraph = Depends(get_single_agent)
+    single_agent: CompiledStateGraph = Depends(get_single_agent),
 ) -> StreamingResponse:
+    # raises RateLimitExceeded (429) when the server is full
+    release = await ADMISSION.admit()
+    try:
+        # raises SessionBusy (409) when the policy does not wait for a running one
+        slot = await SESSION_RUNS.acquire(payload.session_id, SESSION_RUN_POLICIES["stream/generate-answer"])
+    except BaseException:
+        release()
+        raise
+
+    def release_unstarted() -> None:
+        release()
+        if not slot.bound:
+            slot.release()
+
     try:
         return StreamingResponse(
             chat_stream_generator(
                 payload=payload,
-                single_agent=single_agent
+                single_agent=single_agent,
+                release=release,
+                slot=slot,
             ),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
-            }
+            },
+            # frees the slots even if the stream is never started
+            background=BackgroundTask(release_unstarted),
         ) 
     except Exception as e:
+        release_unstarted()
         return {
             "response" : f"Error found at system with message : {e}",
             "code" : "400"
@@ -200,21 +328,40 @@ async def stream_generate_answer(
 @single_agent_router.post("/stream/continue-answer")
 async def stream_continue_answer(
     payload: ChatbotParams,
-    single_agent: CompiledStateGraph = Depends(get_single_agent)
+    single_agent: CompiledStateGraph = Depends(get_single_agent),
 ) -> StreamingResponse:
+    # raises RateLimitExceeded (429) when the server is full
+    release = await ADMISSION.admit()
+    try:
+        # raises SessionBusy (409) when the policy does not wait for a running one
+        slot = await SESSION_RUNS.acquire(payload.session_id, SESSION_RUN_POLICIES["stream/continue-answer"])
+    except BaseException:
+        release()
+        raise
+
+    def release_unstarted() -> None:
+        release()
+        if not slot.bound:
+            slot.release()
+
     try:
         return StreamingResponse(
             continue_stream_generator(
                 payload=payload,
-                single_agent=single_agent
+                single_agent=single_agent,
+                release=release,
+                slot=slot,
             ),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
-            }
+            },
+            # frees the slots even if the stream is never started
+            background=BackgroundTask(release_unstarted),
         ) 
     except Exception as e:
+        release_unstarted()
         return {
             "response" : f"Error found at system with message : {e}",
             "code" : "400"
@@ -1,9 +1,9 @@
 from langchain.agents import create_agent
 from langgraph.graph.state import CompiledStateGraph
-from langgraph.checkpoint.memory import InMemorySaver
 
 from models.llm import get_model
 from services.tools import TOOLS
+from services.checkpointers import get_checkpointer
 from constants.params import ParsingOutput
 from services.middlewares.compile import get_middlewares
 from constants.prompt import SINGLE_AGENT_SYSTEM_TEMPLATE
@@ -14,7 +14,7 @@ async def make_graph_single() -> CompiledStateGraph:
     Create the single agent that handles all requests.
     """
     model = get_model()
-    checkpointer = InMemorySaver()
+    checkpointer = get_checkpointer()
     middlewares = get_middlewares([tool.name for tool in TOOLS])
     
     single_agent = create_agent(
@@ -0,0 +1,138 @@
+import math
+
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from utils.cache import TTLCache
+from services.nodes.memo import invalidate_node_cache
+from constants.config import (
+    ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, ANSWER_CACHE_THRESHOLD
+)
+
+
+# tokens (after normalize_query) that flip a question's meaning, besides
+# contractions ending in n't (don't / can't / isn't)
+NEGATIONS = frozenset({"not", "no", "never", "none", "nor", "neither", "nothing", "without", "cannot"})
+
+
+def _guard_tokens(normalized: str) -> frozenset:
+    """Tokens two queries must share for one to be served the other's answer."""
+    return frozenset(
+        token for token in normalized.split()
+        if token in NEGATIONS or token.endswith("n't") or any(char.isdigit() for char in token)
+    )
+
+def _vectorize(normalized: str) -> Counter:
+    """Bag of words plus character trigrams, tolerant to small rewordings."""
+    vector = Counter(normalized.split())
+    padded = f" {normalized} "
+    vector.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return vector
+
+def _cosine(a: Counter, a_norm: float, b: Counter, b_norm: float) -> float:
+    if not a_norm or not b_norm:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0) for k, v in a.items()) / (a_norm * b_norm)
+
+
+class AnswerCache:
+    """
+    Two-level cache of final RAG answers, one LRU/TTL bucket per namespace,
+    keyed on normalize_query(query) (the same key rag_search coalesces on):
+      - exact match on the key
+      - near-duplicate match when cosine similarity >= threshold (opt-in,
+        threshold < 1); never between queries that differ in a number
+        ("order 48213" vs "order 48214") or a negation
+    """
+
+    def __init__(
+        self,
+        maxsize: int = ANSWER_CACHE_SIZE,
+        ttl: float = ANSWER_CACHE_TTL,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.namespaces: Dict[str, TTLCache] = {}
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str, namespace: str = "") -> Optional[str]:
+        bucket = self.namespaces.get(namespace)
+
+        if bucket is not None:
+            entry = bucket.get(key, count=False)
+            if entry is not None:
+                self.exact_hits += 1
+                return entry["answer"]
+
+            if self.threshold < 1:
+                vector = _vectorize(key)
+                norm = math.sqrt(sum(v * v for v in vector.values()))
+                guard = _guard_tokens(key)
+                best_key, best_score = None, 0.0
+                for cached_key, cached in bucket.items():
+                    if cached["guard"] != guard:
+                        continue
+                    score = _cosine(vector, norm, cached["vector"], cached["norm"])
+                    if score > best_score:
+                        best_key, best_score = cached_key, score
+
+                if best_key is not None and best_score >= self.threshold:
+                    self.similar_hits += 1
+                    return bucket.get(best_key, count=False)["answer"]
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, answer: str, namespace: str = "") -> None:
+        if self.maxsize <= 0:
+            return
+
+        bucket = self.namespaces.get(namespace)
+        if bucket is None:
+            bucket = self.namespaces[namespace] = TTLCache(self.maxsize, self.ttl)
+
+        vector = _vectorize(key)
+        bucket.set(key, {
+            "answer": answer,
+            "vector": vector,
+            "norm": math.sqrt(sum(v * v for v in vector.values())),
+            "guard": _guard_tokens(key),
+        })
+
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        """Drop cached answers for one namespace, or all of them."""
+        if namespace is None:
+            self.namespaces.clear()
+        else:
+            self.namespaces.pop(namespace, None)
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.similar_hits) / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "namespaces": {
+                namespace: {"size": len(bucket), "evictions": bucket.evictions}
+                for namespace, bucket in self.namespaces.items()
+            },
+        }
+
+
+ANSWER_CACHE = AnswerCache()
+
+
+def invalidate_answers(namespace: Optional[str] = None) -> None:
+    """Drop cached answers and search results after the index changed."""
+    ANSWER_CACHE.invalidate(namespace)
+    invalidate_node_cache("retrieval_node")
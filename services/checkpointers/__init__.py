@@ -0,0 +1,51 @@
+from typing import Optional
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+
+from constants.config import (
+    CHECKPOINTER_BACKEND, CHECKPOINTER_SQLITE_PATH, CHECKPOINTER_BATCH_INTERVAL,
+    CHECKPOINTER_MEMORY_CONFIG
+)
+from services.checkpointers.sqlite import SqliteCheckpointSaver
+from services.checkpointers.memory import BoundedMemorySaver
+
+
+def _make_memory() -> InMemorySaver:
+    return InMemorySaver()
+
+def _make_bounded_memory() -> BoundedMemorySaver:
+    return BoundedMemorySaver(**CHECKPOINTER_MEMORY_CONFIG)
+
+def _make_sqlite() -> SqliteCheckpointSaver:
+    return SqliteCheckpointSaver(
+        CHECKPOINTER_SQLITE_PATH,
+        batch_interval=CHECKPOINTER_BATCH_INTERVAL,
+    )
+
+CHECKPOINTER_BACKENDS = {
+    "memory": _make_memory,
+    "bounded_memory": _make_bounded_memory,
+    "sqlite": _make_sqlite,
+}
+
+CHECKPOINTER: Optional[BaseCheckpointSaver] = None
+
+
+def get_checkpointer(backend: str = CHECKPOINTER_BACKEND) -> BaseCheckpointSaver:
+    """Return the process-wide checkpointer for the configured backend."""
+    global CHECKPOINTER
+
+    if CHECKPOINTER is None:
+        CHECKPOINTER = CHECKPOINTER_BACKENDS[backend]()
+
+    return CHECKPOINTER
+
+async def close_checkpointer() -> None:
+    """Close the checkpointer, committing writes still queued (sqlite) first."""
+    global CHECKPOINTER
+
+    if hasattr(CHECKPOINTER, "aclose"):
+        await CHECKPOINTER.aclose()
+    elif hasattr(CHECKPOINTER, "close"):
+        CHECKPOINTER.close()
+    CHECKPOINTER = None
\ No newline at end of file
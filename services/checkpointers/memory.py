@@ -0,0 +1,300 @@
+import time
+
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata
+
+
+_DELTA = "delta"
+
+
+def _fingerprint(message: Any) -> Tuple:
+    """Cheap identity of a message, used to detect append-only history."""
+    return (
+        type(message).__name__,
+        getattr(message, "id", None),
+        hash(repr(getattr(message, "content", message))),
+        hash(repr(getattr(message, "tool_calls", None))),
+    )
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    In-memory checkpointer with bounded resident memory:
+      - keeps only the latest `max_checkpoints` checkpoints per thread and
+        namespace, dropping older checkpoints, their writes and blobs
+      - evicts the least recently used thread when there are more than
+        `max_threads`, or any thread idle for longer than `thread_ttl`
+      - optionally stores the `messages` channel as appended deltas on top
+        of the previous version instead of a full snapshot per checkpoint
+    """
+
+    def __init__(
+        self,
+        *,
+        max_checkpoints: int = 4,
+        max_threads: int = 10000,
+        thread_ttl: Optional[float] = None,
+        delta_messages: bool = False,
+        max_delta_chain: int = 20,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.max_checkpoints = max(1, max_checkpoints)
+        self.max_threads = max_threads
+        self.thread_ttl = thread_ttl
+        self.delta_messages = delta_messages
+        self.max_delta_chain = max_delta_chain
+
+        # (thread_id, ns, "messages", version) -> (base version, appended messages)
+        self.deltas: Dict[Tuple, Tuple[str, Tuple[str, bytes]]] = {}
+        # (thread_id, ns) -> (version, fingerprints, chain length) of the last messages put
+        self._message_heads: Dict[Tuple[str, str], Tuple[str, List[Tuple], int]] = {}
+        # (thread_id, ns, checkpoint_id) -> channel versions of that checkpoint
+        self._checkpoint_versions: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        # thread_id -> keys it owns, so deleting a thread does not scan everything
+        self._thread_blobs: Dict[str, set] = defaultdict(set)
+        self._thread_writes: Dict[str, set] = defaultdict(set)
+        # thread_id -> last access, least recently used first
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+
+        self.evicted_threads = 0
+        self.pruned_checkpoints = 0
+        self.thread_pruned: Dict[str, int] = defaultdict(int)
+
+    # --- access tracking and eviction ---
+
+    def _touch(self, thread_id: str) -> None:
+        self._last_access[thread_id] = time.monotonic()
+        self._last_access.move_to_end(thread_id)
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        while self._last_access:
+            thread_id, last_access = next(iter(self._last_access.items()))
+            expired = self.thread_ttl is not None and now - last_access > self.thread_ttl
+            if len(self._last_access) <= self.max_threads and not expired:
+                break
+            self.delete_thread(thread_id)
+            self.evicted_threads += 1
+
+    # --- write path ---
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        self._touch(thread_id)
+
+        values = checkpoint["channel_values"]
+        if self.delta_messages and "messages" in new_versions and "messages" in values:
+            new_versions = dict(new_versions)
+            self._put_messages(
+                thread_id, checkpoint_ns, new_versions.pop("messages"), values["messages"]
+            )
+
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+
+        for channel, version in new_versions.items():
+            self._thread_blobs[thread_id].add((thread_id, checkpoint_ns, channel, version))
+        self._checkpoint_versions[(thread_id, checkpoint_ns, checkpoint["id"])] = dict(
+            checkpoint["channel_versions"]
+        )
+
+        self._prune(thread_id, checkpoint_ns)
+        self._evict_idle()
+        return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        self._touch(thread_id)
+        super().put_writes(config, writes, task_id, task_path)
+        self._thread_writes[thread_id].add((
+            thread_id,
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        ))
+
+    def _put_messages(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        version: str,
+        messages: List[Any],
+    ) -> None:
+        key = (thread_id, checkpoint_ns, "messages", version)
+        fingerprints = [_fingerprint(message) for message in messages]
+        head = self._message_heads.get((thread_id, checkpoint_ns))
+
+        if (
+            head is not None
+            and head[2] < self.max_delta_chain
+            and (thread_id, checkpoint_ns, "messages", head[0]) in self.blobs
+            and fingerprints[:len(head[1])] == head[1]
+        ):
+            base_version, base_fingerprints, chain = head
+            self.blobs[key] = (_DELTA, b"")
+            self.deltas[key] = (
+                base_version,
+                self.serde.dumps_typed(messages[len(base_fingerprints):]),
+            )
+            chain += 1
+        else:
+            self.blobs[key] = self.serde.dumps_typed(messages)
+            chain = 0
+
+        self._message_heads[(thread_id, checkpoint_ns)] = (version, fingerprints, chain)
+        self._thread_blobs[thread_id].add(key)
+
+    # --- compaction ---
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """Keep the latest checkpoints of a namespace and drop unreachable blobs."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.max_checkpoints:
+            return
+
+        retained = sorted(checkpoints)[-self.max_checkpoints:]
+        for checkpoint_id in sorted(checkpoints)[:-self.max_checkpoints]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            self._thread_writes[thread_id].discard((thread_id, checkpoint_ns, checkpoint_id))
+            self._checkpoint_versions.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            self.pruned_checkpoints += 1
+            self.thread_pruned[thread_id] += 1
+
+        # Materialize the oldest retained history so older delta bases can go
+        oldest_versions = self._checkpoint_versions.get((thread_id, checkpoint_ns, retained[0]), {})
+        if "messages" in oldest_versions:
+            self._materialize((thread_id, checkpoint_ns, "messages", oldest_versions["messages"]))
+
+        reachable = set()
+        for checkpoint_id in retained:
+            versions = self._checkpoint_versions.get((thread_id, checkpoint_ns, checkpoint_id), {})
+            for channel, version in versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                while key is not None and key not in reachable:
+                    reachable.add(key)
+                    delta = self.deltas.get(key)
+                    key = (thread_id, checkpoint_ns, channel, delta[0]) if delta else None
+
+        owned = self._thread_blobs[thread_id]
+        for key in [k for k in owned if k[1] == checkpoint_ns and k not in reachable]:
+            self.blobs.pop(key, None)
+            self.deltas.pop(key, None)
+            owned.discard(key)
+
+    def _materialize(self, key: Tuple) -> None:
+        if key in self.deltas:
+            self.blobs[key] = self.serde.dumps_typed(self._load_messages(key))
+            del self.deltas[key]
+
+    # --- read path ---
+
+    def _load_messages(self, key: Tuple) -> List[Any]:
+        parts = []
+        while key in self.deltas:
+            base_version, appended = self.deltas[key]
+            parts.append(self.serde.loads_typed(appended))
+            key = (*key[:3], base_version)
+
+        messages = list(self.serde.loads_typed(self.blobs[key]))
+        for appended in reversed(parts):
+            messages.extend(appended)
+        return messages
+
+    def _load_blobs(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        versions: ChannelVersions,
+    ) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        for channel, version in versions.items():
+            key = (thread_id, checkpoint_ns, channel, version)
+            if key not in self.blobs:
+                continue
+            value = self.blobs[key]
+            if value[0] == "empty":
+                continue
+            if value[0] == _DELTA:
+                result[channel] = self._load_messages(key)
+            else:
+                result[channel] = self.serde.loads_typed(value)
+        return result
+
+    def get_tuple(self, config: RunnableConfig):
+        thread_id = config["configurable"]["thread_id"]
+        if thread_id not in self.storage:
+            return None
+        self._touch(thread_id)
+        return super().get_tuple(config)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.storage.pop(thread_id, None)
+        for key in self._thread_writes.pop(thread_id, ()):
+            self.writes.pop(key, None)
+        for key in self._thread_blobs.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+            self.deltas.pop(key, None)
+
+        for key in [k for k in self._message_heads if k[0] == thread_id]:
+            del self._message_heads[key]
+        for key in [k for k in self._checkpoint_versions if k[0] == thread_id]:
+            del self._checkpoint_versions[key]
+        self._last_access.pop(thread_id, None)
+        self.thread_pruned.pop(thread_id, None)
+
+    # --- introspection ---
+
+    def session_stats(self) -> Dict[str, Any]:
+        """Per-thread byte footprint and eviction counters."""
+        now = time.monotonic()
+        sessions = {}
+        for thread_id, last_access in self._last_access.items():
+            checkpoint_bytes = sum(
+                len(checkpoint[1]) + len(metadata[1])
+                for namespace in self.storage.get(thread_id, {}).values()
+                for checkpoint, metadata, _ in namespace.values()
+            )
+            blob_bytes = sum(
+                len(self.blobs[key][1]) + (len(self.deltas[key][1][1]) if key in self.deltas else 0)
+                for key in self._thread_blobs.get(thread_id, ())
+                if key in self.blobs
+            )
+            write_bytes = sum(
+                len(value[2][1])
+                for key in self._thread_writes.get(thread_id, ())
+                for value in self.writes.get(key, {}).values()
+            )
+            sessions[thread_id] = {
+                "bytes": checkpoint_bytes + blob_bytes + write_bytes,
+                "checkpoints": sum(len(ns) for ns in self.storage.get(thread_id, {}).values()),
+                "pruned_checkpoints": self.thread_pruned.get(thread_id, 0),
+                "idle_seconds": now - last_access,
+            }
+
+        return {
+            "threads": len(sessions),
+            "total_bytes": sum(s["bytes"] for s in sessions.values()),
+            "evicted_threads": self.evicted_threads,
+            "pruned_checkpoints": self.pruned_checkpoints,
+            "max_checkpoints": self.max_checkpoints,
+            "max_threads": self.max_threads,
+            "thread_ttl": self.thread_ttl,
+            "delta_messages": self.delta_messages,
+            "sessions": sessions,
+        }
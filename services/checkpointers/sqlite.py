@@ -0,0 +1,455 @@
+import random
+import sqlite3
+import asyncio
+import threading
+
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP, BaseCheckpointSaver, ChannelVersions, Checkpoint,
+    CheckpointMetadata, CheckpointTuple, get_checkpoint_id, get_checkpoint_metadata,
+)
+
+from constants.log import LOGGER
+
+
+Operation = Tuple[str, Tuple]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    checkpoint_type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    Checkpoint saver on a local SQLite file that several worker processes
+    can share. The database runs in WAL mode so readers never block the
+    writer, and async writes issued close together are group-committed in
+    a single transaction (one fsync per batch instead of per write).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        batch_interval: float = 0.002,
+        batch_size: int = 64,
+        synchronous: str = "NORMAL",
+        busy_timeout: int = 5000,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.batch_interval = batch_interval
+        self.batch_size = batch_size
+
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.execute(f"PRAGMA busy_timeout={int(busy_timeout)}")
+        self.conn.executescript(_SCHEMA)
+        self.lock = threading.Lock()
+
+        self._pending: List[Tuple[List[Operation], asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    # --- write path ---
+
+    def _execute_locked(self, operations: List[Operation]) -> None:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in operations:
+                self.conn.execute(sql, params)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _execute(self, operations: List[Operation]) -> None:
+        with self.lock:
+            self._execute_locked(operations)
+
+    async def _submit(self, operations: List[Operation]) -> None:
+        """Queue operations for the next group commit and wait until durable."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((operations, future))
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush())
+
+        await asyncio.shield(future)
+
+    async def _flush(self) -> None:
+        while self._pending:
+            # Give concurrent writers a moment to join this batch
+            await asyncio.sleep(self.batch_interval)
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+
+            try:
+                await asyncio.to_thread(
+                    self._execute, [op for operations, _ in batch for op in operations]
+                )
+                error = None
+            except Exception as e:
+                LOGGER.error(f"Checkpoint batch write failed: {e}")
+                error = e
+
+            self._resolve(batch, error)
+
+    @staticmethod
+    def _resolve(batch: List[Tuple[List[Operation], asyncio.Future]], error: Optional[Exception]) -> None:
+        for _, future in batch:
+            if future.done():
+                continue
+            try:
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+            except RuntimeError:
+                # its event loop is already closed; nobody is waiting
+                pass
+
+    def _put_operations(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> Tuple[List[Operation], RunnableConfig]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        c = checkpoint.copy()
+        values: Dict[str, Any] = c.pop("channel_values")
+
+        operations = []
+        # Only channels whose version changed are written
+        for channel, version in new_versions.items():
+            type_, blob = (
+                self.serde.dumps_typed(values[channel]) if channel in values else ("empty", None)
+            )
+            operations.append((
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, channel, str(version), type_, blob),
+            ))
+
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(c)
+        metadata_type, metadata_blob = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+        operations.append((
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                thread_id, checkpoint_ns, checkpoint["id"],
+                config["configurable"].get("checkpoint_id"),
+                checkpoint_type, checkpoint_blob, metadata_type, metadata_blob,
+            ),
+        ))
+
+        next_config = {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+        return operations, next_config
+
+    def _put_writes_operations(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> List[Operation]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        # Special writes (errors, interrupts, ...) replace, regular ones are write-once
+        verb = (
+            "INSERT OR REPLACE"
+            if all(channel in WRITES_IDX_MAP for channel, _ in writes)
+            else "INSERT OR IGNORE"
+        )
+
+        operations = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            operations.append((
+                f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, checkpoint_ns, checkpoint_id, task_id,
+                    WRITES_IDX_MAP.get(channel, idx), channel, type_, blob, task_path,
+                ),
+            ))
+        return operations
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        operations, next_config = self._put_operations(config, checkpoint, metadata, new_versions)
+        self._execute(operations)
+        return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self._execute(self._put_writes_operations(config, writes, task_id, task_path))
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        operations, next_config = self._put_operations(config, checkpoint, metadata, new_versions)
+        await self._submit(operations)
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self._submit(self._put_writes_operations(config, writes, task_id, task_path))
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._execute([
+            (f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            for table in ("checkpoints", "blobs", "writes")
+        ])
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self._submit([
+            (f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            for table in ("checkpoints", "blobs", "writes")
+        ])
+
+    # --- read path ---
+
+    def _load_blobs(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        versions: ChannelVersions,
+    ) -> Dict[str, Any]:
+        if not versions:
+            return {}
+
+        clauses = " OR ".join("(channel = ? AND version = ?)" for _ in versions)
+        params = [thread_id, checkpoint_ns]
+        for channel, version in versions.items():
+            params += [channel, str(version)]
+
+        rows = self.conn.execute(
+            "SELECT channel, type, blob FROM blobs "
+            f"WHERE thread_id = ? AND checkpoint_ns = ? AND ({clauses})",
+            params,
+        ).fetchall()
+        return {
+            channel: self.serde.loads_typed((type_, blob))
+            for channel, type_, blob in rows
+            if type_ != "empty"
+        }
+
+    def _row_to_tuple(self, row: Tuple) -> CheckpointTuple:
+        (
+            thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,
+            checkpoint_type, checkpoint_blob, metadata_type, metadata_blob,
+        ) = row
+
+        writes = self.conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+        checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_blob))
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(
+                    thread_id, checkpoint_ns, checkpoint["channel_versions"]
+                ),
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata_blob)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((type_, value)))
+                for task_id, channel, type_, value in writes
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+
+        with self.lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.conn.execute(
+                    "SELECT * FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    "SELECT * FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+
+            return self._row_to_tuple(row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        where, params = [], []
+        if config:
+            where.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_checkpoint_id)
+
+        sql = "SELECT * FROM checkpoints"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY checkpoint_id DESC"
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+
+            results = []
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                if filter:
+                    metadata = self.serde.loads_typed((row[6], row[7]))
+                    if not all(metadata.get(k) == v for k, v in filter.items()):
+                        continue
+                results.append(self._row_to_tuple(row))
+
+        yield from results
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in results:
+            yield item
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    def close(self) -> None:
+        """
+        Write whatever is still queued for a group commit, then close the
+        database. From a running event loop prefer `aclose`, which also waits
+        for a batch the flush task is writing right now.
+        """
+        with self.lock:
+            batch, self._pending = self._pending, []
+            error = None
+            if batch:
+                try:
+                    self._execute_locked([op for operations, _ in batch for op in operations])
+                except Exception as e:
+                    LOGGER.error(f"Checkpoint batch write failed on close: {e}")
+                    error = e
+            self.conn.close()
+        self._resolve(batch, error)
+
+    async def aclose(self) -> None:
+        """Let the flush task commit every queued write, then close the database."""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        self.close()
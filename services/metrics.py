@@ -0,0 +1,135 @@
+import time
+
+from prometheus_client.core import CounterMetricFamily
+
+from utils.metrics import REGISTRY, Counter, Histogram
+from utils.singleflight import SINGLE_FLIGHTS
+
+
+HTTP_REQUEST_LATENCY = Histogram(
+    "chatbot_http_request_duration_seconds",
+    "Time from request to the end of the response body (streams included).",
+    ("method", "route", "status"),
+)
+AGENT_STEP_LATENCY = Histogram(
+    "chatbot_agent_step_duration_seconds",
+    "Agent steps: one model call or one tool call.",
+    ("step",),
+)
+TOOL_LATENCY = Histogram(
+    "chatbot_tool_duration_seconds",
+    "Tool calls made by the agent.",
+    ("tool",),
+)
+RAG_NODE_LATENCY = Histogram(
+    "chatbot_rag_node_duration_seconds",
+    "Nodes (and the grading edge) of the RAG graph.",
+    ("node",),
+)
+MIDDLEWARE_LATENCY = Histogram(
+    "chatbot_middleware_duration_seconds",
+    "Agent middleware hooks, excluding the time spent in the handler they wrap.",
+    ("middleware", "hook"),
+)
+RAG_REWRITE_ITERATIONS = Counter(
+    "chatbot_rag_rewrite_iterations_total",
+    "Times the RAG graph looped back to rewrite the question.",
+)
+AGENT_INTERRUPTS = Counter(
+    "chatbot_agent_interrupts_total",
+    "Human-in-the-loop interrupts raised by agent middleware.",
+    ("middleware",),
+)
+
+
+LLM_TOKENS = Counter(
+    "chatbot_llm_tokens_total",
+    "LLM tokens of finished runs, by kind (prompt / cached_prompt / completion) and graph node; "
+    "cached_prompt is the part of prompt read from the provider's prefix cache.",
+    ("kind", "node"),
+)
+LLM_COST = Counter(
+    "chatbot_llm_cost_usd_total",
+    "Estimated LLM cost of finished runs from the configured prices.",
+)
+RUN_TOKENS = Histogram(
+    "chatbot_run_tokens",
+    "Total LLM tokens per agent run.",
+    buckets=(100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000),
+)
+SKILL_PROMPT_TOKENS = Counter(
+    "chatbot_skill_prompt_tokens_total",
+    "Skill description tokens put in the prompt (injected) vs left out by relevance selection (saved).",
+    ("kind",),
+)
+SESSION_QUEUE_WAIT = Histogram(
+    "chatbot_session_queue_wait_seconds",
+    "Time a run waited for the previous run on its session, by session policy.",
+    ("policy",),
+)
+SESSION_RUN_CONFLICTS = Counter(
+    "chatbot_session_run_conflicts_total",
+    "Runs that found their session busy and did not just queue, by outcome "
+    "(rejected / superseded / timeout).",
+    ("outcome",),
+)
+STREAM_CANCELLATIONS = Counter(
+    "chatbot_stream_cancellations_total",
+    "Streamed agent runs cancelled because the client disconnected.",
+)
+STREAM_TOKENS_SAVED = Counter(
+    "chatbot_stream_tokens_saved_total",
+    "Estimated tokens not generated thanks to disconnect cancellation "
+    "(average tokens of a finished stream minus those already streamed).",
+)
+TOKEN_BUDGET_STOPS = Counter(
+    "chatbot_token_budget_stops_total",
+    "RAG rewrite loops stopped early because the token budget was spent.",
+)
+
+
+class SingleFlightCollector:
+    """Exports the SingleFlight coalesced counts, read when /metrics is scraped."""
+
+    def collect(self):
+        coalesced = CounterMetricFamily(
+            "chatbot_single_flight_coalesced",
+            "Calls served by an identical in-flight call instead of running their own.",
+            labels=("flight",),
+        )
+        for name, flight in list(SINGLE_FLIGHTS.items()):
+            coalesced.add_metric((name,), flight.coalesced)
+        yield coalesced
+
+REGISTRY.register(SingleFlightCollector())
+
+
+class HTTPMetricsMiddleware:
+    """ASGI middleware recording HTTP_REQUEST_LATENCY per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # the route template, never the raw path, keeps the label set bounded
+            route = scope.get("route")
+            HTTP_REQUEST_LATENCY.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status),
+            ).observe(time.perf_counter() - started)
@@ -1,7 +1,8 @@
 from typing import List
 
-from constants.config import USED_MIDDLEWARE
+from constants.config import USED_MIDDLEWARE, METRICS_ENABLED
 from services.middlewares.mapping_middleware import MAPPING_MIDDLEWARE
+from services.middlewares.metrics import StepMetricsMiddleware, instrument_middleware
 
 
 def get_middlewares(tools_names: List[str]) -> List:
@@ -15,6 +16,12 @@ def get_middlewares(tools_names: List[str]) -> List:
             if temp_hitl:
                 middlewares.append(temp_hitl)
         else:
-            middlewares.append(func_middleware)
+            middlewares.append(func_middleware())
+
+    if METRICS_ENABLED:
+        # first = outermost, so model / tool steps include the other middlewares
+        middlewares = [StepMetricsMiddleware()] + [
+            instrument_middleware(middleware) for middleware in middlewares
+        ]
 
     return middlewares
\ No newline at end of file
@@ -40,21 +40,23 @@ def compile_hitl(
         
         return hitl
     
+# name -> factory, so only the middlewares in USED_MIDDLEWARE are built
+# (summary_chat would otherwise create an LLM client at import)
 MAPPING_MIDDLEWARE = {
     "model_call_limit": \
-        ModelCallLimitMiddleware(
+        lambda: ModelCallLimitMiddleware(
             thread_limit=10,
             run_limit=5,
             exit_behavior="end",
         ),
     "tool_call_limit": \
-        ToolCallLimitMiddleware(
+        lambda: ToolCallLimitMiddleware(
             tool_name="rag_search",
             thread_limit=5,
             run_limit=3,
         ),
     "summary_chat": \
-        SummarizationMiddleware(
+        lambda: SummarizationMiddleware(
             model=get_model(),
             trigger=("tokens", 4000),
             keep=("messages", 20),
@@ -62,5 +64,5 @@ MAPPING_MIDDLEWARE = {
     "hitl": \
         compile_hitl,
     "skill": \
-        SkillMiddleware()
+        SkillMiddleware
 }
\ No newline at end of file
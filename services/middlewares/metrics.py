@@ -0,0 +1,151 @@
+import time
+import functools
+import inspect
+
+from typing import Callable, Awaitable
+from langgraph.errors import GraphInterrupt
+from langchain.messages import ToolMessage
+from langgraph.types import Command
+from langchain.agents.middleware import ModelRequest, ModelResponse, AgentMiddleware
+from langchain.agents.middleware.types import ToolCallRequest
+
+from services.metrics import (
+    AGENT_STEP_LATENCY, TOOL_LATENCY, MIDDLEWARE_LATENCY, AGENT_INTERRUPTS
+)
+
+
+# (sync, async) variants; the agent runs async, and an async hook often
+# just calls its sync twin, so only one of each pair is timed
+NODE_HOOKS = (
+    ("before_agent", "abefore_agent"), ("before_model", "abefore_model"),
+    ("after_model", "aafter_model"), ("after_agent", "aafter_agent"),
+)
+WRAP_HOOKS = (("wrap_model_call", "awrap_model_call"), ("wrap_tool_call", "awrap_tool_call"))
+
+
+class StepMetricsMiddleware(AgentMiddleware):
+    """Outermost middleware timing every model call and tool call of the agent."""
+
+    def __init__(self):
+        self._model_step = AGENT_STEP_LATENCY.labels("model")
+        self._tool_step = AGENT_STEP_LATENCY.labels("tools")
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        started = time.perf_counter()
+        try:
+            return await handler(request)
+        finally:
+            self._model_step.observe(time.perf_counter() - started)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        started = time.perf_counter()
+        try:
+            return await handler(request)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._tool_step.observe(elapsed)
+            TOOL_LATENCY.labels(request.tool_call["name"]).observe(elapsed)
+
+
+def _timed_node_hook(middleware: AgentMiddleware, hook: str, func: Callable) -> Callable:
+    child = MIDDLEWARE_LATENCY.labels(middleware.name, hook)
+    interrupts = AGENT_INTERRUPTS.labels(middleware.name)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_hook(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except GraphInterrupt:
+                interrupts.inc()
+                raise
+            finally:
+                child.observe(time.perf_counter() - started)
+        return async_hook
+
+    @functools.wraps(func)
+    def sync_hook(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except GraphInterrupt:
+            interrupts.inc()
+            raise
+        finally:
+            child.observe(time.perf_counter() - started)
+    return sync_hook
+
+def _timed_wrap_hook(middleware: AgentMiddleware, hook: str, func: Callable) -> Callable:
+    child = MIDDLEWARE_LATENCY.labels(middleware.name, hook)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrap(request, handler):
+            inner = 0.0
+
+            async def timed_handler(request):
+                nonlocal inner
+                started = time.perf_counter()
+                try:
+                    return await handler(request)
+                finally:
+                    inner += time.perf_counter() - started
+
+            started = time.perf_counter()
+            try:
+                return await func(request, timed_handler)
+            finally:
+                child.observe(time.perf_counter() - started - inner)
+        return async_wrap
+
+    @functools.wraps(func)
+    def sync_wrap(request, handler):
+        inner = 0.0
+
+        def timed_handler(request):
+            nonlocal inner
+            started = time.perf_counter()
+            try:
+                return handler(request)
+            finally:
+                inner += time.perf_counter() - started
+
+        started = time.perf_counter()
+        try:
+            return func(request, timed_handler)
+        finally:
+            child.observe(time.perf_counter() - started - inner)
+    return sync_wrap
+
+def instrument_middleware(middleware: AgentMiddleware) -> AgentMiddleware:
+    """
+    Time the hooks a middleware overrides, in place.
+    create_agent picks hooks by class but calls them on the instance, so
+    wrapping the bound methods is enough; interrupts raised by a hook
+    (human-in-the-loop) are counted on the way out.
+    """
+    if getattr(middleware, "_metrics_instrumented", False):
+        return middleware
+
+    for pairs, wrap in ((NODE_HOOKS, _timed_node_hook), (WRAP_HOOKS, _timed_wrap_hook)):
+        for sync_hook, async_hook in pairs:
+            overridden = [
+                hook for hook in (async_hook, sync_hook)
+                if getattr(type(middleware), hook) is not getattr(AgentMiddleware, hook)
+            ]
+            if overridden:
+                setattr(middleware, overridden[0], wrap(
+                    middleware, sync_hook, getattr(middleware, overridden[0])
+                ))
+
+    middleware._metrics_instrumented = True
+    return middleware
@@ -1,46 +1,78 @@
-from typing import Callable, Awaitable
-from langchain.messages import SystemMessage
+from typing import Awaitable, Callable, List, Optional
+from langchain.messages import HumanMessage, SystemMessage
 from langchain.agents.middleware import ModelRequest, ModelResponse, AgentMiddleware
 
-from constants.config import SKILLS
+from utils.cache import TTLCache
+from constants.config import SKILL_TOP_K, SKILL_MIN_SCORE
 from services.tools.load_skill import load_skill
+from services.skill_registry import SKILL_REGISTRY, Skill, SkillRegistry
+
+
+def _user_turn(messages: List) -> str:
+    """Text of the latest user message; model calls after a tool call still answer it."""
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            return message.text
+    return ""
 
 
 class SkillMiddleware(AgentMiddleware):  
-    """Middleware that injects skill descriptions into the system prompt."""
+    """
+    Middleware that injects the descriptions of the skills relevant to the
+    current user turn (top `top_k` of the registry) into the system prompt.
+    """
 
     # Register the load_skill tool as a class variable
     tools = [load_skill]  
 
-    def __init__(self):
-        """Initialize and generate the skills prompt from SKILLS."""
-        # Build skills prompt from the SKILLS list
-        skills_list = []
-        for skill in SKILLS:
-            skills_list.append(
-                f"- **{skill['name']}**: {skill['description']}"
+    def __init__(
+        self,
+        registry: SkillRegistry = SKILL_REGISTRY,
+        top_k: int = SKILL_TOP_K,
+        min_score: float = SKILL_MIN_SCORE,
+    ):
+        self.registry = registry
+        self.top_k = top_k
+        self.min_score = min_score
+
+        # (base system prompt, registry version, selected skills) -> assembled
+        # SystemMessage. Turns selecting the same skills reuse one message, so
+        # the provider sees the same prefix and can serve it from its cache.
+        self._system_messages = TTLCache(maxsize=256)
+
+    def system_message(self, base: Optional[SystemMessage], skills: List[Skill]) -> SystemMessage:
+        """The base system message with the skills addendum, built once per selection."""
+        key = (base.text if base is not None else "", self.registry.version, tuple(s.name for s in skills))
+        message = self._system_messages.get(key)
+        if message is None:
+            # Build the skills addendum
+            skills_prompt = "\n".join(skill.prompt_line for skill in skills)
+            skills_addendum = (
+                f"\n\n## Available Skills\n\n{skills_prompt}\n\n"
+                "Use the load_skill tool when you need detailed information "
+                "about handling a specific type of request."
             )
-        self.skills_prompt = "\n".join(skills_list)
+
+            # Append to system message content blocks
+            blocks = list(base.content_blocks) if base is not None else []
+            message = SystemMessage(content=blocks + [{"type": "text", "text": skills_addendum}])
+            self._system_messages.set(key, message)
+        return message
 
     async def awrap_model_call(
         self,
         request: ModelRequest,
         handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
     ) -> ModelResponse:
-        """Async: Inject skill descriptions into system prompt."""
-        # Build the skills addendum
-        skills_addendum = (
-            f"\n\n## Available Skills\n\n{self.skills_prompt}\n\n"
-            "Use the load_skill tool when you need detailed information "
-            "about handling a specific type of request."
+        """Async: Inject the relevant skill descriptions into system prompt."""
+        # the directory scan and file reads run on a worker thread, not the loop
+        await self.registry.arefresh()
+        skills = self.registry.select(
+            _user_turn(request.messages), self.top_k, self.min_score, refresh=False,
         )
+        if not skills:
+            return await handler(request)
 
-        # Append to system message content blocks
-        new_content = list(request.system_message.content_blocks) + [
-            {"type": "text", "text": skills_addendum}
-        ]
-        new_system_message = SystemMessage(content=new_content)
-        
         # Call the async handler with modified request
-        modified_request = request.override(system_message=new_system_message)
-        return await handler(modified_request)
\ No newline at end of file
+        modified_request = request.override(system_message=self.system_message(request.system_message, skills))
+        return await handler(modified_request)
@@ -1,19 +1,40 @@
+import threading
+
+from typing import Optional
 from langgraph.graph import END, StateGraph
+from langgraph.graph.state import CompiledStateGraph
 
-from constants.config import PATH
 from constants.params import RAGState
+from utils.metrics import timed
+from services.metrics import RAG_NODE_LATENCY
+from constants.config import NODE_CACHE_CONFIG, METRICS_ENABLED
+from services.nodes.memo import configure_node_caches
 from services.nodes.retrieval import retrieval_node
 from services.nodes.generate_answer import generate_answer
 from services.nodes.query_enhancement import rewrite_question, grade_documents
 
 
-def make_rag_graph():
+# compiled by get_rag_graph(); the diagram is drawn by `python -m services.nodes.diagram`
+RAG_GRAPH: Optional[CompiledStateGraph] = None
+_RAG_GRAPH_LOCK = threading.Lock()
+
+
+def instrument_node(name: str, node):
+    """Record the node's latency in RAG_NODE_LATENCY when metrics are on."""
+    if not METRICS_ENABLED:
+        return node
+    return timed(RAG_NODE_LATENCY.labels(name))(node)
+
+def make_rag_graph(node_cache_config: dict = NODE_CACHE_CONFIG) -> CompiledStateGraph:
+    # per-node result caches keyed by the node input
+    configure_node_caches(node_cache_config)
+
     graph_builder = StateGraph(RAGState)
 
     # --- nodes ---
-    graph_builder.add_node("rewrite_question", rewrite_question)
-    graph_builder.add_node("retrieval_node", retrieval_node)
-    graph_builder.add_node("generate_answer", generate_answer)
+    graph_builder.add_node("rewrite_question", instrument_node("rewrite_question", rewrite_question))
+    graph_builder.add_node("retrieval_node", instrument_node("retrieval_node", retrieval_node))
+    graph_builder.add_node("generate_answer", instrument_node("generate_answer", generate_answer))
 
     # --- entry ---
     graph_builder.set_entry_point("rewrite_question")
@@ -23,18 +44,25 @@ def make_rag_graph():
     graph_builder.add_edge("rewrite_question", "retrieval_node")
 
     # after retrieval, grade decides: generate or loop back to rewrite
-    graph_builder.add_conditional_edges("retrieval_node", grade_documents)
+    graph_builder.add_conditional_edges(
+        "retrieval_node",
+        instrument_node("grade_documents", grade_documents),
+        # generate_answer is reached through a Send carrying the grounded flag
+        ["generate_answer", "rewrite_question"],
+    )
 
     # generation is the terminal node
     graph_builder.add_edge("generate_answer", END)
 
-    graph = graph_builder.compile()
-    graph.get_graph(xray=True).draw_mermaid_png(
-        output_file_path=f"{PATH}/imgs/rag_graph.png",
-        max_retries=5,
-        retry_delay=2.0
-    )
+    return graph_builder.compile()
+
+def get_rag_graph() -> CompiledStateGraph:
+    """The shared RAG graph, compiled on first use."""
+    global RAG_GRAPH
 
-    return graph
+    if RAG_GRAPH is None:
+        with _RAG_GRAPH_LOCK:
+            if RAG_GRAPH is None:
+                RAG_GRAPH = make_rag_graph()
 
-RAG_GRAPH = make_rag_graph()
\ No newline at end of file
+    return RAG_GRAPH
@@ -0,0 +1,150 @@
+from collections import Counter
+from typing import Any, Dict, FrozenSet, List, Sequence
+
+from constants.log import LOGGER
+from utils.cache import TTLCache
+from utils.lexical import content_tokens
+from utils.helpers import tokenize, estimate_tokens, normalize_query
+from constants.config import (
+    CONTEXT_TOKEN_BUDGET, CONTEXT_DOC_MAX_TOKENS, CONTEXT_DEDUP_THRESHOLD,
+    CONTEXT_MMR_LAMBDA, CONTEXT_CACHE_SIZE, CONTEXT_CACHE_TTL
+)
+
+
+# requests, cache_hits, docs_in, docs_out, duplicates, truncated, tokens_in, tokens_out
+CONTEXT_STATS: Counter = Counter()
+
+CONTEXT_CACHE = TTLCache(maxsize=CONTEXT_CACHE_SIZE, ttl=CONTEXT_CACHE_TTL)
+
+_SHINGLE_SIZE = 3
+
+
+def shingles(text: str, size: int = _SHINGLE_SIZE) -> FrozenSet[str]:
+    """Word n-grams of a text; short texts fall back to their words."""
+    words = tokenize(text)
+    if len(words) < size:
+        return frozenset(words)
+    return frozenset(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly `max_tokens`, on a word boundary."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max_tokens * 4]
+    if " " in cut:
+        cut = cut[:cut.rfind(" ")]
+    return cut.rstrip() + " ..."
+
+
+def deduplicate(docs: Sequence[str], threshold: float = CONTEXT_DEDUP_THRESHOLD) -> List[str]:
+    """Drop exact (normalized) duplicates and shingle near-duplicates, keeping rank order."""
+    kept, kept_shingles, seen = [], [], set()
+    for doc in docs:
+        key = normalize_query(doc)
+        if not key or key in seen:
+            continue
+        doc_shingles = shingles(doc)
+        if any(jaccard(doc_shingles, other) >= threshold for other in kept_shingles):
+            continue
+        seen.add(key)
+        kept.append(doc)
+        kept_shingles.append(doc_shingles)
+    return kept
+
+def mmr_order(question: str, docs: Sequence[str], lambda_: float = CONTEXT_MMR_LAMBDA) -> List[str]:
+    """
+    Maximal marginal relevance ordering. Relevance blends query term
+    overlap with the retrieval rank; redundancy is term overlap with the
+    docs already picked.
+    """
+    query = set(content_tokens(question))
+    terms = [set(content_tokens(doc)) for doc in docs]
+    n = len(docs)
+    relevance = [
+        0.5 * (len(query & t) / len(query) if query else 0.0) + 0.5 * (1 - i / n)
+        for i, t in enumerate(terms)
+    ]
+
+    order: List[int] = []
+    remaining = list(range(n))
+    while remaining:
+        def score(i):
+            redundancy = max(
+                (len(terms[i] & terms[j]) / (len(terms[i] | terms[j]) or 1) for j in order),
+                default=0.0,
+            )
+            return lambda_ * relevance[i] - (1 - lambda_) * redundancy
+        best = max(remaining, key=score)
+        order.append(best)
+        remaining.remove(best)
+
+    return [docs[i] for i in order]
+
+def _assemble(question: str, docs: Sequence[str], budget: int) -> Dict[str, Any]:
+    unique = deduplicate(docs)
+    packed, used, truncated = [], 0, 0
+
+    for doc in mmr_order(question, unique):
+        remaining = budget - used
+        # not worth sending a sliver of a document
+        if remaining < min(64, CONTEXT_DOC_MAX_TOKENS):
+            break
+        text = truncate_tokens(doc, min(CONTEXT_DOC_MAX_TOKENS, remaining))
+        truncated += text is not doc
+        packed.append(text)
+        used += estimate_tokens(text)
+
+    return {
+        "context": "\n".join(packed),
+        "docs_out": len(packed),
+        "duplicates": len(docs) - len(unique),
+        "truncated": truncated,
+    }
+
+
+def pack_context(question: str, docs: Sequence[str], budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """
+    Prompt context for `docs`: deduplicated, diversified and cut to a token
+    budget. Grading and generation on the same docs share one cache entry.
+    A budget of 0 turns packing off: the docs are joined unchanged.
+    """
+    if budget <= 0:
+        return "\n".join(docs)
+
+    key = (question, tuple(docs), budget)
+    result = CONTEXT_CACHE.get(key)
+    CONTEXT_STATS["requests"] += 1
+    if result is None:
+        result = _assemble(question, docs, budget)
+        CONTEXT_CACHE.set(key, result)
+    else:
+        CONTEXT_STATS["cache_hits"] += 1
+
+    tokens_in = estimate_tokens("\n".join(docs))
+    tokens_out = estimate_tokens(result["context"])
+    CONTEXT_STATS["docs_in"] += len(docs)
+    CONTEXT_STATS["docs_out"] += result["docs_out"]
+    CONTEXT_STATS["duplicates"] += result["duplicates"]
+    CONTEXT_STATS["truncated"] += result["truncated"]
+    CONTEXT_STATS["tokens_in"] += tokens_in
+    CONTEXT_STATS["tokens_out"] += tokens_out
+    LOGGER.info(
+        f"Context packed: {len(docs)} -> {result['docs_out']} docs, "
+        f"{tokens_in} -> {tokens_out} tokens ({tokens_in - tokens_out} saved)"
+    )
+
+    return result["context"]
+
+def context_stats() -> Dict[str, Any]:
+    keys = (
+        "requests", "cache_hits", "docs_in", "docs_out",
+        "duplicates", "truncated", "tokens_in", "tokens_out",
+    )
+    stats = {key: CONTEXT_STATS[key] for key in keys}
+    stats["tokens_saved"] = stats["tokens_in"] - stats["tokens_out"]
+    return stats
@@ -0,0 +1,42 @@
+"""
+Draw the RAG graph. Nothing here runs when the app starts.
+
+By default the Mermaid source is written, which needs no network and
+renders on GitHub or with mermaid-cli. `--png` renders an image through
+the mermaid.ink web service instead.
+
+    python -m services.nodes.diagram                # imgs/rag_graph.mmd
+    python -m services.nodes.diagram --png          # imgs/rag_graph.png
+"""
+import argparse
+
+from constants.config import PATH
+from services.nodes import make_rag_graph
+
+
+def draw_rag_graph(output: str, png: bool = False, max_retries: int = 5, retry_delay: float = 2.0) -> str:
+    graph = make_rag_graph().get_graph(xray=True)
+
+    if png:
+        graph.draw_mermaid_png(
+            output_file_path=output,
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+        )
+    else:
+        with open(output, "w") as f:
+            f.write(graph.draw_mermaid())
+
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Draw the RAG graph")
+    parser.add_argument("--png", action="store_true", help="render a PNG via mermaid.ink (network)")
+    parser.add_argument("--output", help="output file, defaults to imgs/rag_graph.mmd / .png")
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--retry-delay", type=float, default=2.0)
+    args = parser.parse_args()
+
+    output = args.output or f"{PATH}/imgs/rag_graph.{'png' if args.png else 'mmd'}"
+    print(draw_rag_graph(output, args.png, args.max_retries, args.retry_delay))
@@ -2,6 +2,7 @@ from constants.log import LOGGER
 from models.llm import get_model
 from constants.params import RAGState
 from constants.prompt import GENERATE_PROMPT
+from services.nodes.context import pack_context
 
 
 async def generate_answer(state: RAGState):
@@ -13,8 +14,11 @@ async def generate_answer(state: RAGState):
 
     prompt = GENERATE_PROMPT.invoke({
         "question": query,
-        "context": "\n".join(retrieved_docs),
+        "context": pack_context(query, retrieved_docs),
     })
     response = await model.ainvoke(prompt)
 
-    return {"final_answer": response.content}
\ No newline at end of file
+    return {
+        "final_answer": response.content,
+        "grounded": state.get("grounded", False),
+    }
\ No newline at end of file
@@ -0,0 +1,46 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from utils.cache import TTLCache
+
+
+_MISSING = object()
+
+# node name -> result cache, configured by make_rag_graph()
+NODE_CACHES: Dict[str, TTLCache] = {}
+
+
+def configure_node_caches(node_cache_config: Dict[str, Dict[str, Any]]) -> None:
+    """Create one LRU/TTL cache per node; a maxsize of 0 disables it."""
+    NODE_CACHES.clear()
+    for node_name, params in node_cache_config.items():
+        if params.get("maxsize", 0) > 0:
+            NODE_CACHES[node_name] = TTLCache(
+                maxsize=params["maxsize"],
+                ttl=params.get("ttl"),
+            )
+
+async def memoized(
+    node_name: str,
+    key: Hashable,
+    compute: Callable[[], Awaitable[Any]],
+) -> Any:
+    """Return the cached result of a node for `key`, computing it on a miss."""
+    cache = NODE_CACHES.get(node_name)
+    if cache is None:
+        return await compute()
+
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = await compute()
+        cache.set(key, value)
+
+    return value
+
+def invalidate_node_cache(node_name: str = None) -> None:
+    """Clear one node cache, or all of them."""
+    for name, cache in NODE_CACHES.items():
+        if node_name is None or name == node_name:
+            cache.clear()
+
+def node_cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {node_name: cache.stats() for node_name, cache in NODE_CACHES.items()}
\ No newline at end of file
@@ -1,18 +1,41 @@
-from typing import Literal
+from typing import Literal, Union
+from langgraph.types import Send
+from langgraph.constants import TAG_NOSTREAM
 
 from constants.log import LOGGER
 from models.llm import get_model
-from constants.config import MAX_REWRITE_ITERATIONS
+from utils.helpers import estimate_tokens
+from services.nodes.memo import memoized
+from services.usage import token_budget_exhausted
+from services.metrics import RAG_REWRITE_ITERATIONS, TOKEN_BUDGET_STOPS
+from services.nodes.context import pack_context
+from services.nodes.relevance import local_grade, GRADING_STATS
+from services.nodes.speculation import (
+    start_speculative_rewrite, cancel_speculative_rewrite, take_speculative_rewrite
+)
+from constants.config import MAX_REWRITE_ITERATIONS, SPECULATIVE_REWRITE
 from constants.params import RAGState, GradeDocuments
 from constants.prompt import REWRITE_PROMPT, GRADE_PROMPT
 
 
-async def rewrite_question(state: RAGState):
+async def _rewrite(query: str, usage: dict = None) -> str:
+    """LLM rewrite of a query, memoized on the query text."""
+    async def rewrite():
+        model = get_model()
+        prompt = REWRITE_PROMPT.invoke({"question": query})
+        # intermediate output, kept out of the client token stream
+        response = await model.ainvoke(prompt, config={"tags": [TAG_NOSTREAM]})
+        if usage is not None and response.usage_metadata:
+            usage.update(response.usage_metadata)
+        return response.content
+
+    return await memoized("rewrite_question", (query,), rewrite)
+
+async def rewrite_question(state: RAGState, config):
     """Rewrite the original user question."""
     LOGGER.info("Inside Rewrite Question")
     query = state.get("query", "")
     iteration_count = state.get("iteration_count", 0)
-    model = get_model()
 
     # Skip rewrite on the very first pass — use the original query as-is
     if iteration_count == 0:
@@ -21,20 +44,32 @@ async def rewrite_question(state: RAGState):
             "iteration_count": iteration_count + 1,
         }
 
-    prompt = REWRITE_PROMPT.invoke({"question": query})
-    response = await model.ainvoke(prompt)
+    RAG_REWRITE_ITERATIONS.inc()
+
+    # Use the rewrite started speculatively while grading, if any
+    rewritten_query = await take_speculative_rewrite(
+        config["configurable"].get("speculation"), query
+    )
+    if rewritten_query is None:
+        rewritten_query = await _rewrite(query)
 
     return {
-        "query": response.content,
+        "query": rewritten_query,
         "iteration_count": iteration_count + 1,
     }
 
-async def grade_documents(state: RAGState) -> Literal["generate_answer", "rewrite_question"]:
+def _generate(state: RAGState, grounded: bool) -> Send:
+    """Route to generate_answer, recording whether the docs passed grading."""
+    return Send("generate_answer", {**state, "grounded": grounded})
+
+async def grade_documents(state: RAGState, config) -> Union[Send, Literal["rewrite_question"]]:
     """
     Decide next step after retrieval:
-      - If docs are relevant        → generate_answer
+      - If docs are relevant        → generate_answer (grounded)
       - If docs are irrelevant AND iterations remaining → rewrite_question (loop)
       - If max iterations hit       → generate_answer anyway (fail-safe)
+      - If the token budget is spent → generate_answer anyway
+    Only a grounded answer is stored in the answer cache.
     """
     LOGGER.info("Inside Grade Documents")
     question = state.get("query", "")
@@ -44,20 +79,51 @@ async def grade_documents(state: RAGState) -> Literal["generate_answer", "rewrit
 
     # Fail-safe: if we've rewritten too many times, just generate with what we have
     if iteration_count >= MAX_REWRITE_ITERATIONS:
-        return "generate_answer"
+        GRADING_STATS["max_iterations"] += 1
+        return _generate(state, grounded=False)
+
+    # Same when the run / session token budget is spent
+    if token_budget_exhausted():
+        GRADING_STATS["token_budget"] += 1
+        TOKEN_BUDGET_STOPS.inc()
+        return _generate(state, grounded=False)
 
     # If no docs were retrieved at all, no point grading — rewrite
     if not retrieved_docs:
+        GRADING_STATS["no_docs"] += 1
         return "rewrite_question"
 
+    # Obvious matches / misses are graded locally, skipping the LLM call
+    local_score = local_grade(question, retrieved_docs)
+    if local_score is not None:
+        return _generate(state, grounded=True) if local_score == "yes" else "rewrite_question"
+
+    # Speculative mode: rewrite for the next iteration while the LLM grades
+    speculation = config["configurable"].get("speculation") if SPECULATIVE_REWRITE else None
+    if speculation is not None:
+        start_speculative_rewrite(
+            speculation, question, lambda usage: _rewrite(question, usage)
+        )
+
+    GRADING_STATS["llm"] += 1
     prompt = GRADE_PROMPT.invoke({
         "question": question,
-        "context": "\n".join(retrieved_docs),
+        "context": pack_context(question, retrieved_docs),
     })
     structured_model = model.with_structured_output(GradeDocuments.model_json_schema())
-    response = await structured_model.ainvoke(prompt)
+    try:
+        response = await structured_model.ainvoke(prompt, config={"tags": [TAG_NOSTREAM]})
+    except BaseException:
+        if speculation is not None:
+            cancel_speculative_rewrite(speculation, question)
+        raise
 
     if response["binary_score"] == "yes":
-        return "generate_answer"
+        if speculation is not None:
+            cancel_speculative_rewrite(
+                speculation, question,
+                prompt_tokens=estimate_tokens(REWRITE_PROMPT.format(question=question)),
+            )
+        return _generate(state, grounded=True)
     
     return "rewrite_question"
\ No newline at end of file
@@ -0,0 +1,75 @@
+from collections import Counter
+from typing import List, Optional
+
+from utils.lexical import BM25, content_tokens
+from constants.config import (
+    GRADE_LOCAL_SCORER, GRADE_HIGH_THRESHOLD, GRADE_LOW_THRESHOLD
+)
+
+
+# decision path -> count: local_yes, local_no, llm, no_docs, max_iterations, token_budget
+GRADING_STATS: Counter = Counter()
+
+
+def overlap_score(question: str, retrieved_docs: List[str]) -> float:
+    """Best fraction of the question's content terms found in a single doc."""
+    query = set(content_tokens(question))
+    if not query:
+        return 0.0
+    return max(
+        (len(query & set(content_tokens(doc))) / len(query) for doc in retrieved_docs),
+        default=0.0,
+    )
+
+def bm25_score(question: str, retrieved_docs: List[str]) -> float:
+    """
+    Best BM25 score over the retrieved docs, normalized to [0, 1] by the
+    score of an average-length doc holding every query term once, so a doc
+    matching the whole question scores ~1. (The theoretical upper bound
+    needs unbounded term frequency; single mentions only reach ~0.4 of it.)
+    """
+    query = set(content_tokens(question))
+    bm25 = BM25([content_tokens(doc) for doc in retrieved_docs])
+    full_match = sum(bm25.idf(term) for term in query)
+    if not full_match:
+        return 0.0
+    return min(1.0, max(bm25.scores(query).values(), default=0.0) / full_match)
+
+SCORERS = {
+    "overlap": overlap_score,
+    "bm25": bm25_score,
+}
+
+
+def local_grade(
+    question: str,
+    retrieved_docs: List[str],
+    scorer: str = GRADE_LOCAL_SCORER,
+    high: float = GRADE_HIGH_THRESHOLD,
+    low: Optional[float] = GRADE_LOW_THRESHOLD,
+) -> Optional[str]:
+    """
+    Grade relevance locally when the answer is obvious.
+    Returns "yes", "no" (only when a `low` threshold is set), or None when
+    the LLM grader has to decide.
+    """
+    if scorer not in SCORERS:
+        return None
+
+    score = SCORERS[scorer](question, retrieved_docs)
+    if score >= high:
+        GRADING_STATS["local_yes"] += 1
+        return "yes"
+    if low is not None and score <= low:
+        GRADING_STATS["local_no"] += 1
+        return "no"
+    return None
+
+def grading_stats() -> dict:
+    graded = GRADING_STATS["local_yes"] + GRADING_STATS["local_no"] + GRADING_STATS["llm"]
+    return {
+        **{path: GRADING_STATS[path] for path in ("local_yes", "local_no", "llm", "no_docs", "max_iterations", "token_budget")},
+        "llm_calls_saved_ratio": (
+            (GRADING_STATS["local_yes"] + GRADING_STATS["local_no"]) / graded if graded else 0.0
+        ),
+    }
@@ -1,22 +1,101 @@
 import os
+import asyncio
+
+from typing import Dict, List, Sequence, Tuple
+from langgraph.constants import TAG_NOSTREAM
 
 from constants.log import LOGGER
-from constants.params import RAGState
+from models.llm import get_model
+from constants.params import RAGState, QueryVariants
+from constants.prompt import MULTI_QUERY_PROMPT
+from constants.config import (
+    RETRIEVAL_TOP_K, RETRIEVAL_MODE, MULTI_QUERY_COUNT, MULTI_QUERY_CONCURRENCY, RRF_K,
+    SINGLE_FLIGHT
+)
+from utils.helpers import normalize_query
+from utils.singleflight import get_single_flight
+from services.nodes.memo import memoized
 
 
-async def retrieval_node(state: RAGState, config):
-    LOGGER.info("Inside Retrieval Node")
-    index = config["configurable"]["index_pinecone"]
-    query = state.get('query', '')
+# identical searches in flight at the same time share one call
+RETRIEVAL_FLIGHT = get_single_flight("retrieval_node", SINGLE_FLIGHT)
+
 
-    results = index.search(
-        namespace=os.getenv("PINECONE_NAMESPACE"),
-        query={
-                "inputs": {"text": query}, 
-                "top_k": 10
+async def _search(retrieval_client, query: str, namespace: str) -> Tuple[str, ...]:
+    """Ranked text_answer values for one query, memoized and coalesced per query."""
+    async def search():
+        results = await retrieval_client.asearch(
+            namespace=namespace,
+            query={
+                "inputs": {"text": query},
+                "top_k": RETRIEVAL_TOP_K
             },
             fields=["text", "text_answer"]
+        )
+        return tuple(hit['fields']['text_answer'] for hit in results['result']['hits'])
+
+    # one key for the memo and for coalescing, so spellings of a query that
+    # share a flight also share the cached result
+    key = (normalize_query(query), namespace, RETRIEVAL_TOP_K)
+    return await memoized("retrieval_node", key, lambda: RETRIEVAL_FLIGHT.do(key, search))
+
+async def generate_query_variants(query: str, count: int = MULTI_QUERY_COUNT) -> List[str]:
+    """Alternative phrasings of `query` from a single LLM call."""
+    async def generate():
+        model = get_model()
+        prompt = MULTI_QUERY_PROMPT.invoke({"question": query, "count": count})
+        structured_model = model.with_structured_output(QueryVariants.model_json_schema())
+        response = await structured_model.ainvoke(prompt, config={"tags": [TAG_NOSTREAM]})
+        return tuple(q.strip() for q in response.get("queries", []) if q and q.strip())
+
+    try:
+        variants = await memoized("multi_query", (query, count), generate)
+    except Exception as e:
+        LOGGER.warning(f"Query variant generation failed, searching the original query only: {e}")
+        return []
+
+    return [q for q in dict.fromkeys(variants) if q != query][:count]
+
+def reciprocal_rank_fusion(ranked_lists: Sequence[Sequence[str]], k: int = RRF_K) -> List[str]:
+    """Merge ranked lists by sum of 1 / (k + rank); duplicates collapse into one entry."""
+    scores: Dict[str, float] = {}
+    for ranked in ranked_lists:
+        for rank, doc in enumerate(dict.fromkeys(ranked), start=1):
+            scores[doc] = scores.get(doc, 0.0) + 1.0 / (k + rank)
+
+    return sorted(scores, key=scores.get, reverse=True)
+
+async def _multi_query_search(retrieval_client, query: str, namespace: str) -> List[str]:
+    queries = [query] + await generate_query_variants(query)
+    semaphore = asyncio.Semaphore(MULTI_QUERY_CONCURRENCY)
+
+    async def bounded_search(q):
+        async with semaphore:
+            return await _search(retrieval_client, q, namespace)
+
+    results = await asyncio.gather(
+        *(bounded_search(q) for q in queries), return_exceptions=True
     )
 
-    retrieved_docs = [hit['fields']['text_answer'] for hit in results['result']['hits']]
-    return {"retrieved_docs": retrieved_docs}
\ No newline at end of file
+    # One failed variant should not sink the others
+    ranked_lists = [r for r in results if not isinstance(r, BaseException)]
+    if not ranked_lists:
+        raise results[0]
+    for q, r in zip(queries, results):
+        if isinstance(r, BaseException):
+            LOGGER.warning(f"Search failed for query variant {q!r}: {r}")
+
+    return reciprocal_rank_fusion(ranked_lists)[:RETRIEVAL_TOP_K]
+
+async def retrieval_node(state: RAGState, config):
+    LOGGER.info("Inside Retrieval Node")
+    retrieval_client = config["configurable"]["retrieval_client"]
+    query = state.get('query', '')
+    namespace = os.getenv("PINECONE_NAMESPACE")
+
+    if RETRIEVAL_MODE == "multi_query":
+        retrieved_docs = await _multi_query_search(retrieval_client, query, namespace)
+    else:
+        retrieved_docs = await _search(retrieval_client, query, namespace)
+
+    return {"retrieved_docs": list(retrieved_docs)}
@@ -0,0 +1,70 @@
+import time
+import asyncio
+
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+# started, used, cancelled, wasted_prompt_tokens, wasted_completion_tokens,
+# latency_saved_ms
+SPECULATION_STATS: Counter = Counter()
+
+
+def start_speculative_rewrite(
+    speculation: Dict[str, Any],
+    query: str,
+    rewrite: Callable[[Dict[str, int]], Awaitable[str]],
+) -> None:
+    """Start rewriting `query` for the next iteration while grading runs."""
+    usage: Dict[str, int] = {}
+    entry = speculation[query] = {
+        "task": asyncio.create_task(rewrite(usage)),
+        "usage": usage,
+        "started": time.perf_counter(),
+    }
+    entry["task"].add_done_callback(lambda _: entry.setdefault("finished", time.perf_counter()))
+    SPECULATION_STATS["started"] += 1
+
+def cancel_speculative_rewrite(speculation: Dict[str, Any], query: str, prompt_tokens: int = 0) -> None:
+    """Grading passed: drop the speculative rewrite and record its cost."""
+    entry = speculation.pop(query, None)
+    if entry is None:
+        return
+
+    task = entry["task"]
+    if task.done() and not task.cancelled() and task.exception() is None:
+        usage = entry["usage"]
+    else:
+        task.cancel()
+        # Prompt tokens are billed once the request was sent
+        usage = {"input_tokens": prompt_tokens}
+
+    SPECULATION_STATS["cancelled"] += 1
+    SPECULATION_STATS["wasted_prompt_tokens"] += usage.get("input_tokens", 0)
+    SPECULATION_STATS["wasted_completion_tokens"] += usage.get("output_tokens", 0)
+
+async def take_speculative_rewrite(speculation: Optional[Dict[str, Any]], query: str) -> Optional[str]:
+    """Grading failed: await the speculative rewrite, if one was started."""
+    entry = (speculation or {}).pop(query, None)
+    if entry is None:
+        return None
+
+    waited_from = time.perf_counter()
+    try:
+        rewritten_query = await entry["task"]
+    except Exception:
+        return None
+
+    # The part of the rewrite that overlapped grading is latency saved
+    finished = entry.get("finished") or time.perf_counter()
+    saved = min(waited_from, finished) - entry["started"]
+    SPECULATION_STATS["used"] += 1
+    SPECULATION_STATS["latency_saved_ms"] += int(max(saved, 0) * 1000)
+    return rewritten_query
+
+def speculation_stats() -> Dict[str, Any]:
+    keys = (
+        "started", "used", "cancelled", "wasted_prompt_tokens",
+        "wasted_completion_tokens", "latency_saved_ms",
+    )
+    return {key: SPECULATION_STATS[key] for key in keys}
@@ -0,0 +1,166 @@
+import time
+import asyncio
+
+from itertools import islice
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from services.metrics import SESSION_QUEUE_WAIT, SESSION_RUN_CONFLICTS
+from constants.config import SESSION_MAX_IDLE, SESSION_QUEUE_TIMEOUT
+
+
+POLICIES = ("queue", "reject", "supersede")
+
+
+class SessionBusy(Exception):
+    """Another run holds the session and the policy does not wait for it; maps to HTTP 409."""
+
+
+class RunSuperseded(Exception):
+    """The run was cancelled (or never started) because a newer request took the session."""
+
+
+class _Session:
+    __slots__ = ("lock", "holder", "waiters", "generation")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.holder: Optional["SessionSlot"] = None
+        self.waiters = 0
+        # bumped by every supersede, so older waiters know to give up
+        self.generation = 0
+
+    @property
+    def idle(self) -> bool:
+        return not self.lock.locked() and not self.waiters
+
+
+class SessionSlot:
+    """Exclusive hold on one thread_id; `bind` the task a supersede should cancel."""
+
+    def __init__(self, session: _Session):
+        self._session = session
+        self._task: Optional[asyncio.Task] = None
+        self._released = False
+        self.superseded = False
+
+    @property
+    def bound(self) -> bool:
+        return self._task is not None
+
+    def bind(self, task: asyncio.Task) -> None:
+        self._task = task
+        if self.superseded:
+            task.cancel()
+
+    def supersede(self) -> None:
+        self.superseded = True
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        if self._session.holder is self:
+            self._session.holder = None
+        self._session.lock.release()
+
+
+class SessionRuns:
+    """
+    Serializes agent runs per thread_id so two requests never write the same
+    checkpoint thread at once. What happens to a request that finds its
+    session busy depends on the policy:
+
+      - queue:     wait (up to `queue_timeout`) for the running one to finish
+      - reject:    fail right away with SessionBusy
+      - supersede: cancel the running one (and drop older waiters), then run
+
+    Idle sessions are kept in LRU order and trimmed to `max_idle`.
+    """
+
+    def __init__(self, max_idle: int = SESSION_MAX_IDLE, queue_timeout: float = SESSION_QUEUE_TIMEOUT):
+        self.max_idle = max_idle
+        self.queue_timeout = queue_timeout
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self.stats_counters: Dict[str, float] = {
+            "runs": 0,
+            "queued": 0,
+            "rejected": 0,
+            "superseded": 0,
+            "timeouts": 0,
+            "evicted": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def _session(self, thread_id: str) -> _Session:
+        session = self._sessions.get(thread_id)
+        if session is None:
+            session = self._sessions[thread_id] = _Session()
+        self._sessions.move_to_end(thread_id)
+
+        # drop the least recently used idle sessions; busy ones are skipped
+        excess = len(self._sessions) - self.max_idle
+        for key in list(islice(self._sessions, max(excess, 0))):
+            if self._sessions[key].idle and key != thread_id:
+                del self._sessions[key]
+                self.stats_counters["evicted"] += 1
+        return session
+
+    async def acquire(self, thread_id: str, policy: str = "queue") -> SessionSlot:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown session policy: {policy}")
+
+        stats = self.stats_counters
+        session = self._session(thread_id)
+
+        if session.lock.locked():
+            if policy == "reject":
+                stats["rejected"] += 1
+                SESSION_RUN_CONFLICTS.labels("rejected").inc()
+                raise SessionBusy(f"session {thread_id} already has a run in progress")
+            if policy == "supersede":
+                session.generation += 1
+                if session.holder is not None:
+                    session.holder.supersede()
+                    stats["superseded"] += 1
+                    SESSION_RUN_CONFLICTS.labels("superseded").inc()
+            stats["queued"] += 1
+
+        generation = session.generation
+        session.waiters += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(session.lock.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+            SESSION_RUN_CONFLICTS.labels("timeout").inc()
+            raise SessionBusy(f"timed out waiting for the run in progress on session {thread_id}")
+        finally:
+            session.waiters -= 1
+
+        waited = time.monotonic() - started
+        stats["wait_seconds"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+        SESSION_QUEUE_WAIT.labels(policy).observe(waited)
+
+        if session.generation != generation:
+            # a newer request superseded this one while it was queued
+            session.lock.release()
+            raise RunSuperseded(f"superseded by a newer request on session {thread_id}")
+
+        stats["runs"] += 1
+        slot = session.holder = SessionSlot(session)
+        return slot
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats_counters)
+        stats["sessions"] = len(self._sessions)
+        stats["busy_sessions"] = sum(not s.idle for s in self._sessions.values())
+        stats["avg_wait_seconds"] = stats["wait_seconds"] / stats["runs"] if stats["runs"] else 0.0
+        return stats
+
+
+SESSION_RUNS = SessionRuns()
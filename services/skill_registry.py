@@ -0,0 +1,245 @@
+import os
+import time
+import asyncio
+import threading
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.helpers import estimate_tokens
+from utils.lexical import BM25, content_tokens
+from services.metrics import SKILL_PROMPT_TOKENS
+from constants.config import SKILLS, SKILLS_DIR, SKILL_RELOAD_INTERVAL
+
+
+class Skill:
+    __slots__ = ("name", "description", "path", "mtime_ns", "body", "body_mtime_ns")
+
+    def __init__(self, name: str, description: str, path: str, mtime_ns: int):
+        self.name = name
+        self.description = description
+        self.path = path
+        self.mtime_ns = mtime_ns
+        # read on first load_skill, re-read when the file changes
+        self.body: Optional[str] = None
+        self.body_mtime_ns = 0
+
+    @property
+    def prompt_line(self) -> str:
+        return f"- **{self.name}**: {self.description}"
+
+
+def _split_front_matter(text: str) -> Tuple[Dict[str, str], str]:
+    """`---` delimited `key: value` header of a skill file, and the rest."""
+    if not text.startswith("---"):
+        return {}, text
+    header, sep, body = text[3:].partition("\n---")
+    if not sep:
+        return {}, text
+
+    meta = {}
+    for line in header.splitlines():
+        key, colon, value = line.partition(":")
+        if colon:
+            meta[key.strip()] = value.strip().strip("\"'")
+    return meta, body.lstrip("\n")
+
+def _first_paragraph(body: str, limit: int = 200) -> str:
+    for line in body.splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            return line[:limit]
+    return ""
+
+
+class SkillRegistry:
+    """
+    Index of the skills in `directory` (one markdown file per skill, named
+    after it). The index is built on first use and rebuilt when a file is
+    added, removed or changed; the directory is checked at most once per
+    `reload_interval` seconds. Bodies are read only when a skill is loaded
+    and re-read when their file changes, so edits apply without a restart.
+    Async callers use `arefresh`, which does the scan on a worker thread.
+
+    A description comes from `descriptions` (the SKILLS config), else from
+    a `description:` front matter field, else from the first paragraph.
+    """
+
+    def __init__(
+        self,
+        directory: str = SKILLS_DIR,
+        descriptions: Dict[str, str] = None,
+        reload_interval: float = SKILL_RELOAD_INTERVAL,
+    ):
+        self.directory = directory
+        self.descriptions = descriptions or {}
+        self.reload_interval = reload_interval
+        # bumped on every rebuild, so prompts built from the index can be cached
+        self.version = 0
+        # (skills by name, names in BM25 document order, BM25, tokens of all
+        # description lines); swapped as one tuple so readers never mix builds
+        self._index: Tuple[Dict[str, Skill], List[str], Optional[BM25], int] = ({}, [], None, 0)
+        self._signature: Optional[Tuple] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        self.stats_counters: Dict[str, float] = {
+            "index_builds": 0,
+            "body_reads": 0,
+            "selections": 0,
+            "skills_injected": 0,
+            "prompt_tokens_injected": 0,
+            "prompt_tokens_all": 0,
+        }
+
+    # --- index ---
+
+    def _scan(self) -> Tuple:
+        try:
+            entries = [
+                (entry.name, entry.stat().st_mtime_ns)
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith(".md") and entry.is_file()
+            ]
+        except FileNotFoundError:
+            entries = []
+        return tuple(sorted(entries))
+
+    def _read_skill(self, file_name: str, mtime_ns: int) -> Skill:
+        name = file_name[:-len(".md")]
+        path = os.path.join(self.directory, file_name)
+        description = self.descriptions.get(name)
+
+        if description is None:
+            with open(path, "r") as f:
+                meta, body = _split_front_matter(f.read())
+            description = meta.get("description") or _first_paragraph(body)
+        return Skill(name, description, path, mtime_ns)
+
+    def refresh(self, force: bool = False) -> None:
+        """Rebuild the index if the directory changed since the last check."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return
+
+        with self._lock:
+            if not force and now - self._checked_at < self.reload_interval:
+                return
+            signature = self._scan()
+            self._checked_at = time.monotonic()
+            if signature == self._signature:
+                return
+
+            previous = self._index[0]
+            skills = {}
+            for file_name, mtime_ns in signature:
+                skill = previous.get(file_name[:-len(".md")])
+                if skill is None or skill.mtime_ns != mtime_ns:
+                    skill = self._read_skill(file_name, mtime_ns)
+                skills[skill.name] = skill
+
+            order = list(skills)
+            bm25 = BM25([
+                content_tokens(f"{name.replace('_', ' ')} {skills[name].description}")
+                for name in order
+            ])
+            all_prompt_tokens = sum(estimate_tokens(skill.prompt_line) for skill in skills.values())
+            self._index = (skills, order, bm25, all_prompt_tokens)
+            self._signature = signature
+            self.version += 1
+            self.stats_counters["index_builds"] += 1
+
+    def refresh_due(self) -> bool:
+        return time.monotonic() - self._checked_at >= self.reload_interval
+
+    async def arefresh(self, force: bool = False) -> None:
+        """`refresh` off the event loop; a no-op until the interval has passed."""
+        if force or self.refresh_due():
+            await asyncio.to_thread(self.refresh, force)
+
+    def get(self, name: str) -> Optional[Skill]:
+        self.refresh()
+        return self._index[0].get(name)
+
+    def names(self) -> List[str]:
+        self.refresh()
+        return list(self._index[1])
+
+    def load(self, name: str) -> Optional[str]:
+        """Body of the skill (front matter stripped), re-read if the file changed."""
+        skill = self.get(name)
+        if skill is None:
+            return None
+
+        try:
+            mtime_ns = os.stat(skill.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if skill.body is None or skill.body_mtime_ns != mtime_ns:
+            with open(skill.path, "r") as f:
+                _, skill.body = _split_front_matter(f.read())
+            skill.body_mtime_ns = mtime_ns
+            self.stats_counters["body_reads"] += 1
+        return skill.body
+
+    # --- relevance ---
+
+    def search(self, text: str, top_k: int, min_score: float = 0.0, refresh: bool = True) -> List[Skill]:
+        """
+        Skills whose name / description match `text`, best first (BM25,
+        normalized to [0, 1]). With `refresh=False` the current index is used
+        as is (the caller ran `arefresh`).
+        """
+        if refresh:
+            self.refresh()
+        skills, order, bm25, _ = self._index
+        query = content_tokens(text.replace("_", " "))
+        if not query or bm25 is None:
+            return []
+
+        # normalized by the terms the index knows, so words that no skill uses
+        # ("need", "help") do not push every match under min_score
+        max_score = bm25.max_score([term for term in query if term in bm25.postings]) or 1.0
+        ranked = sorted(bm25.scores(query).items(), key=lambda item: item[1], reverse=True)
+        return [
+            skills[order[i]]
+            for i, score in ranked[:top_k]
+            if score / max_score >= min_score
+        ]
+
+    def select(self, text: str, top_k: int, min_score: float, refresh: bool = True) -> List[Skill]:
+        """
+        Skills to describe in the prompt for a user turn. With no more than
+        `top_k` skills all of them are described, which keeps the system
+        prompt identical across turns (and served from the prompt cache).
+        """
+        if refresh:
+            self.refresh()
+        skills, order, _, all_prompt_tokens = self._index
+        if len(order) <= top_k:
+            selected = [skills[name] for name in order]
+        else:
+            selected = self.search(text, top_k, min_score, refresh=False)
+
+        injected = sum(estimate_tokens(skill.prompt_line) for skill in selected)
+        stats = self.stats_counters
+        stats["selections"] += 1
+        stats["skills_injected"] += len(selected)
+        stats["prompt_tokens_injected"] += injected
+        stats["prompt_tokens_all"] += all_prompt_tokens
+        SKILL_PROMPT_TOKENS.labels("injected").inc(injected)
+        SKILL_PROMPT_TOKENS.labels("saved").inc(all_prompt_tokens - injected)
+        return selected
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats_counters)
+        stats["skills"] = len(self._index[0])
+        stats["version"] = self.version
+        stats["prompt_tokens_saved"] = stats["prompt_tokens_all"] - stats["prompt_tokens_injected"]
+        stats["avg_skills_injected"] = (
+            stats["skills_injected"] / stats["selections"] if stats["selections"] else 0.0
+        )
+        return stats
+
+
+SKILL_REGISTRY = SkillRegistry(
+    descriptions={skill["name"]: skill["description"] for skill in SKILLS},
+)
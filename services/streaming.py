@@ -0,0 +1,155 @@
+import asyncio
+
+from contextlib import aclosing
+from collections import Counter
+from typing import Any, AsyncIterator, Dict
+from langchain.messages import AIMessage, ToolMessage
+from langgraph.graph.state import CompiledStateGraph
+
+from constants.log import LOGGER
+from utils.helpers import estimate_tokens
+from utils.ratelimit import RateLimitExceeded
+from services.usage import track_usage
+from services.metrics import STREAM_CANCELLATIONS, STREAM_TOKENS_SAVED
+
+
+# runs, completed, cancelled, repaired_threads, tokens_streamed,
+# completed_tokens, tokens_saved (estimated)
+STREAM_STATS: Counter = Counter()
+
+CANCELLED_TOOL_MESSAGE = "Cancelled: the client disconnected before this tool finished."
+RATE_LIMITED_TOOL_MESSAGE = "Failed: an upstream rate limit was reached before this tool finished."
+
+
+async def repair_cancelled_thread(
+    single_agent: CompiledStateGraph,
+    config: Dict[str, Any],
+    content: str = CANCELLED_TOOL_MESSAGE,
+) -> None:
+    """
+    Answer tool calls left open by a cancelled (or failed) run.
+    The last checkpoint of a run cancelled inside the tools node holds an
+    AIMessage whose tool calls never got a ToolMessage, which the model
+    rejects on the next turn; close them so the thread can continue.
+    """
+    state = await single_agent.aget_state(config)
+    messages = state.values.get("messages", [])
+    if not messages or not isinstance(messages[-1], AIMessage) or not messages[-1].tool_calls:
+        return
+
+    await single_agent.aupdate_state(
+        config,
+        {"messages": [
+            ToolMessage(
+                content=content,
+                tool_call_id=tool_call["id"],
+                name=tool_call["name"],
+            )
+            for tool_call in messages[-1].tool_calls
+        ]},
+        as_node="tools",
+    )
+    STREAM_STATS["repaired_threads"] += 1
+
+async def finish_cancelled_run(
+    single_agent: CompiledStateGraph,
+    config: Dict[str, Any],
+    content: str = CANCELLED_TOOL_MESSAGE,
+) -> None:
+    """Repair the thread of a cancelled run; runs to completion even if cancelled again."""
+    async def repair():
+        try:
+            await repair_cancelled_thread(single_agent, config, content)
+        except Exception as e:
+            LOGGER.error(f"Failed to repair cancelled thread {config['configurable'].get('thread_id')}: {e}")
+
+    task = asyncio.ensure_future(repair())
+    try:
+        await asyncio.shield(task)
+    except asyncio.CancelledError:
+        pass
+
+def _record_cancelled(streamed: int) -> None:
+    STREAM_STATS["cancelled"] += 1
+    STREAM_CANCELLATIONS.inc()
+    # tokens a finished run would still have produced, from the running average
+    completed = STREAM_STATS["completed"]
+    if completed:
+        average = STREAM_STATS["completed_tokens"] / completed
+        saved = int(max(average - streamed, 0))
+        STREAM_STATS["tokens_saved"] += saved
+        STREAM_TOKENS_SAVED.inc(saved)
+
+async def agent_stream_events(
+    single_agent: CompiledStateGraph,
+    inputs: Any,
+    config: Dict[str, Any],
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    {"type", "content"} events of one agent run, tagged with the node that
+    produced them. Tokens of the RAG subgraph run by rag_search come through
+    as "generate_answer" while the answer is generated; its rewrite /
+    grading calls are tagged nostream and never reach the client.
+
+    Only the "messages" stream mode is subscribed; a pending interrupt is
+    read from the checkpoint once the run stops. The last event is the
+    run's token usage.
+
+    When the consumer goes away (the SSE client disconnected) the run is
+    cancelled: the in-flight node tasks, the nested rag_search graph and
+    their pending LLM requests are cancelled with it, and the thread is
+    repaired so its checkpoint stays usable.
+    """
+    STREAM_STATS["runs"] += 1
+    streamed = 0
+
+    try:
+        # aclosing: stopping this generator stops the run right away
+        with track_usage(config.get("run_id"), config["configurable"]["thread_id"]) as usage:
+            async with aclosing(single_agent.astream(
+                inputs,
+                config,
+                stream_mode="messages",
+                subgraphs=True,
+            )) as stream:
+                async for _, (message_chunk, metadata) in stream:
+                    if message_chunk.content:
+                        streamed += estimate_tokens(str(message_chunk.content))
+                        yield {
+                            "type": metadata['langgraph_node'],
+                            "content": message_chunk.content
+                        }
+    except (asyncio.CancelledError, GeneratorExit):
+        LOGGER.info(f"Run {config.get('run_id')} cancelled after {streamed} streamed tokens")
+        _record_cancelled(streamed)
+        # the thread is consistent again before the next run can take it
+        await finish_cancelled_run(single_agent, config)
+        raise
+    except RateLimitExceeded:
+        # reported to the client as an error event; the session must stay usable for the retry
+        await finish_cancelled_run(single_agent, config, RATE_LIMITED_TOOL_MESSAGE)
+        raise
+    finally:
+        STREAM_STATS["tokens_streamed"] += streamed
+
+    STREAM_STATS["completed"] += 1
+    STREAM_STATS["completed_tokens"] += streamed
+
+    state = await single_agent.aget_state(config)
+    if state.interrupts:
+        yield {
+            "type": "interrupt",
+            "content": "interrupt received"
+        }
+
+    yield {
+        "type": "usage",
+        "content": usage.as_dict()
+    }
+
+def stream_stats() -> Dict[str, Any]:
+    keys = (
+        "runs", "completed", "cancelled", "repaired_threads",
+        "tokens_streamed", "tokens_saved",
+    )
+    return {key: STREAM_STATS[key] for key in keys}
@@ -1,6 +1,6 @@
 from langchain.tools import tool
 
-from constants.config import SKILLS
+from services.skill_registry import SKILL_REGISTRY
 
 
 @tool
@@ -14,11 +14,12 @@ def load_skill(skill_name: str) -> str:
     Args:
         skill_name: The name of the skill to load (e.g., "expense_reporting", "travel_booking")
     """
-    # Find and return the requested skill
-    for skill in SKILLS:
-        if skill["name"] == skill_name:
-            return f"Loaded skill: {skill_name}\n\n{skill['content']}"
+    # Find and return the requested skill (read from disk only when it changed)
+    content = SKILL_REGISTRY.load(skill_name)
+    if content is not None:
+        return f"Loaded skill: {skill_name}\n\n{content}"
 
-    # Skill not found
-    available = ", ".join(s["name"] for s in SKILLS)
-    return f"Skill '{skill_name}' not found. Available skills: {available}"
\ No newline at end of file
+    # Skill not found; suggest the closest names rather than listing every skill
+    closest = SKILL_REGISTRY.search(skill_name, top_k=5)
+    available = ", ".join(skill.name for skill in closest) or "none match"
+    return f"Skill '{skill_name}' not found. Closest skills: {available}"
@@ -1,10 +1,37 @@
 import os
 
-from pinecone import Pinecone
 from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage
 
-from services.nodes import RAG_GRAPH
+from services.nodes import get_rag_graph
+from constants.config import SINGLE_FLIGHT
+from utils.helpers import normalize_query
+from utils.ratelimit import RateLimitExceeded
+from utils.singleflight import get_single_flight
+from services.answer_cache import ANSWER_CACHE
+from models.retrieval import get_retrieval_client
+
+
+# identical questions asked concurrently share one RAG graph run
+RAG_SEARCH_FLIGHT = get_single_flight("rag_search", SINGLE_FLIGHT)
+
+
+async def run_rag_graph(query: str) -> dict:
+    """One uncached RAG graph run for `query`; errors are raised, not turned into a reply."""
+    current_state = {
+        "query": query,
+        "messages": HumanMessage(query)
+    }
+
+    config = {
+        "configurable": {
+            "retrieval_client": get_retrieval_client(),
+            # per-run slot for rewrites started speculatively during grading
+            "speculation": {},
+        },
+    }
+
+    return await get_rag_graph().ainvoke(current_state, config)
 
 
 @tool
@@ -19,20 +46,29 @@ async def rag_search(query: str) -> str:
     Returns:
         A generated answer based on retrieved documents.
     """
-    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-    index = pc.Index(os.getenv("PINECONE_INDEX_HOST"))
+    namespace = os.getenv("PINECONE_NAMESPACE", "")
+    # one key for the answer cache and for coalescing concurrent runs
+    key = normalize_query(query)
 
-    current_state = {
-        "query": query,
-        "messages": HumanMessage(query)
-    }
-    
-    config = {
-        "configurable": {
-            "index_pinecone": index,
-        },
-    }
-    
-    response = await RAG_GRAPH.ainvoke(current_state, config)
+    # A cached answer skips every LLM and search call in the subgraph
+    cached_answer = ANSWER_CACHE.get(key, namespace)
+    if cached_answer is not None:
+        return cached_answer
+
+    async def run():
+        response = await run_rag_graph(query)
+        # fail-safe answers (max rewrites, token budget) are not shared
+        if response.get("grounded"):
+            ANSWER_CACHE.set(key, response["final_answer"], namespace)
+        return response["final_answer"]
 
-    return response["final_answer"]
\ No newline at end of file
+    # Tokens stream to the caller that started the run; the others get the answer
+    try:
+        return await RAG_SEARCH_FLIGHT.do((key, namespace), run)
+    except RateLimitExceeded as e:
+        # a tool result, not an exception: aborting here would leave the agent's
+        # tool call unanswered in the checkpoint and break the session's next turn
+        return (
+            f"The knowledge base search is rate limited ({e}); "
+            f"try again in {e.retry_after_header} seconds."
+        )
\ No newline at end of file
@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from utils.cache import TTLCache
+from utils.usage import RUN_USAGE, RunUsage, current_usage
+from services.metrics import LLM_TOKENS, LLM_COST, RUN_TOKENS
+from constants.config import (
+    LLM_PROMPT_COST_PER_1M, LLM_COMPLETION_COST_PER_1M, LLM_CACHED_PROMPT_COST_PER_1M,
+    RUN_TOKEN_BUDGET, SESSION_TOKEN_BUDGET, SESSION_USAGE_MAX
+)
+
+
+# session_id -> tokens spent by its finished runs (LRU, for the session budget)
+SESSION_USAGE = TTLCache(maxsize=SESSION_USAGE_MAX)
+
+USAGE_TOTALS: Dict[str, float] = {
+    "runs": 0,
+    "prompt_tokens": 0,
+    "cached_prompt_tokens": 0,
+    "completion_tokens": 0,
+    "cost_usd": 0.0,
+}
+
+
+@contextmanager
+def track_usage(run_id: str, session_id: str) -> Iterator[RunUsage]:
+    """
+    Account every LLM call made inside the block to one RunUsage.
+    Calls of a rag_search coalesced into another run's (single-flight) or
+    answered from cache are charged to that run / nobody.
+    """
+    usage = RunUsage(
+        run_id=run_id,
+        session_id=session_id,
+        session_tokens=SESSION_USAGE.get(session_id, 0, count=False),
+        prompt_cost_per_1m=LLM_PROMPT_COST_PER_1M,
+        completion_cost_per_1m=LLM_COMPLETION_COST_PER_1M,
+        cached_prompt_cost_per_1m=LLM_CACHED_PROMPT_COST_PER_1M,
+    )
+    token = RUN_USAGE.set(usage)
+    try:
+        yield usage
+    finally:
+        RUN_USAGE.reset(token)
+        _record(usage)
+
+def _record(usage: RunUsage) -> None:
+    SESSION_USAGE.set(usage.session_id, usage.session_tokens + usage.total_tokens)
+
+    USAGE_TOTALS["runs"] += 1
+    USAGE_TOTALS["prompt_tokens"] += usage.prompt_tokens
+    USAGE_TOTALS["cached_prompt_tokens"] += usage.cached_prompt_tokens
+    USAGE_TOTALS["completion_tokens"] += usage.completion_tokens
+    USAGE_TOTALS["cost_usd"] += usage.cost
+
+    for node, entry in usage.by_node.items():
+        LLM_TOKENS.labels("prompt", node).inc(entry["prompt_tokens"])
+        LLM_TOKENS.labels("cached_prompt", node).inc(entry["cached_prompt_tokens"])
+        LLM_TOKENS.labels("completion", node).inc(entry["completion_tokens"])
+    LLM_COST.inc(usage.cost)
+    RUN_TOKENS.observe(usage.total_tokens)
+
+def token_budget_exhausted() -> bool:
+    """Whether the current run has spent its run or session token budget."""
+    usage = current_usage()
+    if usage is None:
+        return False
+    if RUN_TOKEN_BUDGET and usage.total_tokens >= RUN_TOKEN_BUDGET:
+        return True
+    if SESSION_TOKEN_BUDGET and usage.session_tokens + usage.total_tokens >= SESSION_TOKEN_BUDGET:
+        return True
+    return False
+
+def usage_stats() -> Dict[str, Any]:
+    runs = USAGE_TOTALS["runs"]
+    prompt_tokens = USAGE_TOTALS["prompt_tokens"]
+    tokens = prompt_tokens + USAGE_TOTALS["completion_tokens"]
+    return {
+        **USAGE_TOTALS,
+        "avg_tokens_per_run": tokens / runs if runs else 0.0,
+        "prompt_cache_hit_ratio": USAGE_TOTALS["cached_prompt_tokens"] / prompt_tokens if prompt_tokens else 0.0,
+        "run_token_budget": RUN_TOKEN_BUDGET,
+        "session_token_budget": SESSION_TOKEN_BUDGET,
+        "sessions_tracked": len(SESSION_USAGE),
+    }
@@ -0,0 +1,93 @@
+import time
+import asyncio
+
+from typing import Any, Dict, Tuple
+
+from constants.log import LOGGER
+from models.llm import get_model
+from models.retrieval import get_retrieval_client
+from services.tools.rag_tools import run_rag_graph
+from constants.config import (
+    WARMUP_ENABLED, WARMUP_REQUIRED, WARMUP_QUERY,
+    WARMUP_TIMEOUT, WARMUP_RETRIES, WARMUP_RETRY_DELAY, WARMUP_MAX_RETRY_DELAY
+)
+
+
+# pending -> warming -> ready, or failed after WARMUP_RETRIES attempts (then only
+# the connections are re-checked, ready once they answer); "skipped" when
+# WARMUP_ENABLED is off
+WARMUP_STATE: Dict[str, Any] = {
+    "status": "pending",
+    "attempts": 0,
+    "steps": {},
+    "error": None,
+    "seconds": None,
+}
+
+
+async def _step(name: str, func, *args) -> Any:
+    start = time.perf_counter()
+    result = func(*args)
+    if asyncio.iscoroutine(result):
+        result = await result
+    WARMUP_STATE["steps"][name] = round(time.perf_counter() - start, 3)
+    return result
+
+async def warm_up_connections() -> None:
+    # provider SDK import and the pooled HTTP client
+    await _step("llm_client", get_model)
+    # retrieval connection pool (describe_index_stats for Pinecone)
+    await _step("retrieval_client", asyncio.to_thread, lambda: get_retrieval_client().warm_up())
+
+async def warm_up_once() -> None:
+    await warm_up_connections()
+    # one real request end to end: LLM and vector search connections opened.
+    # The graph is run directly: rag_search would turn a rate limit into a
+    # reply (and report ready) and put the answer in the shared answer cache.
+    await _step(
+        "rag_graph",
+        asyncio.wait_for, run_rag_graph(WARMUP_QUERY), WARMUP_TIMEOUT,
+    )
+
+async def run_warm_up() -> None:
+    """
+    Warm up, retrying until it succeeds; the outcome is reported by readiness().
+    The full warm-up (with its LLM call) is tried WARMUP_RETRIES times; after
+    that the status reads "failed" and only the connections are re-checked,
+    so a pod that came up during an upstream outage becomes ready once the
+    upstream is back without paying for an LLM call on every retry.
+    """
+    if not WARMUP_ENABLED:
+        WARMUP_STATE["status"] = "skipped"
+        return
+
+    WARMUP_STATE["status"] = "warming"
+    start = time.perf_counter()
+
+    attempt = 0
+    while True:
+        attempt += 1
+        WARMUP_STATE["attempts"] = attempt
+        try:
+            if attempt <= WARMUP_RETRIES:
+                await warm_up_once()
+            else:
+                await warm_up_connections()
+            WARMUP_STATE["status"] = "ready"
+            WARMUP_STATE["error"] = None
+            break
+        except Exception as e:
+            WARMUP_STATE["error"] = f"{type(e).__name__}: {e}"
+            if attempt >= WARMUP_RETRIES:
+                WARMUP_STATE["status"] = "failed"
+            delay = min(WARMUP_RETRY_DELAY * 2 ** (attempt - 1), WARMUP_MAX_RETRY_DELAY)
+            LOGGER.warning(f"Warm-up attempt {attempt} failed, retrying in {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+
+    WARMUP_STATE["seconds"] = round(time.perf_counter() - start, 3)
+    LOGGER.info(f"Warm-up {WARMUP_STATE['status']} in {WARMUP_STATE['seconds']}s: {WARMUP_STATE['steps']}")
+
+def readiness() -> Tuple[bool, Dict[str, Any]]:
+    status = WARMUP_STATE["status"]
+    ready = status in ("ready", "skipped") or (status == "failed" and not WARMUP_REQUIRED)
+    return ready, {"ready": ready, **WARMUP_STATE}
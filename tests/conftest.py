@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MAX_REWRITE_ITERATIONS", "3")
+os.environ.setdefault("WARMUP_ENABLED", "false")
+
+# the app runs on the offline stand-ins: no Gemini / Pinecone calls, no keys
+from benchmarks.standins import LatencyModel, install
+
+install(LatencyModel(0.0), tokens_per_second=0, answer_tokens=5, search=LatencyModel(0.0))
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from main_client import app
+
+    with TestClient(app) as test_client:
+        yield test_client
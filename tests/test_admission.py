@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from utils.ratelimit import AdmissionController, RateLimitExceeded
+
+
+def test_queue_timeout_does_not_leak_slots():
+    async def scenario():
+        admission = AdmissionController(max_inflight=2, max_queue=10, queue_timeout=0.01)
+        held = [await admission.admit(), await admission.admit()]
+
+        for _ in range(20):
+            with pytest.raises(RateLimitExceeded):
+                await admission.admit()
+
+        for release in held:
+            release()
+        # both slots are free again after the timed-out waiters gave up
+        again = [await admission.admit(), await admission.admit()]
+        assert admission.stats()["in_flight"] == 2
+        assert admission.stats()["waiting"] == 0
+        for release in again:
+            release()
+        assert not admission._semaphore.locked()
+
+    asyncio.run(scenario())
+
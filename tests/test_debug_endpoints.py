@@ -0,0 +1,4 @@
+def test_debug_endpoints_are_off_by_default(client):
+    assert client.delete("/debug/answer-cache").status_code == 404
+    assert client.post("/debug/skills/reload").status_code == 404
+    assert client.get("/debug/usage").status_code == 404
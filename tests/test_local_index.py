@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from models.local_index import HashingEmbedder, LocalIndex, LocalRetrievalClient, build_local_index
+
+
+DOCS = [
+    {"id": "refund", "text": "How long do refunds take?", "text_answer": "Refunds take 5 business days."},
+    {"id": "password", "text": "How do I reset my password?", "text_answer": "Use the forgot password link."},
+    {"id": "travel", "text": "How do I book a flight?", "text_answer": "Use the travel portal."},
+]
+
+
+def query(text, top_k=2):
+    return {"inputs": {"text": text}, "top_k": top_k}
+
+
+def test_hashing_embedder_is_stable():
+    embedder = HashingEmbedder(64)
+    first = embedder.embed_query("reset my password")
+    assert first.shape == (64,)
+    assert np.array_equal(first, HashingEmbedder(64).embed_query("reset my password"))
+    assert embedder.embed_documents([]).shape == (0, 64)
+
+
+@pytest.mark.parametrize("mode", ["bm25", "vector", "hybrid"])
+def test_search_ranks_the_matching_doc_first(tmp_path, mode):
+    build_local_index(DOCS, str(tmp_path))
+    index = LocalIndex(str(tmp_path))
+
+    # the matrix is memory-mapped, not copied into memory
+    assert isinstance(index.embeddings, np.memmap)
+    assert np.allclose(np.linalg.norm(index.embeddings, axis=1), 1.0)
+
+    results = index.search("refunds business days", top_k=2, mode=mode)
+    assert len(results) == 2
+    assert index.docs[results[0][0]]["id"] == "refund"
+    assert results[0][1] >= results[1][1]
+
+
+def test_bm25_ignores_unknown_terms(tmp_path):
+    build_local_index(DOCS, str(tmp_path))
+    index = LocalIndex(str(tmp_path))
+    assert not index.bm25_scores("zebra xylophone").any()
+
+
+def test_client_returns_the_pinecone_shape(tmp_path):
+    build_local_index(DOCS, str(tmp_path))
+    client = LocalRetrievalClient(str(tmp_path), mode="bm25")
+
+    hits = client.search("", query("reset password", 1), ["text_answer"])["result"]["hits"]
+    client.close()
+    assert hits == [{
+        "_id": "password",
+        "_score": pytest.approx(hits[0]["_score"]),
+        "fields": {"text_answer": "Use the forgot password link."},
+    }]
+
+
+def test_reload_picks_up_a_rebuilt_corpus(tmp_path):
+    build_local_index(DOCS, str(tmp_path))
+    build_local_index(DOCS[:1], str(tmp_path / "billing"))
+    client = LocalRetrievalClient(str(tmp_path), mode="bm25")
+
+    def top(namespace, text):
+        return client.search(namespace, query(text, 1), ["text_answer"])["result"]["hits"][0]["_id"]
+
+    # "support" has no sub-directory and is served from the root corpus
+    assert top("", "book a flight") == "travel"
+    assert top("support", "book a flight") == "travel"
+    assert top("billing", "refunds") == "refund"
+
+    build_local_index(DOCS + [{"id": "hotel", "text": "Book a hotel room", "text_answer": "Use the hotel portal."}], str(tmp_path))
+    client.reload("")
+
+    # the default namespace and every namespace falling back to the root are reloaded
+    assert top("", "hotel room") == "hotel"
+    assert top("support", "hotel room") == "hotel"
+    # a namespace with its own corpus is left loaded
+    assert "billing" in client.indexes
+    client.close()
@@ -0,0 +1,86 @@
+import pytest
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, MessagesState, StateGraph
+from langgraph.types import Command, interrupt
+
+from services.checkpointers.memory import BoundedMemorySaver
+
+
+def make_graph(saver):
+    def reply(state):
+        return {"messages": [AIMessage(f"reply {len(state['messages'])}")]}
+
+    def approve(state):
+        last = state["messages"][-1].text
+        if last.startswith("delete"):
+            return {"messages": [AIMessage(f"approved: {interrupt('approve?')}")]}
+        return {}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("reply", reply)
+    builder.add_node("approve", approve)
+    builder.set_entry_point("approve")
+    builder.add_edge("approve", "reply")
+    builder.add_edge("reply", END)
+    return builder.compile(checkpointer=saver)
+
+
+CONFIG = {"configurable": {"thread_id": "t1"}}
+
+
+@pytest.mark.parametrize("delta_messages", [False, True])
+def test_history_is_pruned_and_state_survives(delta_messages):
+    saver = BoundedMemorySaver(max_checkpoints=3, delta_messages=delta_messages)
+    graph = make_graph(saver)
+
+    for turn in range(6):
+        graph.invoke({"messages": [HumanMessage(f"question {turn}")]}, CONFIG)
+
+    # only the latest checkpoints stay resident
+    assert len(saver.storage["t1"][""]) == 3
+    assert len(list(graph.get_state_history(CONFIG))) == 3
+    assert saver.pruned_checkpoints > 0
+
+    # the latest state still holds the whole conversation
+    messages = graph.get_state(CONFIG).values["messages"]
+    assert len(messages) == 12
+    assert [m.text for m in messages[-2:]] == ["question 5", "reply 11"]
+
+    # no blob is left behind for a dropped checkpoint
+    reachable = {
+        (thread_id, ns, channel, version)
+        for (thread_id, ns, _), versions in saver._checkpoint_versions.items()
+        for channel, version in versions.items()
+    }
+    bases = {(*key[:3], base) for key, (base, _) in saver.deltas.items()}
+    assert set(saver.blobs) <= reachable | bases
+
+
+@pytest.mark.parametrize("delta_messages", [False, True])
+def test_interrupt_resumes_after_pruning(delta_messages):
+    saver = BoundedMemorySaver(max_checkpoints=2, delta_messages=delta_messages)
+    graph = make_graph(saver)
+
+    for turn in range(3):
+        graph.invoke({"messages": [HumanMessage(f"question {turn}")]}, CONFIG)
+    graph.invoke({"messages": [HumanMessage("delete ticket 7")]}, CONFIG)
+
+    snapshot = graph.get_state(CONFIG)
+    assert snapshot.next == ("approve",)
+
+    result = graph.invoke(Command(resume="yes"), CONFIG)
+    assert [m.text for m in result["messages"][-3:]] == ["delete ticket 7", "approved: yes", "reply 8"]
+    assert len(saver.storage["t1"][""]) <= 2
+
+
+def test_least_recently_used_thread_is_evicted():
+    saver = BoundedMemorySaver(max_threads=2)
+    graph = make_graph(saver)
+
+    for thread_id in ("a", "b", "c"):
+        graph.invoke({"messages": [HumanMessage("hi")]}, {"configurable": {"thread_id": thread_id}})
+
+    assert set(saver.storage) == {"b", "c"}
+    assert saver.evicted_threads == 1
+    assert not [key for key in saver.blobs if key[0] == "a"]
@@ -0,0 +1,11 @@
+from utils.metrics import CONTENT_TYPE_LATEST
+
+
+def test_metrics_endpoint_serves_prometheus_text(client):
+    client.get("/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE_LATEST
+    assert 'chatbot_http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+    assert "# TYPE chatbot_rag_rewrite_iterations_total counter" in response.text
@@ -0,0 +1,79 @@
+from uuid import uuid4
+
+from models.llm import ModelStatsCallback
+
+
+def test_started_times_are_bounded_when_calls_never_end():
+    stats = {"calls": 0, "call_seconds": 0.0, "errors": 0}
+    callback = ModelStatsCallback(stats)
+    callback.max_in_flight = 8
+
+    # cancelled calls: started, never ended
+    for _ in range(100):
+        callback.on_chat_model_start({}, [[]], run_id=uuid4())
+    assert len(callback._started) == 8
+
+    run_id = uuid4()
+    callback.on_chat_model_start({}, [[]], run_id=run_id)
+    callback.on_llm_end(None, run_id=run_id)
+    assert run_id not in callback._started
+    assert stats["calls"] == 101
+    assert stats["call_seconds"] > 0
+
+
+def test_callbacks_run_on_the_event_loop_thread():
+    import asyncio
+    import threading
+
+    from langchain_core.callbacks import AsyncCallbackManager
+    from langchain_core.messages import HumanMessage
+
+    stats = {"calls": 0, "call_seconds": 0.0, "errors": 0}
+    callback = ModelStatsCallback(stats)
+    threads = []
+    start = callback.on_chat_model_start
+
+    def recording_start(*args, **kwargs):
+        threads.append(threading.current_thread())
+        start(*args, **kwargs)
+
+    callback.on_chat_model_start = recording_start
+
+    async def scenario():
+        manager = AsyncCallbackManager(handlers=[callback])
+        await manager.on_chat_model_start({}, [[HumanMessage("hi")]])
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(scenario())
+    assert threads == [loop_thread]
+
+
+def test_usage_pending_is_bounded_when_calls_never_end():
+    from models.llm import UsageCallback
+    from utils.usage import RUN_USAGE, RunUsage
+
+    callback = UsageCallback()
+    callback.max_in_flight = 8
+    token = RUN_USAGE.set(RunUsage())
+    try:
+        for _ in range(100):
+            callback.on_chat_model_start({}, [[]], run_id=uuid4())
+    finally:
+        RUN_USAGE.reset(token)
+    assert len(callback._pending) == 8
+
+
+def test_rate_limit_charges_are_bounded_when_calls_never_end():
+    import asyncio
+
+    from models.llm import RateLimitCallback
+
+    callback = RateLimitCallback()
+    callback.max_in_flight = 8
+
+    async def scenario():
+        for _ in range(100):
+            await callback.on_chat_model_start({}, [[]], run_id=uuid4())
+
+    asyncio.run(scenario())
+    assert len(callback._charged) == 8
@@ -0,0 +1,45 @@
+import uuid
+
+from services.tools.rag_tools import rag_search
+from utils.ratelimit import RateLimitExceeded
+
+
+def ask(client, session_id, query="How do I reset my password?"):
+    return client.post("/single-agent/generate-answer", json={"session_id": session_id, "query": query})
+
+
+def test_rate_limited_search_is_a_tool_result(client, monkeypatch):
+    from models import retrieval
+
+    async def rate_limited(*args, **kwargs):
+        raise RateLimitExceeded("retrieval rate limit reached", retry_after=2)
+
+    monkeypatch.setattr(retrieval.RETRIEVAL_CLIENT, "asearch", rate_limited)
+    session_id = uuid.uuid4().hex
+
+    response = ask(client, session_id, "Is the refund policy rate limited?")
+    assert response.status_code == 200
+    assert response.json()["status"] != "error"
+
+    monkeypatch.undo()
+    response = ask(client, session_id)
+    assert response.status_code == 200
+    assert response.json()["status"] != "error"
+
+
+def test_next_turn_succeeds_after_429(client, monkeypatch):
+    async def rate_limited(*args, **kwargs):
+        raise RateLimitExceeded("LLM rate limit reached", retry_after=2)
+
+    # raised from the tools node, past rag_search's own handling
+    monkeypatch.setattr(rag_search, "coroutine", rate_limited)
+    session_id = uuid.uuid4().hex
+
+    response = ask(client, session_id)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+
+    monkeypatch.undo()
+    response = ask(client, session_id)
+    assert response.status_code == 200
+    assert response.json()["status"] != "error"
@@ -0,0 +1,55 @@
+import time
+import asyncio
+
+import pytest
+
+from models.retrieval import PineconeRetrievalClient
+from services.nodes.retrieval import retrieval_node
+from benchmarks.retrieval_concurrency import SlowIndex, ticker
+
+
+def test_slow_search_does_not_block_the_event_loop():
+    latency = 0.3
+
+    async def scenario():
+        client = PineconeRetrievalClient(SlowIndex(latency), max_concurrency=8)
+        config = {"configurable": {"retrieval_client": client}}
+        stop = asyncio.Event()
+        tick_task = asyncio.create_task(ticker(stop))
+
+        await asyncio.gather(*(
+            retrieval_node({"query": f"question {i}"}, config) for i in range(4)
+        ))
+        stop.set()
+        ticks = await tick_task
+        client.close()
+        return ticks
+
+    ticks = asyncio.run(scenario())
+    # a blocking search would hold the loop for the whole latency
+    assert ticks["max_lag"] < latency / 2
+
+
+def test_timed_out_search_keeps_its_slot_until_the_thread_finishes():
+    latency = 0.3
+
+    async def scenario():
+        client = PineconeRetrievalClient(SlowIndex(latency), max_concurrency=1, timeout=0.05)
+        query = {"inputs": {"text": "question"}, "top_k": 1}
+
+        with pytest.raises(asyncio.TimeoutError):
+            await client.asearch("default", query, ["text"])
+        # the abandoned search still occupies the only pool thread
+        assert client._semaphore.locked()
+
+        start = time.perf_counter()
+        client.timeout = 1.0
+        await client.asearch("default", query, ["text"])
+        waited = time.perf_counter() - start
+        client.close()
+
+        assert not client._semaphore.locked()
+        return waited
+
+    # the second search waited for the abandoned one, then ran itself
+    assert asyncio.run(scenario()) >= latency
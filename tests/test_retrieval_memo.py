@@ -0,0 +1,29 @@
+import asyncio
+
+from constants.config import NODE_CACHE_CONFIG
+from services.nodes.memo import configure_node_caches
+from services.nodes.retrieval import _search
+
+
+class CountingClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def asearch(self, namespace, query, fields):
+        self.calls += 1
+        return {"result": {"hits": [{"fields": {"text": "refunds", "text_answer": "5 days"}}]}}
+
+
+def test_memo_and_single_flight_share_the_normalized_key():
+    configure_node_caches(NODE_CACHE_CONFIG)
+    client = CountingClient()
+
+    async def scenario():
+        first = await _search(client, "How do refunds work?", "billing")
+        # a later spelling with the same normalized form is a memo hit
+        second = await _search(client, "how do refunds work", "billing")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == ("5 days",)
+    assert client.calls == 1
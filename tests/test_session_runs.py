@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from services.session_runs import SessionRuns, SessionBusy
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_queue_waits_and_conflicts_are_exported():
+    waits = _sample("chatbot_session_queue_wait_seconds_count", policy="queue")
+    rejected = _sample("chatbot_session_run_conflicts_total", outcome="rejected")
+    superseded = _sample("chatbot_session_run_conflicts_total", outcome="superseded")
+
+    async def scenario():
+        runs = SessionRuns(queue_timeout=1.0)
+        slot = await runs.acquire("s1", "queue")
+        with pytest.raises(SessionBusy):
+            await runs.acquire("s1", "reject")
+
+        # a newer request takes the session from the running one
+        newer = asyncio.create_task(runs.acquire("s1", "supersede"))
+        await asyncio.sleep(0)
+        assert slot.superseded
+        slot.release()
+        (await newer).release()
+
+    asyncio.run(scenario())
+
+    assert _sample("chatbot_session_queue_wait_seconds_count", policy="queue") == waits + 1
+    assert _sample("chatbot_session_queue_wait_seconds_count", policy="supersede") >= 1
+    assert _sample("chatbot_session_run_conflicts_total", outcome="rejected") == rejected + 1
+    assert _sample("chatbot_session_run_conflicts_total", outcome="superseded") == superseded + 1
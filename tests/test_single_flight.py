@@ -0,0 +1,23 @@
+import asyncio
+
+from prometheus_client import REGISTRY
+
+# registers the single-flight collector
+import services.metrics
+from utils.singleflight import get_single_flight
+
+
+def test_coalesced_calls_are_exported():
+    flight = get_single_flight("test_flight")
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", compute) for _ in range(3)))
+
+    assert asyncio.run(scenario()) == ["answer"] * 3
+    assert REGISTRY.get_sample_value(
+        "chatbot_single_flight_coalesced_total", {"flight": "test_flight"}
+    ) == 2
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+from services.skill_registry import SkillRegistry
+
+
+def test_rescan_runs_off_the_event_loop(tmp_path, monkeypatch):
+    for name, description in (("refunds", "Refund policy"), ("travel_booking", "Book flights")):
+        (tmp_path / f"{name}.md").write_text(f"---\ndescription: {description}\n---\nbody\n")
+
+    registry = SkillRegistry(str(tmp_path), reload_interval=60)
+    scanned_on = []
+    scan = registry._scan
+
+    def recording_scan():
+        scanned_on.append(threading.current_thread())
+        return scan()
+
+    monkeypatch.setattr(registry, "_scan", recording_scan)
+
+    async def turn():
+        await registry.arefresh()
+        return registry.select("how do refunds work", top_k=1, min_score=0.1, refresh=False)
+
+    selected = asyncio.run(turn())
+    assert [skill.name for skill in selected] == ["refunds"]
+    assert scanned_on and threading.main_thread() not in scanned_on
+
+    # within the reload interval a turn neither scans nor leaves the loop
+    asyncio.run(turn())
+    assert len(scanned_on) == 1
+
+
+def test_skill_middleware_is_installed_by_default():
+    from services.middlewares.compile import get_middlewares
+    from services.middlewares.skill import SkillMiddleware
+
+    assert any(isinstance(m, SkillMiddleware) for m in get_middlewares(["rag_search"]))
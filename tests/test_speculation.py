@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from langgraph.types import Send
+
+from services.nodes import query_enhancement, speculation
+
+
+class FakeGrader:
+    def __init__(self, score=None, error=None):
+        self.score = score
+        self.error = error
+
+    def with_structured_output(self, schema):
+        return self
+
+    async def ainvoke(self, prompt, config=None):
+        await asyncio.sleep(0.01)
+        if self.error is not None:
+            raise self.error
+        return {"binary_score": self.score}
+
+
+@pytest.fixture
+def rewrites(monkeypatch):
+    calls = []
+
+    async def slow_rewrite(query, usage=None):
+        calls.append(query)
+        await asyncio.sleep(0.05)
+        if usage is not None:
+            usage.update({"input_tokens": 20, "output_tokens": 5})
+        return f"rewritten {query}"
+
+    monkeypatch.setattr(query_enhancement, "SPECULATIVE_REWRITE", True)
+    monkeypatch.setattr(query_enhancement, "local_grade", lambda question, docs: None)
+    monkeypatch.setattr(query_enhancement, "token_budget_exhausted", lambda: False)
+    monkeypatch.setattr(query_enhancement, "_rewrite", slow_rewrite)
+    return calls
+
+
+def state(iteration_count=1):
+    return {"query": "refund time", "retrieved_docs": ["Refunds take 5 days."], "iteration_count": iteration_count}
+
+
+def leftover_tasks():
+    return [t for t in asyncio.all_tasks() if t is not asyncio.current_task() and not t.done()]
+
+
+def test_speculative_rewrite_is_cancelled_when_grading_passes(rewrites, monkeypatch):
+    monkeypatch.setattr(query_enhancement, "get_model", lambda: FakeGrader("yes"))
+    cancelled = speculation.SPECULATION_STATS["cancelled"]
+
+    async def scenario():
+        slot = {}
+        route = await query_enhancement.grade_documents(state(), {"configurable": {"speculation": slot}})
+        await asyncio.sleep(0)
+        return route, slot, leftover_tasks()
+
+    route, slot, tasks = asyncio.run(scenario())
+    assert isinstance(route, Send) and route.node == "generate_answer"
+    assert slot == {}
+    assert tasks == []
+    assert rewrites == ["refund time"]
+    assert speculation.SPECULATION_STATS["cancelled"] == cancelled + 1
+
+
+def test_speculative_rewrite_is_cancelled_when_grading_fails_with_an_error(rewrites, monkeypatch):
+    monkeypatch.setattr(query_enhancement, "get_model", lambda: FakeGrader(error=ConnectionError("down")))
+
+    async def scenario():
+        slot = {}
+        with pytest.raises(ConnectionError):
+            await query_enhancement.grade_documents(state(), {"configurable": {"speculation": slot}})
+        await asyncio.sleep(0)
+        return slot, leftover_tasks()
+
+    assert asyncio.run(scenario()) == ({}, [])
+
+
+def test_speculative_rewrite_is_reused_when_grading_fails(rewrites, monkeypatch):
+    monkeypatch.setattr(query_enhancement, "get_model", lambda: FakeGrader("no"))
+    used = speculation.SPECULATION_STATS["used"]
+
+    async def scenario():
+        config = {"configurable": {"speculation": {}}}
+        route = await query_enhancement.grade_documents(state(), config)
+        rewritten = await query_enhancement.rewrite_question(state(), config)
+        return route, rewritten, config["configurable"]["speculation"], leftover_tasks()
+
+    route, rewritten, slot, tasks = asyncio.run(scenario())
+    assert route == "rewrite_question"
+    assert rewritten["query"] == "rewritten refund time"
+    # the rewrite started during grading is the one used: no second LLM call
+    assert rewrites == ["refund time"]
+    assert slot == {}
+    assert tasks == []
+    assert speculation.SPECULATION_STATS["used"] == used + 1
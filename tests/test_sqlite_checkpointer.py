@@ -0,0 +1,125 @@
+import asyncio
+import operator
+
+from typing import Annotated, TypedDict
+from langgraph.graph import END, StateGraph
+from langgraph.types import Command, interrupt
+
+from services.checkpointers.sqlite import SqliteCheckpointSaver
+
+
+class State(TypedDict):
+    steps: Annotated[list, operator.add]
+
+
+def make_graph(saver, approve: bool = False):
+    def first(state):
+        return {"steps": ["first"]}
+
+    def second(state):
+        if approve:
+            return {"steps": [f"second:{interrupt('approve?')}"]}
+        return {"steps": ["second"]}
+
+    builder = StateGraph(State)
+    builder.add_node("first", first)
+    builder.add_node("second", second)
+    builder.set_entry_point("first")
+    builder.add_edge("first", "second")
+    builder.add_edge("second", END)
+    return builder.compile(checkpointer=saver)
+
+
+def config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def test_state_round_trips_through_the_file(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+
+    async def write():
+        saver = SqliteCheckpointSaver(path)
+        result = await make_graph(saver).ainvoke({"steps": []}, config("t1"))
+        await saver.aclose()
+        return result
+
+    assert asyncio.run(write())["steps"] == ["first", "second"]
+
+    # a fresh saver (another worker) reads the same thread back
+    saver = SqliteCheckpointSaver(path)
+    graph = make_graph(saver)
+    snapshot = graph.get_state(config("t1"))
+    assert snapshot.values["steps"] == ["first", "second"]
+    assert len(list(graph.get_state_history(config("t1")))) >= 3
+    saver.close()
+
+
+def test_interrupt_and_resume(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+
+    async def scenario():
+        saver = SqliteCheckpointSaver(path)
+        graph = make_graph(saver, approve=True)
+
+        await graph.ainvoke({"steps": []}, config("t2"))
+        snapshot = await graph.aget_state(config("t2"))
+        assert snapshot.next == ("second",)
+        assert snapshot.tasks[0].interrupts[0].value == "approve?"
+        await saver.aclose()
+
+        # resumed by a saver opened later on the same file
+        saver = SqliteCheckpointSaver(path)
+        graph = make_graph(saver, approve=True)
+        result = await graph.ainvoke(Command(resume="yes"), config("t2"))
+        await saver.aclose()
+        return result
+
+    assert asyncio.run(scenario())["steps"] == ["first", "second:yes"]
+
+
+def _queue_writes(saver, thread_id):
+    checkpoint = {
+        "v": 1, "id": "1", "ts": "", "channel_values": {"steps": ["queued"]},
+        "channel_versions": {"steps": saver.get_next_version(None, None)}, "versions_seen": {},
+    }
+    return asyncio.ensure_future(saver.aput(
+        config(thread_id), checkpoint, {}, checkpoint["channel_versions"],
+    ))
+
+
+def test_queued_writes_survive_close(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+
+    async def scenario():
+        # a long batch window keeps the write queued when close() runs
+        saver = SqliteCheckpointSaver(path, batch_interval=10)
+        put = _queue_writes(saver, "t3")
+        await asyncio.sleep(0)
+        assert saver._pending
+
+        saver.close()
+        await put
+
+    asyncio.run(scenario())
+
+    saver = SqliteCheckpointSaver(path)
+    assert saver.get_tuple(config("t3")).checkpoint["channel_values"] == {"steps": ["queued"]}
+    saver.close()
+
+
+def test_aclose_waits_for_the_flush(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+
+    async def scenario():
+        saver = SqliteCheckpointSaver(path, batch_interval=0.05)
+        put = _queue_writes(saver, "t4")
+        await asyncio.sleep(0)
+
+        await saver.aclose()
+        await put
+
+    asyncio.run(scenario())
+
+    saver = SqliteCheckpointSaver(path)
+    assert saver.get_tuple(config("t4")) is not None
+    saver.close()
@@ -0,0 +1,116 @@
+import asyncio
+
+import orjson
+import pytest
+
+from utils.sse import HEARTBEAT_FRAME, SSEWriter
+
+
+async def tokens(*events, delay=0.0):
+    for event in events:
+        if delay:
+            await asyncio.sleep(delay)
+        yield event
+
+
+async def collect(writer, events):
+    return [frame async for frame in writer.stream(events)]
+
+
+def decode(frames):
+    return [frame if frame == HEARTBEAT_FRAME else orjson.loads(frame[len(b"data: "):]) for frame in frames]
+
+
+def text(content, type="text"):
+    return {"type": type, "content": content}
+
+
+def test_consecutive_chunks_of_one_type_share_a_frame():
+    writer = SSEWriter(flush_interval=1.0, heartbeat_interval=60)
+    events = tokens(
+        text("Hel"), text("lo"), text("thinking", "reasoning"),
+        {"type": "tool", "content": {"name": "rag_search"}}, text(" world"),
+    )
+    assert decode(asyncio.run(collect(writer, events))) == [
+        text("Hello"),
+        text("thinking", "reasoning"),
+        {"type": "tool", "content": {"name": "rag_search"}},
+        text(" world"),
+    ]
+
+
+def test_frame_is_sent_once_it_reaches_flush_bytes():
+    writer = SSEWriter(flush_interval=1.0, flush_bytes=4, heartbeat_interval=60)
+    events = tokens(text("ab"), text("cd"), text("e"))
+    assert decode(asyncio.run(collect(writer, events))) == [text("abcd"), text("e")]
+
+
+def test_slow_chunks_are_flushed_after_flush_interval():
+    writer = SSEWriter(flush_interval=0.01, heartbeat_interval=60)
+    events = tokens(text("a"), text("b"), delay=0.05)
+    assert decode(asyncio.run(collect(writer, events))) == [text("a"), text("b")]
+
+
+def test_heartbeat_is_sent_while_waiting_on_a_slow_producer():
+    writer = SSEWriter(flush_interval=0.01, heartbeat_interval=0.02)
+
+    async def slow():
+        await asyncio.sleep(0.11)
+        yield text("done")
+
+    frames = asyncio.run(collect(writer, slow()))
+    assert frames[-1] != HEARTBEAT_FRAME
+    assert decode(frames[-1:]) == [text("done")]
+    assert 3 <= frames.count(HEARTBEAT_FRAME) <= 5
+    assert set(frames[:-1]) == {HEARTBEAT_FRAME}
+
+
+def test_no_heartbeat_while_chunks_keep_flowing():
+    writer = SSEWriter(flush_interval=0.005, heartbeat_interval=0.03)
+    events = tokens(*(text(str(i)) for i in range(10)), delay=0.01)
+    frames = asyncio.run(collect(writer, events))
+    assert HEARTBEAT_FRAME not in frames
+    assert "".join(event["content"] for event in decode(frames)) == "0123456789"
+
+
+def test_pending_text_is_flushed_before_a_producer_error():
+    writer = SSEWriter(flush_interval=1.0, heartbeat_interval=60)
+
+    async def failing():
+        yield text("partial")
+        raise ValueError("model failed")
+
+    async def scenario():
+        frames = []
+        with pytest.raises(ValueError, match="model failed"):
+            async for frame in writer.stream(failing()):
+                frames.append(frame)
+        return frames
+
+    assert decode(asyncio.run(scenario())) == [text("partial")]
+
+
+def test_closing_the_stream_cancels_the_pump_task():
+    writer = SSEWriter(flush_interval=0.001, heartbeat_interval=60)
+    state = {}
+
+    async def endless():
+        try:
+            while True:
+                await asyncio.sleep(0.001)
+                yield text("x")
+        finally:
+            state["closed"] = True
+
+    async def scenario():
+        stream = writer.stream(endless())
+        first = await anext(stream)
+        await stream.aclose()
+        await asyncio.sleep(0.01)
+        leftover = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        return first, leftover
+
+    first, leftover = asyncio.run(scenario())
+    assert decode([first])[0]["type"] == "text"
+    assert leftover == []
+    assert state == {"closed": True}
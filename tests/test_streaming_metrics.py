@@ -0,0 +1,19 @@
+from prometheus_client import REGISTRY
+
+from services import streaming
+
+
+def _sample(name):
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+def test_cancellations_and_tokens_saved_are_exported(monkeypatch):
+    monkeypatch.setattr(streaming, "STREAM_STATS", streaming.Counter(completed=2, completed_tokens=200))
+    cancelled = _sample("chatbot_stream_cancellations_total")
+    saved = _sample("chatbot_stream_tokens_saved_total")
+
+    # average finished stream is 100 tokens; this one was cut after 30
+    streaming._record_cancelled(30)
+
+    assert _sample("chatbot_stream_cancellations_total") == cancelled + 1
+    assert _sample("chatbot_stream_tokens_saved_total") == saved + 70
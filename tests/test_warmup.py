@@ -0,0 +1,59 @@
+import asyncio
+
+from services import warmup
+
+
+def test_warm_up_rechecks_only_connections_after_retries(monkeypatch):
+    full_attempts, connection_checks = [], []
+
+    async def failing():
+        full_attempts.append(1)
+        raise ConnectionError("upstream unavailable")
+
+    async def flaky_connections():
+        connection_checks.append(1)
+        if len(connection_checks) <= 2:
+            raise ConnectionError("upstream unavailable")
+
+    statuses = []
+
+    async def sleep(delay):
+        statuses.append(warmup.readiness()[1]["status"])
+
+    monkeypatch.setattr(warmup, "warm_up_once", failing)
+    monkeypatch.setattr(warmup, "warm_up_connections", flaky_connections)
+    monkeypatch.setattr(warmup, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(warmup, "WARMUP_REQUIRED", True)
+    monkeypatch.setattr(warmup, "WARMUP_RETRIES", 3)
+    monkeypatch.setattr(warmup.asyncio, "sleep", sleep)
+    monkeypatch.setitem(warmup.WARMUP_STATE, "status", "pending")
+
+    asyncio.run(warmup.run_warm_up())
+
+    # the LLM query runs WARMUP_RETRIES times, then only the connections are probed
+    assert len(full_attempts) == 3
+    assert len(connection_checks) == 3
+    assert statuses == ["warming", "warming", "failed", "failed", "failed"]
+    assert warmup.readiness()[0]
+
+def test_warm_up_raises_on_rate_limit_and_skips_the_answer_cache(monkeypatch):
+    import pytest
+
+    from models.retrieval import get_retrieval_client
+    from services.answer_cache import AnswerCache
+    from services.tools import rag_tools
+    from utils.ratelimit import RateLimitExceeded
+
+    cache = AnswerCache()
+    monkeypatch.setattr(rag_tools, "ANSWER_CACHE", cache)
+
+    asyncio.run(warmup.warm_up_once())
+    assert cache.stats()["namespaces"] == {}
+
+    async def rate_limited(*args, **kwargs):
+        raise RateLimitExceeded("retrieval rate limit reached", retry_after=2)
+
+    monkeypatch.setattr(get_retrieval_client(), "asearch", rate_limited)
+    monkeypatch.setattr(warmup, "WARMUP_QUERY", "a question no memo has seen")
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(warmup.warm_up_once())
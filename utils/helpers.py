@@ -1,15 +1,36 @@
+import re
 import json
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 from langchain.messages import AIMessage
 
 
-def read_skill_md(file_path: str) -> str:
-    with open(file_path, 'r') as f:
-        content = f.read()
-    return content
+_TOKEN_PATTERN = re.compile(r"\w+")
+# words keep inner ' . - + # and trailing + #, so "c++", "c#" and "c" stay distinct
+_QUERY_TOKEN_PATTERN = re.compile(r"\w(?:[\w'.+#-]*\w)?[+#]*")
 
-def extract_agent_response(response: dict, session_id: str = None, run_id: str = None) -> Dict[str, Any]:
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, punctuation dropped."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for budgeting and stats."""
+    return max(1, len(text) // 4) if text else 0
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a query used as a cache / coalescing key: lowercased,
+    whitespace collapsed, punctuation around words dropped.
+    """
+    return " ".join(_QUERY_TOKEN_PATTERN.findall(query.lower().replace("\u2019", "'")))
+
+def extract_agent_response(
+    response: dict,
+    session_id: str = None,
+    run_id: str = None,
+    usage: Dict[str, Any] = None,
+) -> Dict[str, Any]:
     """
     Extract and parse the structured output from agent response.
     Returns a complete, ready-to-return API response.
@@ -18,6 +39,7 @@ def extract_agent_response(response: dict, session_id: str = None, run_id: str =
         response: The agent response dictionary containing messages
         session_id: Optional session ID for tracking
         run_id: Optional run ID for tracking
+        usage: Optional token usage of the run
         
     Returns:
         Complete API response dictionary ready to return
@@ -43,6 +65,7 @@ def extract_agent_response(response: dict, session_id: str = None, run_id: str =
                 "requires_approval": True,
                 "session_id": session_id,
                 "run_id": run_id,
+                "usage": usage,
                 "message": f"About to execute: {action.get('name')}",
                 "tool_name": action.get('name'),
                 "tool_args": action.get('args'),
@@ -59,6 +82,7 @@ def extract_agent_response(response: dict, session_id: str = None, run_id: str =
                 "requires_approval": False,
                 "session_id": session_id,
                 "run_id": run_id,
+                "usage": usage,
                 "error": "No AI message found",
                 "final_answer": "No AI response found"
             }
@@ -104,6 +128,7 @@ def extract_agent_response(response: dict, session_id: str = None, run_id: str =
                     "requires_approval": False,
                     "session_id": session_id,
                     "run_id": run_id,
+                    "usage": usage,
                     "final_answer": structured_output.get('message')
                 }
             }
@@ -115,6 +140,7 @@ def extract_agent_response(response: dict, session_id: str = None, run_id: str =
                     "requires_approval": False,
                     "session_id": session_id,
                     "run_id": run_id,
+                    "usage": usage,
                     "final_answer": structured_output
                 }
             }
@@ -126,6 +152,7 @@ def extract_agent_response(response: dict, session_id: str = None, run_id: str =
             "requires_approval": False,
             "session_id": session_id,
             "run_id": run_id,
+            "usage": usage,
             "error": "Could not parse structured output",
             "final_answer": "Response format not recognized"
         }
@@ -0,0 +1,57 @@
+import math
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Sequence
+
+from utils.helpers import tokenize
+
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can could did do does for from had has have how i
+if in into is it its me my no not of on or our please should so than that the
+their them then there these they this to was we were what when where which who
+why will with would you your
+""".split())
+
+
+def content_tokens(text: str) -> List[str]:
+    """Word tokens without stopwords."""
+    return [token for token in tokenize(text) if token not in STOPWORDS]
+
+
+class BM25:
+    """Okapi BM25 over an inverted index of pre-tokenized documents."""
+
+    def __init__(self, documents: Sequence[Sequence[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_count = len(documents)
+        self.doc_lengths = [len(doc) for doc in documents]
+        self.avg_length = sum(self.doc_lengths) / self.doc_count if self.doc_count else 0.0
+
+        # term -> {doc index: term frequency}
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        for i, doc in enumerate(documents):
+            for term, freq in Counter(doc).items():
+                self.postings[term][i] = freq
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def scores(self, query: Iterable[str]) -> Dict[int, float]:
+        """BM25 score of every document sharing at least one query term."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(query):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for i, freq in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[i] / (self.avg_length or 1))
+                scores[i] += idf * freq * (self.k1 + 1) / (freq + norm)
+        return scores
+
+    def max_score(self, query: Iterable[str]) -> float:
+        """Upper bound of a document score for the query, used to normalize to [0, 1]."""
+        return sum(self.idf(term) * (self.k1 + 1) for term in set(query))
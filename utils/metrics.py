@@ -0,0 +1,62 @@
+import time
+import functools
+import inspect
+
+from typing import Callable, Sequence
+
+import prometheus_client
+# Counter, REGISTRY and CONTENT_TYPE_LATEST are re-exported for services.metrics / main_client
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, generate_latest
+
+
+# seconds; spans a cached lookup up to a slow LLM answer
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+class Histogram(prometheus_client.Histogram):
+    """prometheus_client Histogram with latency buckets by default."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        **kwargs,
+    ):
+        super().__init__(name, documentation, labelnames, buckets=buckets, **kwargs)
+
+
+def render_metrics() -> bytes:
+    """All registered metrics in the Prometheus text exposition format."""
+    return generate_latest(REGISTRY)
+
+def timed(child: prometheus_client.Histogram) -> Callable:
+    """
+    Decorator observing the wall time of a sync or async function
+    (Histogram.time() would only time the creation of a coroutine).
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    child.observe(time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - started)
+        return wrapper
+
+    return decorator
+
@@ -0,0 +1,153 @@
+import math
+import time
+import asyncio
+
+from typing import Any, Callable, Dict
+
+
+class RateLimitExceeded(Exception):
+    """Raised instead of queueing work that would wait too long; maps to HTTP 429."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` per second up to `capacity`.
+
+    `acquire` reserves tokens up front (the balance may go negative) and
+    sleeps until the reservation is covered, so waiters are served in
+    order. When the wait would exceed `max_wait` it raises
+    RateLimitExceeded right away instead. A rate of 0 disables the bucket.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waits = 0
+        self.rejections = 0
+
+    @classmethod
+    def per_minute(cls, limit: float) -> "TokenBucket":
+        """Quota per minute, allowing a burst of one minute's worth."""
+        return cls(limit / 60, limit)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float = 1) -> float:
+        if not self.rate:
+            return 0.0
+        self._refill()
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def consume(self, amount: float) -> None:
+        """Charge (or refund, if negative) tokens without waiting."""
+        if self.rate:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+    async def acquire(self, amount: float = 1, max_wait: float = float("inf"), name: str = "upstream") -> None:
+        wait = self.wait_time(amount)
+        if wait > max_wait:
+            self.rejections += 1
+            raise RateLimitExceeded(f"{name} rate limit reached", retry_after=wait)
+
+        self.consume(amount)
+        if wait > 0:
+            self.waits += 1
+            await asyncio.sleep(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.rate:
+            return {"enabled": False}
+        self._refill()
+        return {
+            "enabled": True,
+            "rate_per_second": self.rate,
+            "capacity": self.capacity,
+            "available": self.tokens,
+            "waits": self.waits,
+            "rejections": self.rejections,
+        }
+
+
+class AdmissionController:
+    """
+    Global in-flight request limit with a bounded wait queue.
+
+    Up to `max_inflight` requests run at once and up to `max_queue` more
+    wait for a slot, each for at most `queue_timeout` seconds. Anything
+    beyond that is rejected with RateLimitExceeded, whose retry_after is
+    estimated from the recent request duration and the queue length.
+    """
+
+    def __init__(self, max_inflight: int, max_queue: int, queue_timeout: float):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.avg_duration = 1.0
+        self._semaphore = asyncio.Semaphore(max_inflight)
+
+    def _retry_after(self) -> float:
+        return self.avg_duration * (self.waiting + 1) / self.max_inflight
+
+    async def admit(self) -> Callable[[], None]:
+        """Wait for a slot; returns an idempotent release callback."""
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise RateLimitExceeded("server is busy", retry_after=self._retry_after())
+
+        self.waiting += 1
+        try:
+            # a timeout that lands after a release woke us is delivered as a
+            # cancellation inside acquire(), which hands the slot on itself
+            async with asyncio.timeout(self.queue_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            self.rejected += 1
+            raise RateLimitExceeded("server is busy", retry_after=self._retry_after())
+        finally:
+            self.waiting -= 1
+
+        self.admitted += 1
+        self.in_flight += 1
+        started = time.monotonic()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            self.in_flight -= 1
+            # moving average of how long a slot is held
+            self.avg_duration = 0.9 * self.avg_duration + 0.1 * (time.monotonic() - started)
+            self._semaphore.release()
+
+        return release
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_inflight": self.max_inflight,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_duration": self.avg_duration,
+        }
@@ -0,0 +1,83 @@
+import asyncio
+
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one in-flight task.
+
+    The first caller starts `compute`; callers arriving while it runs await
+    the same task. Each waiter is shielded, so cancelling one of them does
+    not cancel the shared work; it is only cancelled once every waiter has
+    gone. The key is released as soon as the task finishes, so results are
+    never served stale from here (caching is a separate layer).
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.calls = 0
+        self.coalesced = 0
+        self.abandoned = 0
+        self._inflight: Dict[Hashable, _Flight] = {}
+
+    def _release(self, key: Hashable, flight: _Flight, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        # mark the error as retrieved when every waiter already left
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        if not self.enabled:
+            return await compute()
+
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = self._inflight[key] = _Flight(asyncio.ensure_future(compute()))
+            flight.task.add_done_callback(lambda task: self._release(key, flight, task))
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+                self.abandoned += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "in_flight": len(self._inflight),
+        }
+
+
+# name -> shared SingleFlight, see get_single_flight()
+SINGLE_FLIGHTS: Dict[str, SingleFlight] = {}
+
+
+def get_single_flight(name: str, enabled: bool = True) -> SingleFlight:
+    """Named process-wide SingleFlight, created on first use."""
+    if name not in SINGLE_FLIGHTS:
+        SINGLE_FLIGHTS[name] = SingleFlight(enabled)
+    return SINGLE_FLIGHTS[name]
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: flight.stats() for name, flight in SINGLE_FLIGHTS.items()}
@@ -0,0 +1,121 @@
+import asyncio
+import orjson
+
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+_DONE = object()
+_FLUSH = object()
+_HEARTBEAT = object()
+
+HEARTBEAT_FRAME = b": heartbeat\n\n"
+
+
+def sse_frame(event: Dict[str, Any]) -> bytes:
+    return b"data: " + orjson.dumps(event) + b"\n\n"
+
+
+class SSEWriter:
+    """
+    Turns an async iterator of {"type", "content"} events into SSE frames.
+
+    Consecutive text chunks of the same type are merged into one frame,
+    which is sent once `flush_interval` seconds have passed since its first
+    chunk or it holds `flush_bytes` of text. A heartbeat comment is sent
+    when nothing was written for `heartbeat_interval` seconds so proxies do
+    not drop a connection that is waiting on a slow tool.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 0.05,
+        flush_bytes: int = 512,
+        heartbeat_interval: float = 15.0,
+    ):
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.heartbeat_interval = heartbeat_interval
+
+    async def stream(self, events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            try:
+                async for event in events:
+                    queue.put_nowait(event)
+            except Exception as e:
+                queue.put_nowait(e)
+            finally:
+                queue.put_nowait(_DONE)
+
+        producer = asyncio.create_task(pump())
+
+        pending_type: Optional[str] = None
+        pending: List[str] = []
+        pending_size = 0
+        deadline = 0.0
+        last_write = loop.time()
+
+        # Timers post markers into the queue, so waiting costs nothing per chunk
+        flush_timer = None
+        heartbeat_timer = loop.call_at(last_write + self.heartbeat_interval, queue.put_nowait, _HEARTBEAT)
+
+        def flush() -> bytes:
+            nonlocal pending_type, pending_size, last_write
+            if flush_timer is not None:
+                flush_timer.cancel()
+            frame = sse_frame({"type": pending_type, "content": "".join(pending)})
+            pending_type, pending_size = None, 0
+            pending.clear()
+            last_write = loop.time()
+            return frame
+
+        try:
+            while True:
+                item = await queue.get()
+
+                if item is _FLUSH:
+                    if pending and loop.time() >= deadline:
+                        yield flush()
+                    continue
+
+                if item is _HEARTBEAT:
+                    if loop.time() >= last_write + self.heartbeat_interval:
+                        last_write = loop.time()
+                        yield HEARTBEAT_FRAME
+                    heartbeat_timer = loop.call_at(
+                        last_write + self.heartbeat_interval, queue.put_nowait, _HEARTBEAT
+                    )
+                    continue
+
+                if item is _DONE or isinstance(item, Exception):
+                    if pending:
+                        yield flush()
+                    if item is _DONE:
+                        return
+                    raise item
+
+                content = item.get("content")
+                if pending and (item.get("type") != pending_type or not isinstance(content, str)):
+                    yield flush()
+
+                if not isinstance(content, str):
+                    last_write = loop.time()
+                    yield sse_frame(item)
+                    continue
+
+                if not pending:
+                    pending_type = item.get("type")
+                    deadline = loop.time() + self.flush_interval
+                    flush_timer = loop.call_at(deadline, queue.put_nowait, _FLUSH)
+                pending.append(content)
+                pending_size += len(content)
+
+                if pending_size >= self.flush_bytes:
+                    yield flush()
+        finally:
+            heartbeat_timer.cancel()
+            if flush_timer is not None:
+                flush_timer.cancel()
+            producer.cancel()
@@ -0,0 +1,83 @@
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+
+class RunUsage:
+    """
+    LLM token usage of one agent run, summed over every model call it makes,
+    including the ones in nested graphs and tasks (they inherit the context).
+    `session_tokens` is what the session had spent before this run.
+    `cached_prompt_tokens` is the part of `prompt_tokens` the provider read
+    from its prefix cache.
+    """
+
+    def __init__(
+        self,
+        run_id: str = None,
+        session_id: str = None,
+        session_tokens: int = 0,
+        prompt_cost_per_1m: float = 0.0,
+        completion_cost_per_1m: float = 0.0,
+        cached_prompt_cost_per_1m: float = None,
+    ):
+        self.run_id = run_id
+        self.session_id = session_id
+        self.session_tokens = session_tokens
+        self.prompt_cost_per_1m = prompt_cost_per_1m
+        self.completion_cost_per_1m = completion_cost_per_1m
+        self.cached_prompt_cost_per_1m = (
+            prompt_cost_per_1m if cached_prompt_cost_per_1m is None else cached_prompt_cost_per_1m
+        )
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.completion_tokens = 0
+        self.calls = 0
+        # langgraph node -> {"prompt_tokens", "cached_prompt_tokens", "completion_tokens", "calls"}
+        self.by_node: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cost(self) -> float:
+        return (
+            (self.prompt_tokens - self.cached_prompt_tokens) * self.prompt_cost_per_1m
+            + self.cached_prompt_tokens * self.cached_prompt_cost_per_1m
+            + self.completion_tokens * self.completion_cost_per_1m
+        ) / 1_000_000
+
+    def add(self, node: str, prompt_tokens: int, completion_tokens: int, cached_prompt_tokens: int = 0) -> None:
+        self.prompt_tokens += prompt_tokens
+        self.cached_prompt_tokens += cached_prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.calls += 1
+
+        entry = self.by_node.get(node)
+        if entry is None:
+            entry = self.by_node[node] = {
+                "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0, "calls": 0
+            }
+        entry["prompt_tokens"] += prompt_tokens
+        entry["cached_prompt_tokens"] += cached_prompt_tokens
+        entry["completion_tokens"] += completion_tokens
+        entry["calls"] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "llm_calls": self.calls,
+            "cost_usd": round(self.cost, 6),
+            "by_node": {node: dict(entry) for node, entry in self.by_node.items()},
+        }
+
+
+# set for the duration of a run; model callbacks charge the usage found here
+RUN_USAGE: ContextVar[Optional[RunUsage]] = ContextVar("run_usage", default=None)
+
+
+def current_usage() -> Optional[RunUsage]:
+    return RUN_USAGE.get()